@@ -23,7 +23,7 @@ class ProcessAdmin(admin.ModelAdmin):
 
 @admin.register(ProductType)
 class ProductTypeAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "display_name", "created_at")
+    list_display = ("id", "name", "display_name", "preview_sample_rows", "created_at")
     search_fields = ("name", "display_name")
 
 
@@ -0,0 +1,168 @@
+import pathlib
+import tarfile
+import zipfile
+from gzip import open as gzip_open
+
+from core.file_utils import get_file_extension
+
+
+class ArchiveMember:
+    """A regular file stored inside an archive."""
+
+    def __init__(self, name, size, offset, info=None):
+        """
+        Args:
+            name (str): Member name as stored in the archive.
+            size (int): Uncompressed member size in bytes.
+            offset (int | None): Offset of the member inside the archive
+                (ZIP local header or TAR data offset).
+            info (zipfile.ZipInfo | tarfile.TarInfo | None): Native member info.
+        """
+        self.name = name
+        self.path = pathlib.PurePosixPath(name)
+        self.normalized_path = pathlib.PurePosixPath(str(name).lstrip("./"))
+        self.size = size
+        self.offset = offset
+        self.info = info
+
+
+class ArchiveIndex:
+    """Member index of a compressed main file, built with a single scan.
+
+    The archive type is detected and the member list is read once; later
+    lookups and small text reads are answered from the index. For TAR
+    archives the text of small properties-like members is captured during
+    the same scan, so compressed tarballs are not decompressed again to
+    inspect HATS metadata.
+    """
+
+    ZIP = "zip"
+    TAR = "tar"
+    GZIP = "gzip"
+    GZIP_EXTENSIONS = {".gz", ".gzip"}
+    TEXT_CACHE_MAX_BYTES = 262144
+
+    def __init__(self, filepath, cache_text_member=None):
+        """
+        Args:
+            filepath (str | pathlib.Path): Archive path.
+            cache_text_member (Callable[[pathlib.PurePosixPath], bool] | None):
+                Predicate selecting TAR members whose text is cached while
+                scanning.
+        """
+        self.filepath = pathlib.Path(filepath)
+        self.kind = None
+        self.members = []
+        self._by_path = {}
+        self._text_cache = {}
+
+        if zipfile.is_zipfile(self.filepath):
+            self.kind = self.ZIP
+            self._index_zip()
+        elif tarfile.is_tarfile(self.filepath):
+            self.kind = self.TAR
+            self._index_tar(cache_text_member)
+        elif get_file_extension(self.filepath.name) in self.GZIP_EXTENSIONS:
+            self.kind = self.GZIP
+            inferred_name = pathlib.Path(self.filepath.stem).name
+            self._add(ArchiveMember(inferred_name, size=None, offset=0))
+
+    @property
+    def is_zip(self):
+        return self.kind == self.ZIP
+
+    @property
+    def is_tar(self):
+        return self.kind == self.TAR
+
+    @property
+    def is_gzip(self):
+        return self.kind == self.GZIP
+
+    def member_paths(self):
+        """List member paths in archive order."""
+        return [member.path for member in self.members]
+
+    def get(self, member_path):
+        """Look up a member by path, ignoring leading './'."""
+        normalized = pathlib.PurePosixPath(str(member_path).lstrip("./"))
+        return self._by_path.get(normalized)
+
+    def read_text(self, member_path, max_bytes=TEXT_CACHE_MAX_BYTES):
+        """Read up to max_bytes from a member as UTF-8 text.
+
+        Returns:
+            str: Member text, or an empty string if it cannot be read.
+        """
+        member = self.get(member_path)
+        if member is None:
+            return ""
+
+        cached = self._text_cache.get(member.normalized_path)
+        if cached is not None:
+            return cached[:max_bytes].decode("utf-8", errors="ignore")
+
+        try:
+            if self.is_zip:
+                with zipfile.ZipFile(self.filepath) as archive:
+                    with archive.open(member.info, "r") as source:
+                        content = source.read(max_bytes)
+            elif self.is_tar:
+                with tarfile.open(self.filepath, mode="r:*") as archive:
+                    # The indexed TarInfo carries the data offset, so the
+                    # reader seeks straight to it instead of walking members.
+                    fileobj = archive.extractfile(member.info)
+                    if not fileobj:
+                        return ""
+                    with fileobj:
+                        content = fileobj.read(max_bytes)
+            elif self.is_gzip:
+                with gzip_open(self.filepath, "rb") as source:
+                    content = source.read(max_bytes)
+            else:
+                return ""
+        except Exception:
+            return ""
+
+        return content.decode("utf-8", errors="ignore")
+
+    def _add(self, member):
+        self.members.append(member)
+        self._by_path.setdefault(member.normalized_path, member)
+
+    def _index_zip(self):
+        with zipfile.ZipFile(self.filepath) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                self._add(
+                    ArchiveMember(
+                        info.filename,
+                        size=info.file_size,
+                        offset=info.header_offset,
+                        info=info,
+                    )
+                )
+
+    def _index_tar(self, cache_text_member):
+        with tarfile.open(self.filepath, mode="r:*") as archive:
+            for info in archive:
+                if not info.isfile():
+                    continue
+                member = ArchiveMember(
+                    info.name,
+                    size=info.size,
+                    offset=info.offset_data,
+                    info=info,
+                )
+                self._add(member)
+
+                if (
+                    cache_text_member is not None
+                    and info.size <= self.TEXT_CACHE_MAX_BYTES
+                    and cache_text_member(member.normalized_path)
+                ):
+                    fileobj = archive.extractfile(info)
+                    if fileobj:
+                        with fileobj:
+                            self._text_cache[member.normalized_path] = fileobj.read()
@@ -0,0 +1,375 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+REDSHIFT_COLUMN_PATTERN = re.compile(
+    r"^(z|redshift|z_?spec|spec_?z|z_?phot|photo_?z|z_?true|z_?best|z_?mean|z_?median|z_?mode)$",
+    re.IGNORECASE,
+)
+ID_COLUMN_PATTERN = re.compile(
+    r"^(id|obj_?id|object_?id|source_?id|coadd_objects_id)$", re.IGNORECASE
+)
+RA_COLUMN_PATTERN = re.compile(r"^(ra|ra_?j2000|alpha)$", re.IGNORECASE)
+DEC_COLUMN_PATTERN = re.compile(r"^(dec|decl|dec_?j2000|delta)$", re.IGNORECASE)
+
+
+def is_redshift_column(name):
+    """True for column names commonly used for redshifts (z, zspec, photoz...)."""
+    return bool(REDSHIFT_COLUMN_PATTERN.match(str(name)))
+
+
+class HyperLogLog:
+    """Approximate distinct count of a stream of 64-bit hashes.
+
+    Uses 2**precision one-byte registers; the relative standard error of
+    the estimate is about 1.04 / sqrt(2**precision) (0.8% for 14).
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes):
+        """Add an array of uint64 hashes."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if hashes.size == 0:
+            return
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        rest = hashes & np.uint64((1 << width) - 1)
+        # Position of the leftmost 1 bit in the remaining `width` bits.
+        # frexp is exact here because width <= 53.
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = (width - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def update_values(self, values):
+        """Hash and add an array of values."""
+        self.update(pd.util.hash_array(np.asarray(values)))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self):
+        """Estimated number of distinct values."""
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities.
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+def duplicate_fraction(count, distinct_count):
+    """Estimated fraction of values that repeat an earlier one."""
+    if not count:
+        return 0.0
+    return float(min(1.0, max(0.0, 1.0 - distinct_count / count)))
+
+
+class QuantileSketch:
+    """Approximate quantiles over a stream of values in bounded memory.
+
+    Values are kept as weighted centroids. When there are more than twice
+    `max_centroids` of them, neighbouring centroids are merged into
+    `max_centroids` groups of equal weight, so the rank error of a
+    quantile stays around 1 / max_centroids.
+    """
+
+    def __init__(self, max_centroids=1000):
+        self.max_centroids = max_centroids
+        self.total = 0
+        self._means = np.empty(0, dtype=np.float64)
+        self._weights = np.empty(0, dtype=np.float64)
+
+    def update(self, values):
+        """Add an array of finite values."""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        self.total += values.size
+        self._means = np.concatenate([self._means, values])
+        self._weights = np.concatenate([self._weights, np.ones(values.size)])
+        if self._means.size > 2 * self.max_centroids:
+            self._compress()
+
+    def quantiles(self, probabilities):
+        """Approximate values at each probability in [0, 1], or None when empty."""
+        if self.total == 0:
+            return [None for _ in probabilities]
+
+        order = np.argsort(self._means, kind="stable")
+        means = self._means[order]
+        weights = self._weights[order]
+        # Each centroid sits at the middle of the ranks it covers.
+        positions = np.cumsum(weights) - weights / 2
+        ranks = np.asarray(probabilities, dtype=np.float64) * self.total
+        return [float(v) for v in np.interp(ranks, positions, means)]
+
+    def _compress(self):
+        order = np.argsort(self._means, kind="stable")
+        means = self._means[order]
+        weights = self._weights[order]
+
+        cumulative = np.cumsum(weights) - weights
+        groups = np.floor(cumulative / self.total * self.max_centroids).astype(np.int64)
+        group_weights = np.bincount(groups, weights=weights)
+        group_sums = np.bincount(groups, weights=means * weights)
+        used = group_weights > 0
+
+        self._weights = group_weights[used]
+        self._means = group_sums[used] / self._weights
+
+
+class ColumnProfile:
+    """Running statistics of one column.
+
+    Non-numeric columns only report `count` and `null_count`. Numeric
+    columns add `min`, `max`, `mean` and approximate `quantiles`, computed
+    over their finite values, and an optional fixed-bin histogram.
+    """
+
+    def __init__(self, name, quantiles, histogram_edges=None, distinct=False):
+        self.name = name
+        self.quantiles = quantiles
+        self.histogram_edges = histogram_edges
+        self.count = 0
+        self.null_count = 0
+        self.numeric = None
+        self.finite_count = 0
+        self.min = None
+        self.max = None
+        self.sum = 0.0
+        self.sketch = QuantileSketch()
+        self.histogram = None
+        self.underflow = 0
+        self.overflow = 0
+        self.distinct = HyperLogLog() if distinct else None
+
+    def update(self, series):
+        """Add the values of a pandas Series."""
+        nulls = int(series.isna().sum())
+        self.null_count += nulls
+        self.count += len(series) - nulls
+        if self.distinct is not None and len(series) > nulls:
+            self.distinct.update_values(self._hashable(series.dropna()))
+
+        is_numeric = pd.api.types.is_numeric_dtype(
+            series.dtype
+        ) and not pd.api.types.is_bool_dtype(series.dtype)
+        if len(series) - nulls == 0:
+            return
+        # A column is numeric only if every non-empty chunk is numeric.
+        self.numeric = is_numeric if self.numeric is None else self.numeric and is_numeric
+        if not self.numeric:
+            return
+
+        values = series.dropna().to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+
+        if pd.api.types.is_integer_dtype(series.dtype):
+            # Keep large integer ids exact instead of going through float64.
+            minimum, maximum = series.min(), series.max()
+        else:
+            minimum, maximum = values.min(), values.max()
+        self.min = minimum if self.min is None else min(self.min, minimum)
+        self.max = maximum if self.max is None else max(self.max, maximum)
+        self.finite_count += values.size
+        self.sum += float(values.sum())
+        self.sketch.update(values)
+
+        if self.histogram_edges is not None:
+            counts, _ = np.histogram(values, bins=self.histogram_edges)
+            self.histogram = counts if self.histogram is None else self.histogram + counts
+            self.underflow += int((values < self.histogram_edges[0]).sum())
+            self.overflow += int((values > self.histogram_edges[-1]).sum())
+
+    def to_dict(self):
+        stats = {"count": self.count, "null_count": self.null_count}
+        if self.distinct is not None:
+            stats["distinct_count"] = min(self.count, self.distinct.count())
+            stats["duplicate_fraction"] = duplicate_fraction(
+                self.count, stats["distinct_count"]
+            )
+        if not self.numeric or self.finite_count == 0:
+            return stats
+
+        stats.update(
+            {
+                "min": self._scalar(self.min),
+                "max": self._scalar(self.max),
+                "mean": self.sum / self.finite_count,
+                "quantiles": dict(
+                    zip(
+                        [str(q) for q in self.quantiles],
+                        self.sketch.quantiles(self.quantiles),
+                    )
+                ),
+            }
+        )
+        if self.histogram is not None:
+            stats["histogram"] = {
+                "bin_edges": [float(edge) for edge in self.histogram_edges],
+                "counts": [int(count) for count in self.histogram],
+                "underflow": self.underflow,
+                "overflow": self.overflow,
+            }
+        return stats
+
+    @staticmethod
+    def _hashable(series):
+        """Values with integral floats as int64, so 7 and 7.0 hash alike."""
+        values = series.to_numpy()
+        if values.dtype.kind == "f" and np.all(np.mod(values, 1) == 0):
+            if np.all(np.abs(values) < 2**63):
+                return values.astype(np.int64)
+        if values.dtype.kind in "iufb":
+            return values
+        return values.astype(str).astype(object)
+
+    @staticmethod
+    def _scalar(value):
+        if hasattr(value, "item"):
+            value = value.item()
+        if isinstance(value, float) and not np.isfinite(value):
+            return None
+        return value
+
+
+class TableProfiler:
+    """Per-column profile of a table fed chunk by chunk.
+
+    Column roles come from the aliases of a previous registration or,
+    failing that, from the column names:
+    - redshift (alias z) columns get a histogram over REDSHIFT_HISTOGRAM_EDGES;
+    - ID columns get an approximate distinct count;
+    - the RA/Dec pair gets an approximate count of distinct positions,
+      rounded to a grid of `position_precision` arcseconds.
+    """
+
+    QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+    REDSHIFT_HISTOGRAM_EDGES = np.linspace(0.0, 8.0, 161)
+    DEFAULT_POSITION_PRECISION = 0.1
+
+    def __init__(self, column_aliases=None, position_precision=None):
+        """
+        Args:
+            column_aliases (dict | None): Alias of each column, e.g.
+                {"objid": "ID", "zspec": "z"}.
+            position_precision (float | None): Grid size, in arcseconds,
+                used to compare positions.
+        """
+        self.column_aliases = {
+            str(name): str(alias).lower()
+            for name, alias in (column_aliases or {}).items()
+            if alias
+        }
+        self.position_precision = float(
+            position_precision or self.DEFAULT_POSITION_PRECISION
+        )
+        self.columns = {}
+        self.position_columns = None
+        self.position_count = 0
+        self.positions = HyperLogLog()
+
+    def update(self, chunk):
+        """Add the rows of a DataFrame chunk."""
+        if not self.columns:
+            self.position_columns = self._find_position_columns(chunk.columns)
+
+        for name in chunk.columns:
+            profile = self.columns.get(name)
+            if profile is None:
+                profile = self.columns[name] = ColumnProfile(
+                    name,
+                    self.QUANTILES,
+                    histogram_edges=(
+                        self.REDSHIFT_HISTOGRAM_EDGES
+                        if self._has_role(name, "z", REDSHIFT_COLUMN_PATTERN)
+                        else None
+                    ),
+                    distinct=self._has_role(name, "id", ID_COLUMN_PATTERN),
+                )
+            profile.update(chunk[name])
+
+        if self.position_columns is not None:
+            self._update_positions(chunk)
+
+    def to_dict(self):
+        """Statistics keyed by column name."""
+        return {name: profile.to_dict() for name, profile in self.columns.items()}
+
+    def duplicate_estimates(self):
+        """Product-level duplicate estimates for the ID column and positions.
+
+        Returns:
+            dict: `id` and/or `position` entries with `distinct_count` and
+                `duplicate_fraction`; empty when no column has those roles.
+        """
+        estimates = {}
+        for name, profile in self.columns.items():
+            if profile.distinct is not None:
+                stats = profile.to_dict()
+                estimates["id"] = {
+                    "column": str(name),
+                    "count": stats["count"],
+                    "distinct_count": stats["distinct_count"],
+                    "duplicate_fraction": stats["duplicate_fraction"],
+                }
+                break
+
+        if self.position_columns is not None and self.position_count:
+            distinct_count = min(self.position_count, self.positions.count())
+            estimates["position"] = {
+                "columns": [str(c) for c in self.position_columns],
+                "precision_arcsec": self.position_precision,
+                "count": self.position_count,
+                "distinct_count": distinct_count,
+                "duplicate_fraction": duplicate_fraction(
+                    self.position_count, distinct_count
+                ),
+            }
+        return estimates
+
+    def key_columns(self, columns):
+        """Columns holding the ID or the position among `columns`."""
+        keys = [c for c in columns if self._has_role(c, "id", ID_COLUMN_PATTERN)]
+        keys += list(self._find_position_columns(columns) or ())
+        return keys
+
+    def _has_role(self, name, alias, pattern):
+        if str(name) in self.column_aliases:
+            return self.column_aliases[str(name)] == alias
+        if alias in self.column_aliases.values():
+            return False
+        return bool(pattern.match(str(name)))
+
+    def _find_position_columns(self, columns):
+        ra = [c for c in columns if self._has_role(c, "ra", RA_COLUMN_PATTERN)]
+        dec = [c for c in columns if self._has_role(c, "dec", DEC_COLUMN_PATTERN)]
+        if ra and dec:
+            return ra[0], dec[0]
+        return None
+
+    def _update_positions(self, chunk):
+        ra_name, dec_name = self.position_columns
+        ra = pd.to_numeric(chunk[ra_name], errors="coerce").to_numpy(dtype=np.float64)
+        dec = pd.to_numeric(chunk[dec_name], errors="coerce").to_numpy(dtype=np.float64)
+        valid = np.isfinite(ra) & np.isfinite(dec)
+        if not valid.any():
+            return
+
+        scale = 3600.0 / self.position_precision
+        cells = pd.DataFrame(
+            {
+                "ra": np.round(ra[valid] * scale).astype(np.int64),
+                "dec": np.round(dec[valid] * scale).astype(np.int64),
+            }
+        )
+        self.position_count += len(cells)
+        self.positions.update(pd.util.hash_pandas_object(cells, index=False).to_numpy())
@@ -1,3 +1,4 @@
+import hashlib
 from pathlib import Path
 
 MULTIPART_EXTENSIONS = (
@@ -16,3 +17,44 @@ def get_file_extension(filename: str) -> str:
             return extension
 
     return Path(basename).suffix.lower()
+
+
+FINGERPRINT_SAMPLE_BLOCKS = 16
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
+
+
+def file_fingerprint(path) -> str:
+    """Cheap content fingerprint of a file or directory.
+
+    Files combine size, mtime and a hash of FINGERPRINT_SAMPLE_BLOCKS blocks
+    spread evenly over the content (the whole content for small files), so
+    multi-GB files are fingerprinted with a few reads. Directories hash the
+    relative path, size and mtime of every file they contain.
+    """
+    path = Path(path)
+    digest = hashlib.blake2b(digest_size=16)
+
+    if path.is_dir():
+        size = 0
+        mtime_ns = 0
+        for file_path in sorted(p for p in path.rglob("*") if p.is_file()):
+            stat = file_path.stat()
+            size += stat.st_size
+            mtime_ns = max(mtime_ns, stat.st_mtime_ns)
+            digest.update(
+                f"{file_path.relative_to(path).as_posix()}:{stat.st_size}:"
+                f"{stat.st_mtime_ns}\n".encode("utf-8")
+            )
+        return f"dir:{size}:{mtime_ns}:{digest.hexdigest()}"
+
+    stat = path.stat()
+    sample_bytes = FINGERPRINT_SAMPLE_BLOCKS * FINGERPRINT_BLOCK_SIZE
+    with path.open("rb") as source:
+        if stat.st_size <= sample_bytes:
+            digest.update(source.read())
+        else:
+            last_offset = stat.st_size - FINGERPRINT_BLOCK_SIZE
+            for block in range(FINGERPRINT_SAMPLE_BLOCKS):
+                source.seek(last_offset * block // (FINGERPRINT_SAMPLE_BLOCKS - 1))
+                digest.update(source.read(FINGERPRINT_BLOCK_SIZE))
+    return f"file:{stat.st_size}:{stat.st_mtime_ns}:{digest.hexdigest()}"
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0060_alter_productfile_size_and_n_rows"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productcontent",
+            name="statistics",
+            field=models.JSONField(
+                blank=True,
+                default=None,
+                help_text="Column statistics collected while registering the main file.",
+                null=True,
+                verbose_name="Statistics",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0061_productcontent_statistics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="producttype",
+            name="preview_sample_rows",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Rows randomly sampled from the whole table for the preview, in addition to the first rows. 0 disables sampling.",
+                verbose_name="Preview Sample Rows",
+            ),
+        ),
+    ]
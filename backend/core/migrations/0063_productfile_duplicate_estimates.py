@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0062_producttype_preview_sample_rows"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productfile",
+            name="duplicate_estimates",
+            field=models.JSONField(
+                blank=True,
+                default=None,
+                help_text="Approximate distinct counts of the ID and RA/Dec columns.",
+                null=True,
+                verbose_name="Duplicate Estimates",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0063_productfile_duplicate_estimates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productfile",
+            name="fingerprint",
+            field=models.CharField(
+                blank=True,
+                help_text="Content fingerprint of the main file when its metadata was collected.",
+                max_length=128,
+                null=True,
+                verbose_name="Fingerprint",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0064_productfile_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productdownloadarchive",
+            name="archive_key",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="productdownloadarchive",
+            index=models.Index(
+                fields=["archive_key"], name="core_produc_archive_5f6335_idx"
+            ),
+        ),
+    ]
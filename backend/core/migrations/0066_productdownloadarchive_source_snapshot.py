@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0065_productdownloadarchive_archive_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productdownloadarchive",
+            name="source_snapshot",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0066_productdownloadarchive_source_snapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductSourceSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("signature", models.CharField(max_length=64)),
+                ("files", models.JSONField(default=list)),
+                (
+                    "directory_mtime_ns",
+                    models.BigIntegerField(blank=True, null=True),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="source_snapshot",
+                        to="core.product",
+                    ),
+                ),
+            ],
+        ),
+    ]
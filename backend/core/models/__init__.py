@@ -11,3 +11,4 @@ from core.models.product_download_archive import (
     ProductDownloadArchive,
     ProductDownloadArchiveStatus,
 )
+from core.models.product_source_snapshot import ProductSourceSnapshot
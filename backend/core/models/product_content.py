@@ -30,5 +30,13 @@ class ProductContent(models.Model):
     alias = models.CharField(
         max_length=256, verbose_name="Alias", null=True, blank=True)
 
+    statistics = models.JSONField(
+        verbose_name="Statistics",
+        help_text="Column statistics collected while registering the main file.",
+        null=True,
+        blank=True,
+        default=None,
+    )
+
     def __str__(self):
         return f"{self.product.display_name} - {self.column_name}"
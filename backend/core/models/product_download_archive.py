@@ -30,6 +30,12 @@ class ProductDownloadArchive(models.Model):
     size = models.BigIntegerField(null=True, blank=True)
     checksum = models.CharField(max_length=64, null=True, blank=True)
     source_signature = models.CharField(max_length=64)
+    # Content address of the archive blob shared by every archive built
+    # from the same sources, metadata and compression settings.
+    archive_key = models.CharField(max_length=64, null=True, blank=True)
+    # Files and compression settings the archive was built from, used to
+    # reuse its members when the product changes.
+    source_snapshot = models.JSONField(null=True, blank=True)
     source_updated_at = models.DateTimeField(null=True, blank=True)
     task_id = models.CharField(max_length=255, null=True, blank=True)
     error_message = models.TextField(null=True, blank=True)
@@ -41,6 +47,7 @@ class ProductDownloadArchive(models.Model):
         indexes = [
             models.Index(fields=["product", "status"]),
             models.Index(fields=["source_signature"]),
+            models.Index(fields=["archive_key"]),
         ]
 
     def __str__(self):
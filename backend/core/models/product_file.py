@@ -40,6 +40,20 @@ class ProductFile(models.Model):
     extension = models.CharField(
         verbose_name="Extension", max_length=10, null=True, blank=True
     )
+    duplicate_estimates = models.JSONField(
+        verbose_name="Duplicate Estimates",
+        help_text="Approximate distinct counts of the ID and RA/Dec columns.",
+        null=True,
+        blank=True,
+        default=None,
+    )
+    fingerprint = models.CharField(
+        verbose_name="Fingerprint",
+        help_text="Content fingerprint of the main file when its metadata was collected.",
+        max_length=128,
+        null=True,
+        blank=True,
+    )
     is_directory = models.BooleanField(default=False)
     created = models.DateTimeField(auto_now_add=True, blank=True)
     updated = models.DateTimeField(auto_now=True)
@@ -0,0 +1,33 @@
+from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+class ProductSourceSnapshot(models.Model):
+    """Persisted listing of the files packed in a product download.
+
+    Saves walking and stat()ing every product file to compute the source
+    signature on each download prepare, status poll and cleanup pass.
+    """
+
+    product = models.OneToOneField(
+        "core.Product",
+        on_delete=models.CASCADE,
+        related_name="source_snapshot",
+    )
+    signature = models.CharField(max_length=64)
+    files = models.JSONField(default=list)
+    # mtime of the product directory when the snapshot was taken; a cheap
+    # guard against files added or removed outside the API.
+    directory_mtime_ns = models.BigIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.product} - {self.signature}"
+
+
+@receiver(post_save, sender="core.ProductFile")
+@receiver(post_delete, sender="core.ProductFile")
+def invalidate_product_source_snapshot(sender, instance, **kwargs):
+    """Descarta o snapshot quando os arquivos do produto mudam."""
+    ProductSourceSnapshot.objects.filter(product_id=instance.product_id).delete()
@@ -6,6 +6,11 @@ class ProductType(models.Model):
     display_name = models.CharField(max_length=255)
     order = models.IntegerField(null=True, blank=True, default=None)
     description = models.TextField(null=True, blank=True)
+    preview_sample_rows = models.PositiveIntegerField(
+        verbose_name="Preview Sample Rows",
+        help_text="Rows randomly sampled from the whole table for the preview, in addition to the first rows. 0 disables sampling.",
+        default=0,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
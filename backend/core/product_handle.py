@@ -1,13 +1,23 @@
 import abc
 import csv
+import io
+import mmap
+import os
+import re
 from collections import OrderedDict
 from pathlib import Path
 from typing import List
+from xml.etree import ElementTree
 
+import h5py
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 import tables_io
+from astropy.io import fits
 from astropy.io.votable import parse as votable_parse
+from astropy.table import Table
 from core._typing import Column, PathLike
 
 
@@ -30,6 +40,192 @@ class ProductHandle:
         return FileHandle(filepath).to_df(**kwargs)
 
 
+class TextSample(object):
+    """Bounded head buffer of a text table, read with a single open.
+
+    Every structural probe of a delimited text file (delimiter, header,
+    skipped lines, column names and dtypes) is answered from this buffer,
+    so building a handle costs one bounded read regardless of file size.
+    """
+
+    MAX_BYTES = 1024 * 1024
+    MAX_LINES = 1000
+
+    def __init__(self, filepath: PathLike, max_bytes=None, max_lines=None):
+        self.filepath = filepath
+        if filepath is not None:
+            with open(filepath, "r") as fp:
+                self._load(fp, max_bytes, max_lines)
+
+    @classmethod
+    def from_stream(cls, stream, max_bytes=None, max_lines=None):
+        """Build a sample from an open text stream (e.g. an archive member).
+
+        The sample has no backing path, so iter_lines stops at the buffer.
+        """
+        sample = cls(None)
+        sample._load(stream, max_bytes, max_lines)
+        return sample
+
+    def _load(self, fp, max_bytes=None, max_lines=None):
+        max_bytes = max_bytes or self.MAX_BYTES
+        max_lines = max_lines or self.MAX_LINES
+
+        text = fp.read(max_bytes)
+        self.is_complete = fp.read(1) == ""
+
+        if not self.is_complete:
+            # Descarta a ultima linha, que pode ter sido cortada no meio.
+            last_newline = text.rfind("\n")
+            text = text[: last_newline + 1] if last_newline >= 0 else ""
+
+        lines = text.splitlines(keepends=True)
+        if len(lines) > max_lines:
+            lines = lines[:max_lines]
+            self.is_complete = False
+
+        self.lines = [line.rstrip("\r\n") for line in lines]
+        self.text = "".join(lines)
+
+    @property
+    def first_line(self) -> str:
+        return self.lines[0] if self.lines else ""
+
+    def read_csv(self, **kwargs) -> pd.DataFrame:
+        """Parse the buffered head with pandas.read_csv."""
+        return pd.read_csv(io.StringIO(self.text), **kwargs)
+
+    def iter_lines(self):
+        """Yield the buffered lines, then keep streaming the rest of the file.
+
+        Only callers that need to look past the buffer (e.g. an unusually
+        long comment block) pay for the extra reads, one line at a time.
+        """
+        yield from self.lines
+        if self.is_complete or self.filepath is None:
+            return
+
+        with open(self.filepath, "r") as fp:
+            for index, line in enumerate(fp):
+                if index >= len(self.lines):
+                    yield line.rstrip("\r\n")
+
+
+ROW_COUNT_BUFFER_SIZE = 4 * 1024 * 1024
+# Bytes pandas treats as blank when they are the only content of a line.
+_BLANK_BYTES = (ord(" "), ord("\t"), ord("\r"))
+
+
+def count_text_rows(
+    filepath: PathLike,
+    skip_lines=0,
+    quotechar=b'"',
+    use_mmap=False,
+    buffer_size=ROW_COUNT_BUFFER_SIZE,
+):
+    """Count the data rows of a delimited text file by scanning raw bytes.
+
+    Lines are counted in large buffers without parsing fields. Blank and
+    whitespace-only lines are ignored, as pandas.read_csv does.
+
+    Args:
+        filepath (PathLike): Text table path.
+        skip_lines (int): Leading lines that are not data (header, comments).
+        quotechar (bytes): If present, a newline may be inside a quoted field
+            and the byte count is not reliable.
+        use_mmap (bool): Scan a memory map of the file instead of reading it.
+        buffer_size (int): Bytes scanned per step.
+
+    Returns:
+        int | None: Number of data rows, or None when only a full parse can
+        tell (quoted fields or CR-only line endings).
+    """
+    with open(filepath, "rb") as fp:
+        for _ in range(skip_lines):
+            if not fp.readline():
+                return 0
+        start = fp.tell()
+
+        if use_mmap and os.fstat(fp.fileno()).st_size > start:
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                blocks = (
+                    mm[offset : offset + buffer_size]
+                    for offset in range(start, len(mm), buffer_size)
+                )
+                return _count_rows_in_blocks(blocks, quotechar)
+
+        blocks = iter(lambda: fp.read(buffer_size), b"")
+        return _count_rows_in_blocks(blocks, quotechar)
+
+
+def _count_rows_in_blocks(blocks, quotechar):
+    rows = 0
+    last = ord("\n")
+    has_lf = has_cr = False
+
+    for block in blocks:
+        if quotechar and quotechar in block:
+            return None
+
+        data = np.frombuffer(block, dtype=np.uint8)
+        kept = data[~np.isin(data, _BLANK_BYTES)]
+        if kept.size == 0:
+            has_cr = has_cr or b"\r" in block
+            continue
+
+        # A line has data when the byte before its newline is not a newline.
+        is_lf = kept == ord("\n")
+        rows += int(np.count_nonzero(is_lf[1:] & ~is_lf[:-1]))
+        if is_lf[0] and last != ord("\n"):
+            rows += 1
+        last = kept[-1]
+
+        has_lf = has_lf or bool(is_lf.any())
+        has_cr = has_cr or (not has_lf and b"\r" in block)
+
+    if not has_lf and has_cr:
+        return None
+
+    if last != ord("\n"):
+        # Last line without a trailing newline.
+        rows += 1
+    return rows
+
+
+DEFAULT_CHUNK_SIZE = 50000
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+
+
+def hats_dataset_path(root: PathLike) -> Path:
+    """Directory holding the parquet partitions of a HATS collection."""
+    # HATS collections keep partitions under <root>/dataset.
+    dataset_dir = Path(root) / "dataset"
+    return dataset_dir if dataset_dir.is_dir() else Path(root)
+
+
+def fits_table_hdu(hdul):
+    """First table HDU of an opened FITS file.
+
+    Raises:
+        NotTableError: If the file has no table HDU.
+    """
+    for hdu in hdul:
+        if isinstance(hdu, (fits.BinTableHDU, fits.TableHDU)):
+            return hdu
+    raise NotTableError("The FITS file has no table HDU.")
+
+
+VOTABLE_ROOT_PATTERN = re.compile(rb"<(?:[\w.-]+:)?VOTABLE[\s>/]")
+VOTABLE_SNIFF_BYTES = 64 * 1024
+
+
+def is_votable(filepath: PathLike) -> bool:
+    """True when the head of an XML file has a VOTABLE root element."""
+    with open(filepath, "rb") as fp:
+        head = fp.read(VOTABLE_SNIFF_BYTES)
+    return VOTABLE_ROOT_PATTERN.search(head) is not None
+
+
 class FileHandle(object):
     handle = None
     extension = None
@@ -40,12 +236,21 @@ class FileHandle(object):
         # Identificar o formato do arquivo
         self.extension = fp.suffix
 
+        # Diretorios sao colecoes HATS particionadas em parquet.
+        if fp.is_dir():
+            self.handle = ParquetHandle(hats_dataset_path(fp))
+            return
+
         # Instancia o Handle de acordo com o tipo de arquivo
         match self.extension:
             case ".csv":
                 self.handle = CsvHandle(fp)
-            case ".fits" | ".fit" | ".hf5" | ".hdf5" | ".h5" | ".pq" | ".parquet":
-                self.handle = TableIOHandle(fp)
+            case ".hf5" | ".hdf5" | ".h5":
+                self.handle = Hdf5Handle(fp)
+            case ".fits" | ".fit":
+                self.handle = FitsHandle(fp)
+            case ".pq" | ".parquet":
+                self.handle = ParquetHandle(fp)
             case ".vo" | ".vot" | ".xml":
                 self.handle = VOTableHandle(fp)
             case ".zip" | ".tar" | ".gz":
@@ -80,12 +285,15 @@ class CsvHandle(BaseHandle):
     # Lista com nome das colunas que podem ser str ou int.
     column_names = [Column]
 
-    def __init__(self, filepath: PathLike):
+    def __init__(self, filepath: PathLike, sample: TextSample = None):
         super().__init__(filepath)
 
+        # Todas as inspeções usam o mesmo buffer lido uma única vez.
+        self.sample = sample or TextSample(filepath)
         self.delimiter = self.get_delimiter()
         self.has_hd = self.has_header()
         self.column_names = self.get_column_names()
+        self.dtypes = self.get_dtypes()
 
     def to_df(self, **kwargs) -> pd.DataFrame:
         # Check for header parameter
@@ -99,20 +307,49 @@ class CsvHandle(BaseHandle):
                 "It is not possible to use the delimiter argument in the df_from_file() method when the file is a .csv file."
             )
 
-        if self.has_hd:
-            df = pd.read_csv(
-                self.filepath, header=0, delimiter=self.delimiter, **kwargs
-            )
-        else:
-            df = pd.read_csv(
-                self.filepath,
-                header=None,
-                names=self.column_names,
-                delimiter=self.delimiter,
-                **kwargs,
-            )
+        return pd.read_csv(self.filepath, **self.read_csv_kwargs(), **kwargs)
+
+    def iter_chunks(self, chunksize=DEFAULT_CHUNK_SIZE, columns=None, **kwargs):
+        """Stream the table as DataFrame chunks with bounded memory.
+
+        Extra keyword arguments (e.g. dtype) are passed to pandas.read_csv.
+        """
+        return pd.read_csv(
+            self.filepath,
+            chunksize=chunksize,
+            usecols=columns,
+            **self.read_csv_kwargs(),
+            **kwargs,
+        )
+
+    def head(self, nrows) -> pd.DataFrame:
+        """First rows of the table, parsed from the sample when it holds them."""
+        df = self.sample.read_csv(nrows=nrows, **self.read_csv_kwargs())
+        if len(df) < nrows and not self.sample.is_complete and self.filepath:
+            df = pd.read_csv(self.filepath, nrows=nrows, **self.read_csv_kwargs())
         return df
 
+    def count_rows(self, use_mmap=False):
+        """Count data rows with a byte scan; None when quoting requires a parse."""
+        return count_text_rows(
+            self.filepath, skip_lines=1 if self.has_hd else 0, use_mmap=use_mmap
+        )
+
+    def read_csv_kwargs(self) -> dict:
+        """Arguments for pandas.read_csv matching the sniffed layout."""
+        if self.has_hd:
+            return {"header": 0, "delimiter": self.delimiter}
+        return {
+            "header": None,
+            "names": self.column_names,
+            "delimiter": self.delimiter,
+        }
+
+    def get_dtypes(self) -> dict:
+        """Column dtypes inferred from the sampled rows."""
+        df = self.sample.read_csv(**self.read_csv_kwargs())
+        return {str(k): str(v) for k, v in df.dtypes.items()}
+
     def has_header(self) -> bool:
         """Verifica se o csv tem Header.
         Usa dois metodos diferentes para checar.
@@ -131,8 +368,8 @@ class CsvHandle(BaseHandle):
         # Method: open csv twice considering with header and without header,
         # if the data types are the same in both times it probably doesn't have header.
         # https://stackoverflow.com/questions/53100598/can-pandas-auto-recognize-if-header-is-present/53101192#53101192
-        df = pd.read_csv(self.filepath, header=None, delimiter=self.delimiter, nrows=20)
-        df_header = pd.read_csv(self.filepath, delimiter=self.delimiter, nrows=20)
+        df = self.sample.read_csv(header=None, delimiter=self.delimiter, nrows=20)
+        df_header = self.sample.read_csv(delimiter=self.delimiter, nrows=20)
         if tuple(df.dtypes) != tuple(df_header.dtypes):
             temp.append(True)
         else:
@@ -147,7 +384,7 @@ class CsvHandle(BaseHandle):
         return all(temp)
 
     def get_column_names(self) -> List[Column]:
-        df = pd.read_csv(self.filepath, header=None, delimiter=self.delimiter, nrows=5)
+        df = self.sample.read_csv(header=None, delimiter=self.delimiter, nrows=5)
 
         if self.has_hd:
             df = df[1:].reset_index(drop=True).rename(columns=df.iloc[0])
@@ -165,11 +402,7 @@ class CsvHandle(BaseHandle):
         Returns:
             str: delimiter
         """
-        with open(self.filepath, "r") as csvfile:
-            dt = csvfile.readline().replace("\n", "")
-            delimiter = csv.Sniffer().sniff(dt).delimiter
-
-        return delimiter
+        return csv.Sniffer().sniff(self.sample.first_line).delimiter
 
 
 class TableIOHandle(BaseHandle):
@@ -194,6 +427,196 @@ class TableIOHandle(BaseHandle):
         return df
 
 
+class FitsHandle(TableIOHandle):
+    """Table of the first FITS table HDU, sliced from a memory map."""
+
+    @property
+    def column_names(self) -> List[Column]:
+        with fits.open(self.filepath, memmap=True) as hdul:
+            return list(fits_table_hdu(hdul).columns.names)
+
+    def iter_chunks(self, chunksize=DEFAULT_CHUNK_SIZE, columns=None):
+        """Stream the table as DataFrame chunks with bounded memory.
+
+        Raises:
+            NotTableError: If the file has no table HDU or a column is
+                multidimensional, which pandas cannot hold.
+        """
+        with fits.open(self.filepath, memmap=True) as hdul:
+            hdu = fits_table_hdu(hdul)
+            n_rows = int(hdu.header.get("NAXIS2", 0))
+            for start in range(0, n_rows, chunksize):
+                rows = Table(hdu.data[start : start + chunksize])
+                if columns:
+                    rows = rows[columns]
+                try:
+                    chunk = rows.to_pandas()
+                except ValueError as error:
+                    raise NotTableError(
+                        "Multidimensional FITS columns cannot be read as a table."
+                    ) from error
+                yield chunk
+
+
+class ParquetHandle(TableIOHandle):
+    """Parquet file or directory of parquet files (HATS partitions)."""
+
+    def dataset(self):
+        return ds.dataset(
+            str(self.filepath), format="parquet", exclude_invalid_files=True
+        )
+
+    @property
+    def column_names(self) -> List[Column]:
+        return list(self.dataset().schema.names)
+
+    def iter_tables(self, chunksize=DEFAULT_CHUNK_SIZE, columns=None):
+        """Stream the dataset as Arrow tables of at most `chunksize` rows."""
+        for batch in self.dataset().to_batches(columns=columns, batch_size=chunksize):
+            yield pa.Table.from_batches([batch])
+
+    def iter_chunks(self, chunksize=DEFAULT_CHUNK_SIZE, columns=None):
+        """Stream the dataset as DataFrame chunks with bounded memory."""
+        for table in self.iter_tables(chunksize, columns):
+            yield table.to_pandas()
+
+
+class Hdf5Handle(TableIOHandle):
+    """HDF5 table read in row slices.
+
+    Supported layouts:
+    - pandas HDFStore (fixed or table format), first key;
+    - a 1-D compound dataset, as written for astropy tables;
+    - one 1-D dataset per column at the file root.
+    `layout()` returns None for anything else, and such files are read
+    whole with `to_df` before being sliced.
+    """
+
+    def __init__(self, filepath: PathLike):
+        super().__init__(filepath)
+        self._layout = None
+
+    def layout(self):
+        """Layout of the table: a dict with `kind`, `columns` and `n_rows`."""
+        if self._layout is None:
+            self._layout = self._detect_layout() or {}
+        return self._layout or None
+
+    @property
+    def column_names(self) -> List[Column]:
+        layout = self.layout()
+        return list(layout["columns"]) if layout else []
+
+    @property
+    def n_rows(self):
+        layout = self.layout()
+        return layout["n_rows"] if layout else None
+
+    def head(self, nrows) -> pd.DataFrame:
+        """First rows of the table.
+
+        Raises:
+            ValueError: For multidimensional columns, which pandas cannot hold.
+        """
+        chunk = next(self.iter_chunks(chunksize=nrows), None)
+        return chunk if chunk is not None else pd.DataFrame(columns=self.column_names)
+
+    def iter_chunks(self, chunksize=DEFAULT_CHUNK_SIZE, columns=None):
+        """Stream the table as DataFrame chunks with bounded memory.
+
+        Raises:
+            ValueError: For multidimensional columns.
+        """
+        layout = self.layout()
+        if layout is None:
+            yield from _slice_frame(self.to_df(), chunksize, columns)
+            return
+
+        n_rows = layout["n_rows"]
+        if layout["kind"] == "pandas":
+            with pd.HDFStore(self.filepath, mode="r") as store:
+                for start in range(0, n_rows, chunksize):
+                    chunk = store.select(
+                        layout["key"], start=start, stop=start + chunksize
+                    )
+                    chunk = chunk.reset_index(drop=True)
+                    chunk.columns = [str(col) for col in chunk.columns]
+                    yield chunk[columns] if columns else chunk
+            return
+
+        with h5py.File(self.filepath, "r") as h5file:
+            for start in range(0, n_rows, chunksize):
+                stop = start + chunksize
+                if layout["kind"] == "compound":
+                    chunk = Table(h5file[layout["key"]][start:stop]).to_pandas()
+                else:
+                    chunk = pd.DataFrame(
+                        {name: h5file[name][start:stop] for name in layout["columns"]}
+                    )
+                yield chunk[columns] if columns else chunk
+
+    def _detect_layout(self):
+        with h5py.File(self.filepath, "r") as h5file:
+            is_pandas_store = any(
+                "pandas_type" in node.attrs for node in h5file.values()
+            )
+
+            if not is_pandas_store:
+                datasets = []
+
+                def collect_dataset(name, node):
+                    if isinstance(node, h5py.Dataset):
+                        datasets.append(node)
+
+                h5file.visititems(collect_dataset)
+
+                for dataset in datasets:
+                    if dataset.dtype.names and dataset.ndim == 1:
+                        return {
+                            "kind": "compound",
+                            "key": dataset.name,
+                            "columns": list(dataset.dtype.names),
+                            "n_rows": int(dataset.shape[0]),
+                        }
+
+                columns = [
+                    (name, node)
+                    for name, node in h5file.items()
+                    if isinstance(node, h5py.Dataset)
+                ]
+                lengths = {
+                    node.shape[0] if node.ndim == 1 else None for _, node in columns
+                }
+                if not columns or len(lengths) != 1 or None in lengths:
+                    return None
+                return {
+                    "kind": "columns",
+                    "columns": [name for name, _ in columns],
+                    "n_rows": int(lengths.pop()),
+                }
+
+        with pd.HDFStore(self.filepath, mode="r") as store:
+            keys = store.keys()
+            if not keys:
+                return None
+
+            storer = store.get_storer(keys[0])
+            n_rows = getattr(storer, "nrows", None)
+            if n_rows is None:
+                shape = getattr(storer, "shape", None)
+                n_rows = shape[0] if shape else None
+            if n_rows is None:
+                return None
+
+            columns = [str(col) for col in store.select(keys[0], stop=0).columns]
+            return {
+                "kind": "pandas",
+                "key": keys[0],
+                "columns": columns,
+                "n_rows": int(n_rows),
+            }
+
+
 class CompressedHandle(BaseHandle):
     def __init__(self, filepath: PathLike):
         super().__init__(filepath)
@@ -221,9 +644,11 @@ class TxtHandle(BaseHandle):
     # Lista com nome das colunas que podem ser str ou int.
     column_names = [Column]
 
-    def __init__(self, filepath: PathLike):
+    def __init__(self, filepath: PathLike, sample: TextSample = None):
         super().__init__(filepath)
 
+        self.sample = sample or TextSample(filepath)
+
         self.delimiter = self.get_delimiter()
 
         self.delim_whitespace = False
@@ -242,16 +667,45 @@ class TxtHandle(BaseHandle):
         # ignores all initial lines that after the split have only string.
         # Acept space as delimiter.
         # Does not accept string values.
-        df = pd.read_csv(
+        df = pd.read_csv(self.filepath, **self.read_csv_kwargs())
+        return df
+
+    def iter_chunks(self, chunksize=DEFAULT_CHUNK_SIZE, columns=None, **kwargs):
+        """Stream the table as DataFrame chunks with bounded memory.
+
+        Extra keyword arguments (e.g. dtype) are passed to pandas.read_csv.
+        """
+        return pd.read_csv(
             self.filepath,
-            delimiter=self.delimiter,
-            skiprows=self.skiprows,
-            names=self.column_names,
-            header=None,
-            delim_whitespace=self.delim_whitespace,
+            chunksize=chunksize,
+            usecols=columns,
+            **self.read_csv_kwargs(),
+            **kwargs,
         )
+
+    def head(self, nrows) -> pd.DataFrame:
+        """First rows of the table, parsed from the sample when it holds them."""
+        df = self.sample.read_csv(nrows=nrows, **self.read_csv_kwargs())
+        if len(df) < nrows and not self.sample.is_complete and self.filepath:
+            df = pd.read_csv(self.filepath, nrows=nrows, **self.read_csv_kwargs())
         return df
 
+    def count_rows(self, use_mmap=False):
+        """Count data rows with a byte scan; None when quoting requires a parse."""
+        return count_text_rows(
+            self.filepath, skip_lines=self.skiprows, use_mmap=use_mmap
+        )
+
+    def read_csv_kwargs(self) -> dict:
+        """Arguments for pandas.read_csv matching the sniffed layout."""
+        return {
+            "delimiter": self.delimiter,
+            "skiprows": self.skiprows,
+            "names": self.column_names,
+            "header": None,
+            "delim_whitespace": self.delim_whitespace,
+        }
+
     def has_header(self) -> bool:
         if self.skiprows == 1:
             return True
@@ -261,22 +715,26 @@ class TxtHandle(BaseHandle):
     def get_column_names(self) -> List[Column]:
         # Tenta ler o nome das colunas apenas para arquivos onde a primeira linha é toda de string.
         if self.has_hd:
-            with open(self.filepath, "r") as fp:
-                line = fp.readline().replace("\r\n", "")
-                if line.startswith("#"):
-                    line = line.strip("#").strip()
+            line = self.sample.first_line
+            if line.startswith("#"):
+                line = line.strip("#").strip()
 
-                columns = [str(i).strip() for i in line.split(self.delimiter)]
+            columns = [str(i).strip() for i in line.split(self.delimiter)]
         else:
             # Cria nomes para as colunas de forma sequencial [0...len(headers)]
             # o Resultado é uma lista de str: ['0', ...,'10',...]
-            df = pd.read_csv(
-                self.filepath,
+            # A quantidade de colunas vem de poucas linhas, nunca do arquivo inteiro.
+            kwargs = dict(
                 delimiter=self.delimiter,
                 skiprows=self.skiprows,
                 header=None,
                 delim_whitespace=self.delim_whitespace,
+                nrows=20,
             )
+            if self.skiprows < len(self.sample.lines) or self.filepath is None:
+                df = self.sample.read_csv(**kwargs)
+            else:
+                df = pd.read_csv(self.filepath, **kwargs)
             columns = [str(i) for i in [*range(0, len(df.iloc[0]))]]
         return columns
 
@@ -286,9 +744,7 @@ class TxtHandle(BaseHandle):
         Returns:
             str: delimiter
         """
-        with open(self.filepath, "r") as csvfile:
-            dt = csvfile.readline().replace("\n", "")
-            delimiter = csv.Sniffer().sniff(dt).delimiter
+        delimiter = csv.Sniffer().sniff(self.sample.first_line).delimiter
 
         if delimiter.isspace():
             return None
@@ -299,12 +755,11 @@ class TxtHandle(BaseHandle):
         self,
     ):
         count = 0
-        with open(self.filepath, "r") as f:
-            for line in f:
-                if line.startswith("#") or self.is_line_str(line.strip("\r\n")):
-                    count += 1
-                else:
-                    break
+        for line in self.sample.iter_lines():
+            if line.startswith("#") or self.is_line_str(line):
+                count += 1
+            else:
+                break
         return count
 
     def is_line_str(self, line):
@@ -317,8 +772,143 @@ class TxtHandle(BaseHandle):
 
 
 class VOTableHandle(BaseHandle):
+    """VOTable reader.
+
+    TABLEDATA tables are parsed incrementally: rows stream by and are
+    discarded, so memory does not depend on the table size. BINARY, BINARY2
+    and FITS serializations can only be decoded whole by astropy.
+    """
+
+    NUMERIC_DATATYPES = {
+        "short",
+        "int",
+        "long",
+        "float",
+        "double",
+        "unsignedByte",
+    }
+    BINARY_SERIALIZATIONS = {"BINARY", "BINARY2", "FITS"}
+
     def __init__(self, filepath: PathLike):
         super().__init__(filepath)
+        self._structure = None
+
+    def structure(self):
+        """FIELDs and serialization of the first table, read from its head.
+
+        Returns:
+            tuple: (list of (name, datatype), serialization). The
+                serialization is "TABLEDATA" for tables without DATA, and
+                the field list is empty when the file has no table.
+        """
+        if self._structure is not None:
+            return self._structure
+
+        fields = []
+        serialization = "TABLEDATA"
+        in_table = False
+        for event, element in ElementTree.iterparse(
+            str(self.filepath), events=("start", "end")
+        ):
+            tag = element.tag.rsplit("}", 1)[-1]
+            if event == "start":
+                if tag == "TABLE":
+                    in_table = True
+                elif in_table and (
+                    tag == "TABLEDATA" or tag in self.BINARY_SERIALIZATIONS
+                ):
+                    serialization = tag
+                    break
+            elif in_table and tag == "FIELD":
+                fields.append(
+                    (
+                        element.get("name") or element.get("ID"),
+                        element.get("datatype"),
+                    )
+                )
+            elif in_table and tag == "TABLE":
+                break
+
+        self._structure = (fields, serialization)
+        return self._structure
+
+    @property
+    def column_names(self) -> List[Column]:
+        fields, _ = self.structure()
+        return [name for name, _ in fields]
+
+    @property
+    def is_streamable(self) -> bool:
+        fields, serialization = self.structure()
+        return bool(fields) and serialization == "TABLEDATA"
+
+    def iter_rows(self):
+        """Yield the TD texts of each TR of the first TABLEDATA table."""
+        in_table = False
+        tabledata = None
+
+        for event, element in ElementTree.iterparse(
+            str(self.filepath), events=("start", "end")
+        ):
+            tag = element.tag.rsplit("}", 1)[-1]
+
+            if event == "start":
+                if tag == "TABLE":
+                    in_table = True
+                elif tag == "TABLEDATA" and in_table:
+                    tabledata = element
+                continue
+
+            if not in_table:
+                continue
+
+            if tag == "TR":
+                yield [
+                    cell.text
+                    for cell in element
+                    if cell.tag.rsplit("}", 1)[-1] == "TD"
+                ]
+                element.clear()
+                if tabledata is not None:
+                    tabledata.remove(element)
+            elif tag == "TABLE":
+                break
+
+    def rows_to_df(self, rows) -> pd.DataFrame:
+        """DataFrame of TD texts, typed from the FIELD datatypes."""
+        fields, _ = self.structure()
+        df = pd.DataFrame(rows, columns=[name for name, _ in fields])
+        for name, datatype in fields:
+            if datatype in self.NUMERIC_DATATYPES:
+                df[name] = pd.to_numeric(df[name], errors="coerce")
+            elif datatype == "boolean":
+                df[name] = df[name].map(
+                    lambda value: None
+                    if value is None
+                    else str(value).strip().lower() in {"t", "true", "1"}
+                )
+        return df
+
+    def iter_chunks(self, chunksize=DEFAULT_CHUNK_SIZE, columns=None):
+        """Stream the first table as DataFrame chunks.
+
+        Only TABLEDATA tables are streamed with bounded memory; binary
+        serializations are decoded whole and then sliced.
+        """
+        if not self.is_streamable:
+            yield from _slice_frame(self.to_df(), chunksize, columns)
+            return
+
+        rows = []
+        for row in self.iter_rows():
+            rows.append(row)
+            if len(rows) >= chunksize:
+                chunk = self.rows_to_df(rows)
+                yield chunk[columns] if columns else chunk
+                rows = []
+        if rows:
+            chunk = self.rows_to_df(rows)
+            yield chunk[columns] if columns else chunk
 
     def to_df(self, **kwargs) -> pd.DataFrame:
         # Read VOTable file using astropy
@@ -328,3 +918,11 @@ class VOTableHandle(BaseHandle):
         # Convert to pandas DataFrame
         df = table.to_table().to_pandas()
         return df
+
+
+def _slice_frame(df, chunksize, columns=None):
+    """Yield an in-memory DataFrame as chunks, for readers without slicing."""
+    df.columns = [str(col) for col in df.columns]
+    for start in range(0, len(df), chunksize):
+        chunk = df.iloc[start : start + chunksize].reset_index(drop=True)
+        yield chunk[columns] if columns else chunk
@@ -1,14 +1,18 @@
 import logging
+import os
 import pathlib
 import time
 from json import dumps, loads
 
-from core.file_utils import get_file_extension
+from core.file_utils import file_fingerprint, get_file_extension
 from core.models import Product, ProductContent, ProductFile
 from core.product_handle import NotTableError
 from core.serializers import ProductSerializer
+from core.services.product_download import ProductDownloadArchiveService
 from core.table_data_collector import MainTableDataCollector
+from core.table_preview import TablePreviewCache, TablePreviewFile
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 
 LOGGER = logging.getLogger("products")
@@ -183,10 +187,17 @@ class CreateProduct:
 
 
 class RegistryProduct:
-    TABLE_PREVIEW_FILENAME = "__table_preview.json"
+    TABLE_PREVIEW_FILENAME = "__table_preview.arrow"
+    TABLE_PREVIEW_SAMPLE_FILENAME = "__table_preview_sample.arrow"
+    LEGACY_TABLE_PREVIEW_FILENAME = "__table_preview.json"
+    TABLE_METADATA_FILENAME = "__table_metadata.json"
     TABLE_PREVIEW_PROCESSING_FILENAME = "__table_preview.processing"
     TABLE_PREVIEW_PROCESSING_TTL_SECONDS = 1800
     TABLE_PREVIEW_ROWS = 10
+    # Previews parsed by this process, shared by every read_data request.
+    table_preview_cache = TablePreviewCache(
+        getattr(settings, "PRODUCT_TABLE_PREVIEW_CACHE_MAX_BYTES", 0)
+    )
     TABULAR_SUFFIXES = {
         ".csv",
         ".txt",
@@ -211,6 +222,7 @@ class RegistryProduct:
 
     def __init__(self, product_id):
         self.main_file = None
+        self._collector = None
 
         LOGGER.debug("Product ID: [%s]" % product_id)
         self.product = Product.objects.get(pk=product_id)
@@ -242,6 +254,7 @@ class RegistryProduct:
             self.validate_main_file_business_rules()
 
             product_columns = list()
+            column_stats = dict()
             table_data = None
             requires_tabular_main_file = (
                 self.product.product_type.name
@@ -264,6 +277,7 @@ class RegistryProduct:
 
             if table_data:
                 product_columns = table_data["columns"]
+                column_stats = table_data.get("column_stats") or dict()
                 if table_data["n_rows"] is not None:
                     mf.n_rows = table_data["n_rows"]
                     ProductFile.objects.filter(pk=mf.pk).update(
@@ -272,6 +286,11 @@ class RegistryProduct:
                     )
                     LOGGER.debug("Number of rows: %s", str(mf.n_rows))
 
+                mf.duplicate_estimates = table_data.get("duplicate_estimates")
+                ProductFile.objects.filter(pk=mf.pk).update(
+                    duplicate_estimates=mf.duplicate_estimates
+                )
+
             # Verifica se o product type é redshift_catalog
             # Para esses produtos é mandatório ter acesso as colunas da tabela
             # Para os demais produtos é opicional.
@@ -289,14 +308,24 @@ class RegistryProduct:
             # é possivel ter produtos sem nenhum registro de coluna
             # Essa regra será tratada no frontend.
 
-            product_columns = {v: dict() for v in product_columns}
+            product_columns = {
+                v: {"statistics": column_stats.get(v)} for v in product_columns
+            }
 
-            self.create_product_contents(product_columns)
-            LOGGER.debug("Created product contents.")
+            if table_data and table_data.get("cached") and self._contents_match(
+                product_columns
+            ):
+                LOGGER.debug("Main file unchanged; keeping product contents.")
+            else:
+                self.create_product_contents(product_columns)
+                LOGGER.debug("Created product contents.")
 
             # Salva as alterações feitas no model product
             self.product.save()
 
+            # Atualiza o snapshot usado nas assinaturas de download.
+            ProductDownloadArchiveService.refresh_source_snapshot(self.product)
+
         except Exception as e:
             LOGGER.error(e)
             raise Exception(e)
@@ -307,11 +336,7 @@ class RegistryProduct:
         if product_type_name not in self.TABULAR_MAIN_FILE_REQUIRED_PRODUCT_TYPES:
             return
 
-        collector = MainTableDataCollector(
-            main_file=self._load_main_file(),
-            preview_rows=self.TABLE_PREVIEW_ROWS,
-            tabular_suffixes=self.TABULAR_SUFFIXES,
-        )
+        collector = self._create_collector(self._load_main_file())
 
         if not collector.is_compressed_main_file():
             return
@@ -341,11 +366,7 @@ class RegistryProduct:
             self.main_file = current_main_file
             return
 
-        collector = MainTableDataCollector(
-            main_file=current_main_file,
-            preview_rows=self.TABLE_PREVIEW_ROWS,
-            tabular_suffixes=self.TABULAR_SUFFIXES,
-        )
+        collector = self._create_collector(current_main_file)
 
         if not collector.is_compressed_main_file():
             return
@@ -427,11 +448,18 @@ class RegistryProduct:
 
     @classmethod
     def get_table_preview_path(cls, product):
-        """Build the absolute path to the cached table preview JSON file."""
+        """Build the absolute path to the cached table preview (Arrow IPC) file."""
         return pathlib.Path(
             settings.MEDIA_ROOT, product.path, cls.TABLE_PREVIEW_FILENAME
         )
 
+    @classmethod
+    def get_table_preview_sample_path(cls, product):
+        """Build the absolute path to the cached random sample preview file."""
+        return pathlib.Path(
+            settings.MEDIA_ROOT, product.path, cls.TABLE_PREVIEW_SAMPLE_FILENAME
+        )
+
     @classmethod
     def get_table_preview_processing_path(cls, product):
         """Build the absolute path to the table preview processing marker file."""
@@ -439,6 +467,25 @@ class RegistryProduct:
             settings.MEDIA_ROOT, product.path, cls.TABLE_PREVIEW_PROCESSING_FILENAME
         )
 
+    @classmethod
+    def open_table_preview(cls, product, kind="head"):
+        """Open the cached table preview through the in-process LRU cache.
+
+        Args:
+            kind (str): "head" for the first rows or "sample" for the random
+                sample, which falls back to the head preview when missing.
+
+        Returns:
+            TablePreviewFile: Preview shared with other requests; callers
+            must not close it.
+        """
+        preview_path = cls.get_table_preview_path(product)
+        if kind == "sample":
+            sample_path = cls.get_table_preview_sample_path(product)
+            if sample_path.exists():
+                return cls.table_preview_cache.get(product.pk, sample_path, kind)
+        return cls.table_preview_cache.get(product.pk, preview_path, "head")
+
     @classmethod
     def start_table_preview_processing(cls, product):
         """Create a processing marker atomically.
@@ -478,9 +525,14 @@ class RegistryProduct:
         return True
 
     def remove_table_preview(self):
-        """Delete any existing cached table preview file for the product."""
-        preview_path = self.get_table_preview_path(self.product)
-        preview_path.unlink(missing_ok=True)
+        """Delete any existing cached table preview files for the product."""
+        self.table_preview_cache.invalidate(self.product.pk)
+        self.get_table_preview_path(self.product).unlink(missing_ok=True)
+        self.get_table_preview_sample_path(self.product).unlink(missing_ok=True)
+        self.get_table_metadata_path(self.product).unlink(missing_ok=True)
+        pathlib.Path(
+            settings.MEDIA_ROOT, self.product.path, self.LEGACY_TABLE_PREVIEW_FILENAME
+        ).unlink(missing_ok=True)
 
     def _load_main_file(self):
         """Load and cache the absolute path of the product main file."""
@@ -490,67 +542,249 @@ class RegistryProduct:
             LOGGER.debug("Main File: [%s]" % self.main_file)
         return self.main_file
 
-    def build_table_preview(self):
-        """Collect tabular metadata and update the preview cache.
+    def _create_collector(self, main_file):
+        """Create a table data collector configured from settings.
 
-        Returns:
-            dict: Table metadata with keys `preview_df`, `columns`, and `n_rows`.
+        The collector is reused while the main file path does not change, so
+        the extraction, validation and preview steps share one archive index.
         """
-        main_file = self._load_main_file()
-        collector = MainTableDataCollector(
+        main_file = pathlib.Path(main_file)
+        if self._collector is not None and self._collector.main_file == main_file:
+            return self._collector
+
+        self._collector = MainTableDataCollector(
             main_file=main_file,
             preview_rows=self.TABLE_PREVIEW_ROWS,
             tabular_suffixes=self.TABULAR_SUFFIXES,
+            extraction_workers=getattr(
+                settings, "PRODUCT_ARCHIVE_EXTRACTION_WORKERS", 1
+            ),
+            csv_engine=getattr(settings, "PRODUCT_CSV_READER_ENGINE", "pandas"),
+            csv_block_size=getattr(settings, "PRODUCT_CSV_READER_BLOCK_SIZE", None),
+            row_count_mmap=getattr(settings, "PRODUCT_ROW_COUNT_USE_MMAP", False),
+            sample_rows=self.product.product_type.preview_sample_rows,
+            column_profile=getattr(settings, "PRODUCT_COLUMN_PROFILING", False),
+            # Aliases from a previous registration take precedence over the
+            # column names when picking the ID, RA/Dec and z columns.
+            column_aliases=dict(
+                self.product.contents.exclude(alias=None).values_list(
+                    "column_name", "alias"
+                )
+            ),
+            position_precision=getattr(
+                settings, "PRODUCT_POSITION_DUPLICATE_PRECISION_ARCSEC", None
+            ),
         )
+        return self._collector
+
+    def build_table_preview(self, force=False):
+        """Collect tabular metadata and update the preview cache.
+
+        When the main file fingerprint matches the one recorded by the last
+        scan and the preview files are still there, the metadata of that
+        scan is returned instead of reading the file again.
+
+        Args:
+            force (bool): Scan the main file even if it has not changed.
+
+        Returns:
+            dict: Table metadata with keys `preview_df`, `columns`, and `n_rows`.
+                Metadata reused from the last scan has `cached` set and no
+                `preview_df`.
+        """
+        main_file = self._load_main_file()
+        fingerprint = file_fingerprint(main_file)
+        if not force:
+            table_data = self.load_cached_table_data(fingerprint)
+            if table_data is not None:
+                LOGGER.debug("Main file unchanged; reusing table metadata.")
+                return table_data
+
+        collector = self._create_collector(main_file)
         table_data = collector.collect()
-        self.create_table_preview(table_data["preview_df"])
+        self.create_table_preview(
+            table_data["preview_df"], df_sample=table_data.get("sample_df")
+        )
+        self.store_table_metadata(table_data, fingerprint)
         return table_data
 
-    def create_table_preview(self, df_preview):
-        """Persist the table preview payload to a JSON file.
+    @classmethod
+    def get_table_metadata_path(cls, product):
+        """Build the absolute path to the metadata of the last main file scan."""
+        return pathlib.Path(
+            settings.MEDIA_ROOT, product.path, cls.TABLE_METADATA_FILENAME
+        )
+
+    def _table_metadata_key(self):
+        """Collector options that change the metadata besides the file content."""
+        collector = self._create_collector(self._load_main_file())
+        return loads(
+            dumps(
+                {
+                    "preview_rows": collector.preview_rows,
+                    "sample_rows": collector.sample_rows,
+                    "column_profile": collector.column_profile,
+                    "column_aliases": collector.column_aliases,
+                    "position_precision": collector.position_precision,
+                },
+                sort_keys=True,
+            )
+        )
+
+    def load_cached_table_data(self, fingerprint):
+        """Metadata of the last scan, if it was taken from the same content.
+
+        Returns:
+            dict | None: Table metadata, or None when the main file, the
+                collector options or the preview files changed.
+        """
+        main_file = self.product.files.filter(role=0).first()
+        if main_file is None or not fingerprint or main_file.fingerprint != fingerprint:
+            return None
+
+        if not self.get_table_preview_path(self.product).exists():
+            return None
+
+        try:
+            metadata = loads(
+                self.get_table_metadata_path(self.product).read_text(encoding="utf-8")
+            )
+        except (OSError, ValueError):
+            return None
+
+        key = self._table_metadata_key()
+        if metadata.get("fingerprint") != fingerprint or metadata.get("key") != key:
+            return None
+        if key["sample_rows"] and not self.get_table_preview_sample_path(
+            self.product
+        ).exists():
+            return None
+
+        return {
+            "preview_df": None,
+            "columns": metadata["columns"],
+            "n_rows": metadata["n_rows"],
+            "column_stats": metadata.get("column_stats"),
+            "duplicate_estimates": metadata.get("duplicate_estimates"),
+            "cached": True,
+        }
+
+    def store_table_metadata(self, table_data, fingerprint):
+        """Record the metadata of a scan together with the main file fingerprint."""
+        metadata_path = self.get_table_metadata_path(self.product)
+        metadata = {
+            "fingerprint": fingerprint,
+            "key": self._table_metadata_key(),
+            "columns": [str(column) for column in table_data["columns"]],
+            "n_rows": table_data["n_rows"],
+            "column_stats": table_data.get("column_stats"),
+            "duplicate_estimates": table_data.get("duplicate_estimates"),
+        }
+
+        temp_path = metadata_path.with_name(f".{metadata_path.name}.tmp")
+        temp_path.write_text(dumps(metadata), encoding="utf-8")
+        os.replace(temp_path, metadata_path)
+        ProductFile.objects.filter(product=self.product, role=0).update(
+            fingerprint=fingerprint
+        )
+
+    def _contents_match(self, columns):
+        """True if the registered contents already hold these columns and statistics."""
+        registered = list(
+            self.product.contents.order_by("order").values_list(
+                "column_name", "statistics"
+            )
+        )
+        expected = [
+            (column_name, values.get("statistics"))
+            for column_name, values in columns.items()
+        ]
+        return registered == expected
+
+    def create_table_preview(self, df_preview, df_sample=None):
+        """Persist the table preview as columnar Arrow IPC files.
 
         Args:
             df_preview (pandas.DataFrame): DataFrame containing preview rows.
+            df_sample (pandas.DataFrame, optional): Rows randomly sampled
+                from the whole table, stored in a separate file.
         """
-        payload = {
-            "count": int(df_preview.shape[0]),
-            "columns": list(df_preview.columns),
-            "results": loads(df_preview.to_json(orient="records")),
-        }
         preview_path = self.get_table_preview_path(self.product)
-        preview_path.write_text(dumps(payload), encoding="utf-8")
+        sample_path = self.get_table_preview_sample_path(self.product)
+
+        # Files are replaced atomically, so readers never see a partial preview.
+        TablePreviewFile.write(preview_path, df_preview)
+        if df_sample is not None:
+            TablePreviewFile.write(sample_path, df_sample)
+        else:
+            sample_path.unlink(missing_ok=True)
+        pathlib.Path(
+            settings.MEDIA_ROOT, self.product.path, self.LEGACY_TABLE_PREVIEW_FILENAME
+        ).unlink(missing_ok=True)
+        self.table_preview_cache.invalidate(self.product.pk)
         LOGGER.debug("Table preview generated: %s", preview_path)
 
     def create_product_contents(self, columns):
         """Registrar as colunas na tabela Product Contents
 
+        Existing rows are diffed against the new columns by name: matching
+        rows are updated in place, new columns are bulk created and the
+        remaining rows are removed with a single delete, all in one
+        transaction.
+
         Args:
             columns (dict): columns mapping
         """
         try:
-            cached_ucds = dict()
-
-            # Remove todas as colunas caso exista
-            for col in self.product.contents.all():
-                # Caso a coluna tenha valor de UCD esse sera mantido ao recriar a coluna com mesmo nome
-                cached_ucds[col.column_name] = {"ucd": col.ucd, "alias": col.alias}
-                col.delete()
-
-            for idx, column_name in enumerate(columns):
-                ucd = columns.get(column_name, {}).get("ucd", None)
-                alias = columns.get(column_name, {}).get("alias", None)
-
-                if column_name in cached_ucds and not ucd and not alias:
-                    ucd = cached_ucds[column_name]["ucd"]
-                    alias = cached_ucds[column_name]["alias"]
-
-                ProductContent.objects.create(
-                    product=self.product,
-                    column_name=column_name,
-                    order=idx,
-                    ucd=ucd,
-                    alias=alias,
-                )
+            with transaction.atomic():
+                existing = dict()
+                stale_ids = list()
+                for col in self.product.contents.select_for_update().order_by("pk"):
+                    if col.column_name in existing:
+                        stale_ids.append(col.pk)
+                    else:
+                        existing[col.column_name] = col
+
+                to_create = list()
+                to_update = list()
+                update_fields = ("order", "ucd", "alias", "statistics")
+
+                for idx, column_name in enumerate(columns):
+                    ucd = columns.get(column_name, {}).get("ucd", None)
+                    alias = columns.get(column_name, {}).get("alias", None)
+                    statistics = columns.get(column_name, {}).get("statistics", None)
+
+                    col = existing.pop(str(column_name), None)
+                    if col is None:
+                        to_create.append(
+                            ProductContent(
+                                product=self.product,
+                                column_name=column_name,
+                                order=idx,
+                                ucd=ucd,
+                                alias=alias,
+                                statistics=statistics,
+                            )
+                        )
+                        continue
+
+                    # Caso a coluna tenha valor de UCD esse sera mantido
+                    # ao registrar novamente a coluna com mesmo nome
+                    if not ucd and not alias:
+                        ucd, alias = col.ucd, col.alias
+
+                    values = (idx, ucd, alias, statistics)
+                    if values != tuple(getattr(col, f) for f in update_fields):
+                        col.order, col.ucd, col.alias, col.statistics = values
+                        to_update.append(col)
+
+                stale_ids.extend(col.pk for col in existing.values())
+                if stale_ids:
+                    ProductContent.objects.filter(pk__in=stale_ids).delete()
+                if to_update:
+                    ProductContent.objects.bulk_update(to_update, update_fields)
+                if to_create:
+                    ProductContent.objects.bulk_create(to_create)
 
             LOGGER.debug(f"{len(columns)} product contents have been registered")
 
@@ -11,3 +11,4 @@ class ProductContentSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductContent
         fields = "__all__"
+        read_only_fields = ("statistics",)
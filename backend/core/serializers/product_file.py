@@ -23,6 +23,8 @@ class ProductFileSerializer(serializers.ModelSerializer):
             "n_rows",
             "extension",
             "is_directory",
+            "duplicate_estimates",
+            "fingerprint",
         )
         fields = "__all__"
 
@@ -1,4 +1,18 @@
 from .access_control import AccessControlService
 from .product_download import ProductDownloadArchiveService
+from .product_export import InvalidExportRequest, ProductExportService
+from .product_table_query import (
+    InvalidTableQuery,
+    ProductTableQuery,
+    ProductTableQueryService,
+)
 
-__all__ = ["AccessControlService", "ProductDownloadArchiveService"]
+__all__ = [
+    "AccessControlService",
+    "InvalidExportRequest",
+    "InvalidTableQuery",
+    "ProductDownloadArchiveService",
+    "ProductExportService",
+    "ProductTableQuery",
+    "ProductTableQueryService",
+]
@@ -1,3 +1,4 @@
+import contextlib
 import hashlib
 import json
 import os
@@ -13,10 +14,19 @@ import yaml
 from core.models import (
     FileRoles,
     Product,
+    ProductDownloadArchive,
     ProductDownloadArchiveStatus,
     ProductFile,
+    ProductSourceSnapshot,
     ProductStatus,
 )
+from core.zip_stream import (
+    DEFAULT_STORED_EXTENSIONS,
+    ZIP_STORED,
+    ZipStreamWriter,
+    compression_for,
+    iter_zip,
+)
 from django.conf import settings
 from django.core import signing
 from django.utils import timezone
@@ -30,16 +40,29 @@ class ProductDownloadArchiveService:
     def prepare_archive(cls, archive):
         product = archive.product
         product_path = pathlib.Path(settings.MEDIA_ROOT, product.path)
-        output_dir = cls.get_archive_output_dir(product)
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        source_signature = cls.build_source_signature(product_path)
+        # A fresh walk: the archive must match the files on disk, and the
+        # persisted snapshot is refreshed along the way.
+        cached_snapshot = cls.refresh_source_snapshot(product)
+        snapshot = cached_snapshot.files
+        source_signature = cached_snapshot.signature
         metadata = cls.build_product_metadata(product)
-        zip_path = cls.build_zip(
+        archive_key = cls.build_archive_key(source_signature)
+        source_snapshot = {
+            "compression": cls.get_compression_settings(),
+            "files": snapshot,
+        }
+
+        # Holding the key before looking up the blob makes this archive a
+        # reference to it, so a concurrent cleanup will not delete it.
+        archive.archive_key = archive_key
+        archive.save(update_fields=["archive_key", "updated_at"])
+
+        zip_path, checksum = cls.get_or_build_archive_blob(
+            archive_key,
             product.internal_name,
             product_path,
             metadata,
-            output_dir,
+            previous=cls.find_previous_archive(archive, source_snapshot),
         )
         archive_path = cls.get_archive_relative_path(zip_path)
         now = timezone.now()
@@ -48,8 +71,9 @@ class ProductDownloadArchiveService:
         archive.archive_path = archive_path
         archive.filename = zip_path.name
         archive.size = zip_path.stat().st_size
-        archive.checksum = cls.build_file_checksum(zip_path)
+        archive.checksum = checksum
         archive.source_signature = source_signature
+        archive.source_snapshot = source_snapshot
         archive.source_updated_at = now
         archive.error_message = None
         archive.save(
@@ -60,6 +84,7 @@ class ProductDownloadArchiveService:
                 "size",
                 "checksum",
                 "source_signature",
+                "source_snapshot",
                 "source_updated_at",
                 "error_message",
                 "updated_at",
@@ -68,6 +93,40 @@ class ProductDownloadArchiveService:
 
         return archive
 
+    @classmethod
+    def find_previous_archive(cls, archive, source_snapshot):
+        """Archive whose unchanged members can be reused.
+
+        A blob with the same key, whichever product it was built for, holds
+        every member already; otherwise the latest ready archive of the
+        product built with the same compression settings is used.
+
+        Returns:
+            tuple | None: (zip path, snapshot files) or None.
+        """
+        shared_blob = cls.find_archive_blob(archive.archive_key)
+        if shared_blob is not None:
+            return shared_blob, source_snapshot["files"]
+
+        archives = (
+            archive.product.download_archives.filter(
+                status=ProductDownloadArchiveStatus.READY,
+                source_snapshot__isnull=False,
+            )
+            .exclude(pk=archive.pk)
+            .order_by("-updated_at")
+        )
+
+        for previous in archives:
+            previous_snapshot = previous.source_snapshot
+            if previous_snapshot.get("compression") != source_snapshot["compression"]:
+                continue
+            if not cls.archive_file_exists(previous):
+                continue
+            return cls.get_archive_file_path(previous), previous_snapshot["files"]
+
+        return None
+
     @classmethod
     def prepare_main_file_archive(cls, archive):
         product = archive.product
@@ -101,24 +160,293 @@ class ProductDownloadArchiveService:
         return archive
 
     @classmethod
-    def build_zip(cls, internal_name, product_path, metadata, output_dir):
+    def build_zip(
+        cls, internal_name, product_path, metadata, output_dir, previous=None
+    ):
+        """Write the product archive to a new file in output_dir.
+
+        The metadata member is dated after the newest source file rather
+        than the build time, so two builds of the same sources and metadata
+        are byte-identical.
+
+        Args:
+            previous (tuple | None): (zip path, snapshot files) of an earlier
+                archive. Members whose size and mtime did not change are
+                copied from it without being compressed again.
+        """
         product_path = pathlib.Path(product_path)
         output_dir = pathlib.Path(output_dir)
         zip_path = output_dir / f"{internal_name}_{secrets.token_hex(16)}.zip"
+        members = list(cls.iter_zip_members(product_path))
+
+        with contextlib.ExitStack() as stack:
+            output = stack.enter_context(open(zip_path, "wb"))
+            writer = stack.enter_context(cls.open_zip_writer(output))
+            writer.write_bytes(
+                cls.metadata_filename,
+                cls._dump_metadata(metadata).encode("utf-8"),
+                mtime=max(
+                    (file_path.stat().st_mtime for file_path, _, _ in members),
+                    default=0,
+                ),
+            )
 
-        with zipfile.ZipFile(
-            zip_path,
-            "w",
-            compression=zipfile.ZIP_DEFLATED,
-            compresslevel=cls.get_compression_level(),
-        ) as zip_handle:
-            zip_handle.writestr(cls.metadata_filename, cls._dump_metadata(metadata))
-
-            for file_path, arcname in cls.iter_source_files(product_path):
-                zip_handle.write(file_path, arcname=arcname)
+            reusable = {}
+            if previous is not None:
+                previous_path, previous_files = previous
+                try:
+                    previous_zip = stack.enter_context(zipfile.ZipFile(previous_path))
+                    previous_handle = stack.enter_context(open(previous_path, "rb"))
+                except (OSError, zipfile.BadZipFile):
+                    # The previous archive is gone or damaged: build from scratch.
+                    previous_zip = None
+                if previous_zip is not None:
+                    reusable = cls._reusable_members(previous_zip, previous_files)
+
+            pending = []
+            for file_path, arcname, method in members:
+                info, source_stat = reusable.get(arcname, (None, None))
+                stat = file_path.stat()
+                if (
+                    info is None
+                    or info.compress_type != method
+                    or (stat.st_size, stat.st_mtime_ns) != source_stat
+                ):
+                    pending.append((file_path, arcname, method))
+                    continue
+
+                writer.write_files(pending)
+                pending = []
+                writer.copy_member(previous_handle, info)
+
+            writer.write_files(pending)
 
         return zip_path
 
+    @classmethod
+    def _reusable_members(cls, previous_zip, previous_files):
+        members = {}
+
+        for item in previous_files:
+            try:
+                info = previous_zip.getinfo(item["path"])
+            except KeyError:
+                continue
+            members[item["path"]] = (info, (item["size"], item["mtime_ns"]))
+
+        return members
+
+    @classmethod
+    def build_archive_key(cls, source_signature):
+        """Content address of the source members of a product archive.
+
+        Archives built from the same source snapshot and compression
+        settings hold the same compressed members, whichever product they
+        belong to. The product metadata is left out: each metadata version
+        gets its own blob under the key, see get_archive_blob_path.
+        """
+        payload = json.dumps(
+            {
+                "source_signature": source_signature,
+                **cls.get_compression_settings(),
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def get_archive_store_root(cls):
+        return cls.get_archive_root() / "store"
+
+    @classmethod
+    def get_archive_blob_dir(cls, archive_key):
+        return cls.get_archive_store_root() / archive_key[:2] / archive_key
+
+    @classmethod
+    def get_archive_blob_path(cls, archive_key, internal_name, metadata):
+        """Blob of one product and metadata version under a key.
+
+        The archive embeds the product metadata and is served as a single
+        file, so blobs are shared by the archives of one product version,
+        across users and prepares, but not across products. Products with
+        the same sources share the key, and a new blob copies the
+        compressed members of another one instead of compressing them
+        again (see find_previous_archive).
+        """
+        metadata_digest = hashlib.sha256(
+            cls._dump_metadata(metadata).encode("utf-8")
+        ).hexdigest()
+        return (
+            cls.get_archive_blob_dir(archive_key)
+            / metadata_digest
+            / f"{internal_name}.zip"
+        )
+
+    @classmethod
+    def find_archive_blob(cls, archive_key):
+        """Any blob built under the key, whatever its metadata."""
+        if not archive_key:
+            return None
+
+        blob_dir = cls.get_archive_blob_dir(archive_key)
+        if not blob_dir.is_dir():
+            return None
+
+        return next(iter(sorted(blob_dir.glob("*/*.zip"))), None)
+
+    @classmethod
+    def get_or_build_archive_blob(
+        cls, archive_key, internal_name, product_path, metadata, previous=None
+    ):
+        """Path and checksum of the archive blob, building it when missing.
+
+        Returns:
+            tuple: (pathlib.Path, str) with the blob path and its sha256.
+        """
+        blob_path = cls.get_archive_blob_path(archive_key, internal_name, metadata)
+        if blob_path.is_file():
+            return blob_path, cls.get_blob_checksum(blob_path)
+
+        # Built out of the blob directory so a partial file is never found.
+        building_dir = cls.get_archive_store_root() / "tmp"
+        building_dir.mkdir(parents=True, exist_ok=True)
+        zip_path = cls.build_zip(
+            internal_name, product_path, metadata, building_dir, previous=previous
+        )
+
+        # A concurrent prepare may publish the same blob first: the link
+        # never replaces it, so the size and checksum other archives
+        # recorded keep matching the file.
+        try:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            os.link(zip_path, blob_path)
+        except FileExistsError:
+            return blob_path, cls.get_blob_checksum(blob_path)
+        finally:
+            zip_path.unlink(missing_ok=True)
+
+        return blob_path, cls.build_file_checksum(blob_path)
+
+    @classmethod
+    def get_blob_checksum(cls, blob_path):
+        """Checksum recorded for a published blob, computed when missing."""
+        checksum = (
+            ProductDownloadArchive.objects.filter(
+                archive_path=cls.get_archive_relative_path(blob_path),
+                status=ProductDownloadArchiveStatus.READY,
+                checksum__isnull=False,
+            )
+            .values_list("checksum", flat=True)
+            .first()
+        )
+        return checksum or cls.build_file_checksum(blob_path)
+
+    @classmethod
+    def cleanup_archive_store(cls, grace_seconds=3600):
+        """Delete blobs no archive references anymore.
+
+        Under a key still in use, blobs of older metadata versions go once
+        no archive points at them and no prepare holds the key.
+
+        Blobs and partial builds younger than `grace_seconds` are kept, as
+        a prepare may be about to reference them.
+
+        Returns:
+            int: Number of deleted files.
+        """
+        store_root = cls.get_archive_store_root()
+        if not store_root.is_dir():
+            return 0
+
+        deadline = time.time() - grace_seconds
+        deleted_files = 0
+
+        for file_path in (store_root / "tmp").glob("*"):
+            if file_path.is_file() and file_path.stat().st_mtime < deadline:
+                file_path.unlink(missing_ok=True)
+                deleted_files += 1
+
+        for blob_dir in store_root.glob("*/*"):
+            if blob_dir.parent.name == "tmp" or not blob_dir.is_dir():
+                continue
+            references = ProductDownloadArchive.objects.filter(
+                archive_key=blob_dir.name
+            )
+            if references.filter(
+                status__in=[
+                    ProductDownloadArchiveStatus.PENDING,
+                    ProductDownloadArchiveStatus.RUNNING,
+                ]
+            ).exists():
+                continue
+            referenced_paths = set(references.values_list("archive_path", flat=True))
+
+            for file_path in blob_dir.rglob("*.zip"):
+                if file_path.stat().st_mtime >= deadline:
+                    continue
+                if cls.get_archive_relative_path(file_path) in referenced_paths:
+                    continue
+                file_path.unlink(missing_ok=True)
+                deleted_files += 1
+
+            variant_dirs = [path for path in blob_dir.iterdir() if path.is_dir()]
+            for directory in [*variant_dirs, blob_dir]:
+                try:
+                    directory.rmdir()
+                except OSError:
+                    pass
+
+        return deleted_files
+
+    @classmethod
+    def stream_zip(cls, product, stored=False):
+        """ZIP of the product built while it is sent, without staging it
+        under PRODUCT_DOWNLOAD_ROOT.
+
+        Args:
+            product (Product): Product to download.
+            stored (bool): Store every member instead of applying the
+                per-extension policy, which makes the size known upfront.
+
+        Returns:
+            tuple: (Iterator[bytes], int | None) with the archive chunks and
+                its exact size, or None when any member is deflated.
+        """
+        product_path = pathlib.Path(settings.MEDIA_ROOT, product.path)
+        metadata = cls._dump_metadata(cls.build_product_metadata(product))
+        metadata = metadata.encode("utf-8")
+        metadata_method = compression_for(
+            cls.metadata_filename, cls.get_stored_extensions()
+        )
+        if stored:
+            metadata_method = ZIP_STORED
+        # Sizes are measured once; stored members are checked against them
+        # while streaming, so a file changed meanwhile aborts the response
+        # instead of contradicting its Content-Length.
+        files = [
+            (path, arcname, ZIP_STORED if stored else method, path.stat().st_size)
+            for path, arcname, method in cls.iter_zip_members(product_path)
+        ]
+
+        content_length = None
+        if metadata_method == ZIP_STORED and all(
+            method == ZIP_STORED for _, _, method, _ in files
+        ):
+            content_length = ZipStreamWriter.measure_stored(
+                [(cls.metadata_filename, len(metadata))]
+                + [(arcname, size) for _, arcname, _, size in files]
+            )
+
+        content = iter_zip(
+            files,
+            members=[(cls.metadata_filename, metadata, metadata_method)],
+            compression_level=cls.get_compression_level(),
+            workers=cls.get_zip_workers(),
+        )
+        return content, content_length
+
     @classmethod
     def build_product_metadata(cls, product):
         metadata = {
@@ -208,7 +536,57 @@ class ProductDownloadArchiveService:
 
     @classmethod
     def build_source_signature(cls, product_path):
-        snapshot = cls.build_source_snapshot(product_path)
+        return cls.build_snapshot_signature(cls.build_source_snapshot(product_path))
+
+    @classmethod
+    def get_source_signature(cls, product):
+        """Source signature of a product from its persisted snapshot.
+
+        The snapshot is dropped whenever a ProductFile is saved or deleted
+        and refreshed on registration, so this is a single query. It is
+        rebuilt when missing or when the product directory mtime moved,
+        which catches files added or removed outside the API.
+        """
+        product_path = pathlib.Path(settings.MEDIA_ROOT, product.path)
+        directory_mtime_ns = cls._directory_mtime_ns(product_path)
+        snapshot = ProductSourceSnapshot.objects.filter(product=product).first()
+
+        if snapshot is None or snapshot.directory_mtime_ns != directory_mtime_ns:
+            snapshot = cls.refresh_source_snapshot(product)
+
+        return snapshot.signature
+
+    @classmethod
+    def refresh_source_snapshot(cls, product):
+        """Walk the product files and persist their snapshot.
+
+        Returns:
+            ProductSourceSnapshot: The updated snapshot.
+        """
+        product_path = pathlib.Path(settings.MEDIA_ROOT, product.path)
+        # Read before the walk, so a change made during it is seen next time.
+        directory_mtime_ns = cls._directory_mtime_ns(product_path)
+        files = cls.build_source_snapshot(product_path)
+
+        snapshot, _ = ProductSourceSnapshot.objects.update_or_create(
+            product=product,
+            defaults={
+                "signature": cls.build_snapshot_signature(files),
+                "files": files,
+                "directory_mtime_ns": directory_mtime_ns,
+            },
+        )
+        return snapshot
+
+    @classmethod
+    def _directory_mtime_ns(cls, product_path):
+        try:
+            return product_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def build_snapshot_signature(cls, snapshot):
         payload = json.dumps(snapshot, sort_keys=True, separators=(",", ":"))
 
         return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -305,6 +683,7 @@ class ProductDownloadArchiveService:
             totals["deleted_archives"] += result["deleted_archives"]
             totals["deleted_files"] += result["deleted_files"]
 
+        totals["deleted_files"] += cls.cleanup_archive_store()
         return totals
 
     @classmethod
@@ -314,7 +693,7 @@ class ProductDownloadArchiveService:
         keep_ready_ids = set()
 
         if product_path.exists():
-            current_signature = cls.build_source_signature(product_path)
+            current_signature = cls.get_source_signature(product)
             current_signatures.add(current_signature)
             ready_archive = cls.find_non_expired_ready_archive(
                 product, current_signature
@@ -378,11 +757,30 @@ class ProductDownloadArchiveService:
         if not archive.archive_path:
             return False
 
+        # Blobs in the archive store are shared; only the last reference
+        # removes the file.
+        if (
+            archive.archive_key
+            and ProductDownloadArchive.objects.filter(
+                archive_path=archive.archive_path
+            )
+            .exclude(pk=archive.pk)
+            .exists()
+        ):
+            return False
+
         archive_path = cls.get_archive_file_path(archive)
         if not archive_path.exists():
             return False
 
         archive_path.unlink()
+        if archive.archive_key:
+            blob_dir = cls.get_archive_blob_dir(archive.archive_key)
+            for directory in (archive_path.parent, blob_dir):
+                try:
+                    directory.rmdir()
+                except OSError:
+                    pass
         return True
 
     @classmethod
@@ -483,14 +881,9 @@ class ProductDownloadArchiveService:
         )
 
         try:
-            with zipfile.ZipFile(
-                temporary_zip_path,
-                "w",
-                compression=zipfile.ZIP_DEFLATED,
-                compresslevel=cls.get_compression_level(),
-            ) as zip_handle:
-                for file_path, arcname in cls.iter_source_files(directory_path):
-                    zip_handle.write(file_path, arcname=arcname)
+            with open(temporary_zip_path, "wb") as output:
+                with cls.open_zip_writer(output) as writer:
+                    writer.write_files(cls.iter_zip_members(directory_path))
 
             temporary_zip_path.replace(zip_path)
         finally:
@@ -643,6 +1036,41 @@ class ProductDownloadArchiveService:
     def get_compression_level(cls):
         return getattr(settings, "PRODUCT_DOWNLOAD_COMPRESSION_LEVEL", 6)
 
+    @classmethod
+    def get_zip_workers(cls):
+        return getattr(settings, "PRODUCT_DOWNLOAD_ZIP_WORKERS", 4)
+
+    @classmethod
+    def get_stored_extensions(cls):
+        extensions = getattr(
+            settings, "PRODUCT_DOWNLOAD_STORED_EXTENSIONS", DEFAULT_STORED_EXTENSIONS
+        )
+        return tuple(extensions)
+
+    @classmethod
+    def get_compression_settings(cls):
+        return {
+            "compression_level": cls.get_compression_level(),
+            "stored_extensions": sorted(cls.get_stored_extensions()),
+        }
+
+    @classmethod
+    def open_zip_writer(cls, output):
+        return ZipStreamWriter(
+            output,
+            compression_level=cls.get_compression_level(),
+            workers=cls.get_zip_workers(),
+        )
+
+    @classmethod
+    def iter_zip_members(cls, product_path):
+        """Source files with their ZIP method: already-compressed files are
+        stored, everything else is deflated."""
+        stored_extensions = cls.get_stored_extensions()
+
+        for file_path, arcname in cls.iter_source_files(product_path):
+            yield file_path, arcname, compression_for(arcname, stored_extensions)
+
     @classmethod
     def _dump_metadata(cls, metadata):
         return yaml.dump(
@@ -0,0 +1,482 @@
+import contextlib
+import itertools
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from astropy.io import fits
+from core.models import FileRoles
+from core.product_handle import (
+    DEFAULT_CHUNK_SIZE,
+    CsvHandle,
+    FileHandle,
+    NotTableError,
+    ParquetHandle,
+    TxtHandle,
+    hats_dataset_path,
+)
+
+
+class InvalidExportRequest(ValueError):
+    pass
+
+
+class TableExportSource:
+    """Reads a product main file as a sequence of Arrow tables.
+
+    Every format goes through the chunked readers of product_handle:
+    parquet files and HATS collections as Arrow batches, CSV/TXT, FITS,
+    HDF5 and VOTable as DataFrame chunks, so only one chunk is held in
+    memory at a time. The exceptions are the layouts those readers can
+    only decode whole (binary VOTables, unrecognized HDF5 layouts).
+    """
+
+    # Column kinds, ordered from the narrowest to the widest.
+    KINDS = ("bool", "int", "float", "str")
+    TEXT_DTYPES = {"bool": "boolean", "int": "Int64", "float": "float64", "str": "string"}
+    ARROW_TYPES = {
+        "bool": pa.bool_(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "str": pa.string(),
+    }
+    BOOL_VALUES = {"True", "False", "true", "false", "TRUE", "FALSE"}
+
+    def __init__(self, path, is_directory=False, chunksize=None):
+        """
+        Args:
+            path (str | pathlib.Path): Main file path or HATS root directory.
+            is_directory (bool): True when the main file is a HATS collection.
+            chunksize (int | None): Rows per chunk, DEFAULT_CHUNK_SIZE by default.
+
+        Raises:
+            NotTableError: If the file type has no chunked reader.
+        """
+        self.path = pathlib.Path(path)
+        self.chunksize = chunksize or DEFAULT_CHUNK_SIZE
+
+        if is_directory:
+            self.handle = ParquetHandle(hats_dataset_path(self.path))
+        else:
+            self.handle = FileHandle(self.path).handle
+        if not hasattr(self.handle, "iter_chunks"):
+            raise NotTableError("The main file cannot be exported as a table.")
+
+        self._columns = None
+
+    @property
+    def is_text(self):
+        return isinstance(self.handle, (CsvHandle, TxtHandle))
+
+    @property
+    def columns(self):
+        """Column names of the main file."""
+        if self._columns is None:
+            columns = [str(c) for c in self.handle.column_names]
+            if not columns:
+                # Layouts the reader cannot describe without decoding them.
+                with contextlib.closing(self.handle.iter_chunks(self.chunksize)) as chunks:
+                    first = next(iter(chunks), None)
+                columns = [str(c) for c in first.columns] if first is not None else []
+            self._columns = columns
+        return self._columns
+
+    def iter_tables(self, columns=None, kinds=None):
+        """Yield the main file as Arrow tables of at most `chunksize` rows.
+
+        Args:
+            columns (list[str] | None): Projection, None for all columns.
+            kinds (dict | None): Column kinds from `scan_layout`. Text chunks
+                are parsed with the matching dtypes, so every chunk has the
+                same schema.
+        """
+        columns = columns or self.columns
+        if isinstance(self.handle, ParquetHandle):
+            yield from self.handle.iter_tables(self.chunksize, columns)
+            return
+
+        options = {}
+        schema = None
+        if self.is_text and kinds is not None:
+            options["dtype"] = {c: self.TEXT_DTYPES[kinds[c]] for c in columns}
+            schema = self.schema_for(columns, kinds)
+
+        for chunk in self._iter_frames(columns, **options):
+            yield pa.Table.from_pandas(chunk[columns], schema=schema, preserve_index=False)
+
+    def iter_typed_tables(self, columns=None):
+        """Yield the main file as Arrow tables that all share one schema.
+
+        Text files are read once, as raw strings: the column kinds are
+        guessed from the first chunk and every chunk is cast to them, so
+        later integers fit a float column and any value a string column.
+        Other formats carry their types and go through `iter_tables`.
+
+        Raises:
+            NotTableError: If a later chunk holds a value the type guessed
+                from the first chunk cannot represent. It is raised before
+                that chunk is yielded.
+        """
+        columns = columns or self.columns
+        if not self.is_text:
+            yield from self.iter_tables(columns)
+            return
+
+        schema = None
+        for chunk in self._iter_frames(columns, dtype=str):
+            if schema is None:
+                kinds = {}
+                for column in columns:
+                    values = chunk[column].dropna()
+                    kinds[column] = "str" if values.empty else self._text_kind(values)
+                schema = self.schema_for(columns, kinds)
+            yield self._cast_text_chunk(chunk, schema)
+
+    def _cast_text_chunk(self, chunk, schema):
+        arrays = []
+        for field in schema:
+            values = pa.array(chunk[field.name], type=pa.string(), from_pandas=True)
+            if not pa.types.is_string(field.type):
+                try:
+                    values = pc.cast(pc.utf8_trim_whitespace(values), field.type)
+                except pa.ArrowInvalid as error:
+                    raise NotTableError(
+                        f"Column '{field.name}' holds values that do not fit the "
+                        f"{field.type} type found in its first {self.chunksize} rows."
+                    ) from error
+            arrays.append(values)
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def scan_layout(self, columns=None):
+        """Read the whole table once to find column kinds and string widths.
+
+        Returns:
+            tuple: (n_rows, kinds, widths) where kinds maps each column to
+                one of KINDS and widths holds the longest UTF-8 value.
+        """
+        columns = columns or self.columns
+        kinds = {}
+        widths = dict.fromkeys(columns, 0)
+        n_rows = 0
+
+        if self.is_text:
+            # Raw strings keep the exact text width; the kind is inferred
+            # the way pandas would, but over the whole column at once.
+            for chunk in self._iter_frames(columns, dtype=str):
+                n_rows += len(chunk)
+                for column in columns:
+                    values = chunk[column].dropna()
+                    if values.empty:
+                        continue
+                    widths[column] = max(
+                        widths[column],
+                        int(values.str.encode("utf-8").str.len().max()),
+                    )
+                    kinds[column] = self._widest(
+                        kinds.get(column), self._text_kind(values)
+                    )
+            return n_rows, {c: kinds.get(c, "str") for c in columns}, widths
+
+        for table in self.iter_tables(columns):
+            n_rows += table.num_rows
+            for column in columns:
+                array = table.column(column)
+                kind = self._arrow_kind(array.type, column)
+                kinds[column] = self._widest(kinds.get(column), kind)
+                if kind == "str" and len(array):
+                    lengths = pc.binary_length(array.cast(pa.string()))
+                    widths[column] = max(widths[column], int(pc.max(lengths).as_py() or 0))
+        return n_rows, {c: kinds.get(c, "str") for c in columns}, widths
+
+    @classmethod
+    def schema_for(cls, columns, kinds):
+        return pa.schema([(column, cls.ARROW_TYPES[kinds[column]]) for column in columns])
+
+    def _iter_frames(self, columns, **options):
+        """DataFrame chunks of the handle, closing the reader when done."""
+        chunks = self.handle.iter_chunks(self.chunksize, columns=columns, **options)
+        with contextlib.closing(chunks):
+            for chunk in chunks:
+                chunk.columns = [str(c) for c in chunk.columns]
+                yield chunk
+
+    @classmethod
+    def _widest(cls, current, kind):
+        if current is None:
+            return kind
+        return max(current, kind, key=cls.KINDS.index)
+
+    @classmethod
+    def _text_kind(cls, values):
+        numeric = pd.to_numeric(values, errors="coerce")
+        if numeric.notna().all():
+            return "int" if numeric.dtype.kind in "iu" else "float"
+        if values.isin(cls.BOOL_VALUES).all():
+            return "bool"
+        return "str"
+
+    @staticmethod
+    def _arrow_kind(arrow_type, column):
+        if pa.types.is_boolean(arrow_type):
+            return "bool"
+        if pa.types.is_integer(arrow_type):
+            return "int"
+        if pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+            return "float"
+        if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+            return "str"
+        if pa.types.is_temporal(arrow_type) or pa.types.is_null(arrow_type):
+            return "str"
+        raise NotTableError(f"Column '{column}' of type {arrow_type} cannot be exported.")
+
+
+class _ChunkSink:
+    """Write-only file object whose content is drained after each write."""
+
+    def __init__(self):
+        self.closed = False
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ProductExportService:
+    """Converts a product main file to CSV, parquet or FITS on the fly.
+
+    The converted file is produced chunk by chunk, so it can be sent with a
+    streaming response without staging it on disk. Parquet output emits
+    one row group per chunk, typed after the first one, in a single read.
+    FITS needs the row count and the string widths in its header, so the
+    table is read twice: once to measure it and once to write the rows.
+    """
+
+    FORMATS = {
+        "csv": ("text/csv", "csv"),
+        "parquet": ("application/vnd.apache.parquet", "parquet"),
+        "fits": ("application/fits", "fits"),
+    }
+    FITS_BLOCK_SIZE = 2880
+    FITS_INT_NULL = np.iinfo(np.int64).min
+
+    @classmethod
+    def get_source(cls, product, chunksize=None):
+        """Chunked reader over the product main file.
+
+        Raises:
+            NotTableError: If the product has no main file.
+        """
+        main_file = product.files.filter(role=FileRoles.MAIN).first()
+        if main_file is None:
+            raise NotTableError("The product has no main file.")
+        return TableExportSource(
+            main_file.file.path,
+            is_directory=main_file.is_directory,
+            chunksize=chunksize,
+        )
+
+    @classmethod
+    def prepare(cls, product, file_format, columns=None):
+        """Validate an export request and start the conversion.
+
+        Everything that can fail before the first byte is checked here:
+        the columns, the reader, the first chunk, and for FITS the
+        whole-table layout scan. Errors therefore surface before a response
+        is sent; parquet only reads the first chunk here.
+
+        Args:
+            product (Product): Product to export.
+            file_format (str): One of FORMATS.
+            columns (list[str] | None): Projection, None for all columns.
+
+        Returns:
+            tuple: (iterator of bytes, content type, filename, content
+                length). The length is known for FITS only, None otherwise.
+
+        Raises:
+            InvalidExportRequest: Unknown format or columns.
+            NotTableError: If the main file cannot be read as a table.
+        """
+        if file_format not in cls.FORMATS:
+            raise InvalidExportRequest(
+                f"Invalid format '{file_format}'. Use one of: {', '.join(cls.FORMATS)}."
+            )
+
+        source = cls.get_source(product)
+        if columns:
+            unknown = [c for c in columns if c not in source.columns]
+            if unknown:
+                raise InvalidExportRequest(f"Unknown columns: {', '.join(unknown)}.")
+        columns = list(columns) if columns else list(source.columns)
+
+        content_length = None
+        if file_format == "fits":
+            layout = cls.fits_layout(source, columns)
+            content = cls.stream_fits(source, columns, layout)
+            content_length = cls.fits_size(layout)
+        else:
+            content = getattr(cls, f"stream_{file_format}")(source, columns)
+
+        # Run the generator up to its first chunk, so reading errors are
+        # raised here instead of after the response started.
+        first = next(content, None)
+        if first is not None:
+            content = itertools.chain([first], content)
+        else:
+            content = iter(())
+
+        content_type, extension = cls.FORMATS[file_format]
+        filename = f"{product.internal_name}.{extension}"
+        return content, content_type, filename, content_length
+
+    @classmethod
+    def stream_csv(cls, source, columns):
+        header = True
+        for table in source.iter_tables(columns):
+            yield table.to_pandas().to_csv(index=False, header=header).encode("utf-8")
+            header = False
+        if header:
+            yield pd.DataFrame(columns=columns).to_csv(index=False).encode("utf-8")
+
+    @classmethod
+    def stream_parquet(cls, source, columns):
+        """Write one row group per chunk, with the schema of the first.
+
+        Raises:
+            NotTableError: If a later text chunk does not fit that schema.
+                The file then ends without its footer, so the client can
+                tell it is incomplete.
+        """
+        sink = _ChunkSink()
+        schema = None
+        writer = None
+        try:
+            for table in source.iter_typed_tables(columns):
+                if writer is None:
+                    schema = table.schema
+                    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+                writer.write_table(table.cast(schema))
+                yield sink.drain()
+
+            if writer is None:
+                schema = pa.schema([(c, pa.string()) for c in columns])
+                writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+        finally:
+            if writer is not None:
+                writer.close()
+        yield sink.drain()
+
+    @classmethod
+    def fits_layout(cls, source, columns):
+        """Measure the table and build the FITS headers.
+
+        Returns:
+            dict: `header` bytes, row `dtype`, column `kinds` and `n_rows`.
+        """
+        n_rows, kinds, widths = source.scan_layout(columns)
+
+        fits_columns = []
+        dtype = []
+        for column in columns:
+            kind = kinds[column]
+            if kind == "bool":
+                fits_columns.append(fits.Column(name=column, format="L"))
+                dtype.append((column, "i1"))
+            elif kind == "int":
+                fits_columns.append(
+                    fits.Column(name=column, format="K", null=cls.FITS_INT_NULL)
+                )
+                dtype.append((column, ">i8"))
+            elif kind == "float":
+                fits_columns.append(fits.Column(name=column, format="D"))
+                dtype.append((column, ">f8"))
+            else:
+                width = max(1, widths[column])
+                fits_columns.append(fits.Column(name=column, format=f"{width}A"))
+                dtype.append((column, f"S{width}"))
+
+        table_hdu = fits.BinTableHDU.from_columns(fits.ColDefs(fits_columns), nrows=0)
+        table_hdu.header["NAXIS2"] = n_rows
+        header = (
+            fits.PrimaryHDU().header.tostring() + table_hdu.header.tostring()
+        ).encode("ascii")
+        return {"header": header, "dtype": np.dtype(dtype), "kinds": kinds, "n_rows": n_rows}
+
+    @classmethod
+    def fits_size(cls, layout):
+        """Exact byte size of the FITS file described by `fits_layout`."""
+        data_size = layout["n_rows"] * layout["dtype"].itemsize
+        return len(layout["header"]) + data_size + -data_size % cls.FITS_BLOCK_SIZE
+
+    @classmethod
+    def stream_fits(cls, source, columns, layout):
+        """Write the rows measured by `fits_layout`.
+
+        Raises:
+            NotTableError: If the main file no longer has the measured row
+                count. It is raised before any extra row is sent, so the
+                body ends short of the announced Content-Length.
+        """
+        dtype = layout["dtype"]
+        kinds = layout["kinds"]
+        n_rows = layout["n_rows"]
+        yield layout["header"]
+
+        written = 0
+        for table in source.iter_tables(columns, kinds if source.is_text else None):
+            written += table.num_rows
+            if written > n_rows:
+                break
+            yield cls._fits_rows(table, columns, kinds, dtype).tobytes()
+
+        if written != n_rows:
+            raise NotTableError("The main file changed while it was being exported.")
+
+        padding = -(n_rows * dtype.itemsize) % cls.FITS_BLOCK_SIZE
+        if padding:
+            yield b"\0" * padding
+
+    @classmethod
+    def _fits_rows(cls, table, columns, kinds, dtype):
+        rows = np.zeros(table.num_rows, dtype=dtype)
+        for column in columns:
+            array = table.column(column)
+            kind = kinds[column]
+            if kind == "bool":
+                values = np.array(array.to_pylist(), dtype=object)
+                rows[column] = np.select(
+                    [values == True, values == False],  # noqa: E712
+                    [ord("T"), ord("F")],
+                    0,
+                )
+            elif kind == "int":
+                rows[column] = (
+                    array.cast(pa.int64()).fill_null(cls.FITS_INT_NULL).to_numpy()
+                )
+            elif kind == "float":
+                rows[column] = array.cast(pa.float64()).to_numpy(zero_copy_only=False)
+            else:
+                values = array.cast(pa.string()).fill_null("").to_pylist()
+                rows[column] = [value.encode("utf-8") for value in values]
+        return rows
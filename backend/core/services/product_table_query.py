@@ -0,0 +1,277 @@
+import pathlib
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+from core.models import FileRoles
+from core.product_handle import PARQUET_SUFFIXES, NotTableError, hats_dataset_path
+from django.conf import settings
+
+
+class InvalidTableQuery(ValueError):
+    pass
+
+
+class ProductTableQuery:
+    """Column projection, numeric predicates and ordering for read_data.
+
+    Query string syntax:
+        columns=ra,dec,z
+        where=z:gte:0.5&where=z:lt:1.2&where=flag:eq:1
+        ordering=-z,ra
+    """
+
+    OPERATORS = {
+        "eq": "__eq__",
+        "ne": "__ne__",
+        "lt": "__lt__",
+        "lte": "__le__",
+        "gt": "__gt__",
+        "gte": "__ge__",
+    }
+
+    def __init__(self, columns=None, predicates=None, ordering=None):
+        """
+        Args:
+            columns (list[str] | None): Columns to return, None for all.
+            predicates (list[tuple[str, str, float]] | None): (column, operator, value).
+            ordering (list[tuple[str, str]] | None): (column, "ascending" | "descending").
+        """
+        self.columns = columns or None
+        self.predicates = predicates or []
+        self.ordering = ordering or []
+
+    @classmethod
+    def from_params(cls, params):
+        """Parse a query from request parameters.
+
+        Returns:
+            ProductTableQuery | None: None when no query parameter is present.
+
+        Raises:
+            InvalidTableQuery: If a parameter is malformed.
+        """
+        columns = [c.strip() for c in params.get("columns", "").split(",") if c.strip()]
+        ordering = []
+        for item in params.get("ordering", "").split(","):
+            item = item.strip()
+            if not item:
+                continue
+            if item.startswith("-"):
+                ordering.append((item[1:], "descending"))
+            else:
+                ordering.append((item, "ascending"))
+
+        predicates = []
+        for item in params.getlist("where"):
+            column, _, rest = item.partition(":")
+            op, _, value = rest.partition(":")
+            if not column or op not in cls.OPERATORS:
+                raise InvalidTableQuery(
+                    f"Invalid filter '{item}'. Use column:operator:value with "
+                    f"operator in {', '.join(cls.OPERATORS)}."
+                )
+            try:
+                predicates.append((column, op, float(value)))
+            except ValueError:
+                raise InvalidTableQuery(f"Filter value must be numeric: '{item}'.")
+
+        if not (columns or predicates or ordering):
+            return None
+        return cls(columns, predicates, ordering)
+
+    def referenced_columns(self):
+        """Every column the query reads, in first-use order."""
+        names = list(self.columns or [])
+        names += [column for column, _, _ in self.predicates]
+        names += [column for column, _ in self.ordering]
+        return list(dict.fromkeys(names))
+
+    def validate(self, schema):
+        """Check the query against the table schema.
+
+        Args:
+            schema (pyarrow.Schema): Schema of the queried table.
+
+        Raises:
+            InvalidTableQuery: If the query references unknown columns or
+                filters a non-numeric column.
+        """
+        unknown = [c for c in self.referenced_columns() if c not in schema.names]
+        if unknown:
+            raise InvalidTableQuery(f"Unknown columns: {', '.join(unknown)}.")
+
+        not_numeric = [
+            column
+            for column in dict.fromkeys(column for column, _, _ in self.predicates)
+            if not self.is_numeric(schema.field(column).type)
+        ]
+        if not_numeric:
+            raise InvalidTableQuery(
+                f"Filters require numeric columns: {', '.join(not_numeric)}."
+            )
+
+    @staticmethod
+    def is_numeric(data_type):
+        return (
+            pa.types.is_integer(data_type)
+            or pa.types.is_floating(data_type)
+            or pa.types.is_decimal(data_type)
+        )
+
+    def expression(self):
+        """Predicates combined into a pyarrow dataset expression (or None)."""
+        expression = None
+        for column, op, value in self.predicates:
+            term = getattr(ds.field(column), self.OPERATORS[op])(value)
+            expression = term if expression is None else expression & term
+        return expression
+
+    def scan_columns(self, available_columns):
+        """Columns to read from storage: projection plus ordering keys."""
+        if self.columns is None:
+            return list(available_columns)
+        return list(dict.fromkeys(self.columns + [c for c, _ in self.ordering]))
+
+    def finalize(self, table):
+        """Sort and project an already filtered table."""
+        if self.ordering and table.num_rows:
+            table = table.sort_by(self.ordering)
+        if self.columns is not None:
+            table = table.select(self.columns)
+        return table
+
+    def apply(self, table):
+        """Run the whole query over an in-memory Arrow table."""
+        self.validate(table.schema)
+        expression = self.expression()
+        if expression is not None:
+            table = table.filter(expression)
+        return self.finalize(table)
+
+
+class ProductTableQueryService:
+    """Runs read_data queries over the full product data.
+
+    Parquet main files and HATS collections are scanned with pyarrow
+    dataset filters, pruning row groups by their statistics. Other formats
+    can only be queried over the cached table preview.
+    """
+
+    DEFAULT_MAX_ROWS = 10000
+    DEFAULT_MAX_SCAN_BYTES = 2 * 1024 * 1024 * 1024
+
+    @classmethod
+    def get_dataset_path(cls, product):
+        """Main-file path that supports pushed-down scans, or None."""
+        main_file = product.files.filter(role=FileRoles.MAIN).first()
+        if main_file is None:
+            return None
+
+        path = pathlib.Path(main_file.file.path)
+        if main_file.is_directory and path.is_dir():
+            return hats_dataset_path(path)
+        if path.is_file() and path.suffix.lower() in PARQUET_SUFFIXES:
+            return path
+        return None
+
+    @classmethod
+    def scan(cls, path, query, max_rows=None, max_bytes=None):
+        """Filter a parquet dataset without reading pruned row groups.
+
+        Without ordering, scanning stops once more than `max_rows` rows
+        matched or the next row group would exceed `max_bytes`
+        (uncompressed) scanned bytes. With ordering, the first `max_rows`
+        rows depend on every match, so the whole dataset is scanned keeping
+        a running top `max_rows` per row group.
+
+        Returns:
+            tuple: (pyarrow.Table, dict) with the result and scan info
+                (`truncated`, `scanned_bytes`).
+
+        Raises:
+            InvalidTableQuery: If the query does not match the schema, or an
+                ordered query would scan more than `max_bytes`.
+        """
+        max_rows = max_rows or getattr(
+            settings, "PRODUCT_QUERY_MAX_ROWS", cls.DEFAULT_MAX_ROWS
+        )
+        max_bytes = max_bytes or getattr(
+            settings, "PRODUCT_QUERY_MAX_SCAN_BYTES", cls.DEFAULT_MAX_SCAN_BYTES
+        )
+
+        dataset = ds.dataset(str(path), format="parquet", exclude_invalid_files=True)
+        query.validate(dataset.schema)
+        expression = query.expression()
+        columns = query.scan_columns(dataset.schema.names)
+
+        tables = []
+        matched = 0
+        scanned_bytes = 0
+        truncated = False
+
+        for fragment in dataset.get_fragments(filter=expression):
+            for row_group in fragment.split_by_row_group(expression):
+                size = sum(info.total_byte_size for info in row_group.row_groups)
+                if scanned_bytes + size > max_bytes:
+                    if query.ordering:
+                        raise InvalidTableQuery(
+                            "Ordering needs a full scan, which exceeds the "
+                            "scan limit. Add filters to narrow the query."
+                        )
+                    truncated = True
+                    break
+                scanned_bytes += size
+
+                table = ds.Scanner.from_fragment(
+                    row_group,
+                    schema=dataset.schema,
+                    columns=columns,
+                    filter=expression,
+                ).to_table()
+                if not table.num_rows:
+                    continue
+                matched += table.num_rows
+
+                if query.ordering:
+                    top = pa.concat_tables(tables + [table]).sort_by(query.ordering)
+                    tables = [top.slice(0, max_rows)]
+                    continue
+
+                tables.append(table)
+                if matched > max_rows:
+                    truncated = True
+                    break
+            if truncated:
+                break
+
+        if query.ordering:
+            truncated = matched > max_rows
+
+        if tables:
+            result = pa.concat_tables(tables)
+        else:
+            result = dataset.schema.empty_table().select(columns)
+
+        result = query.finalize(result)
+        if result.num_rows > max_rows:
+            result = result.slice(0, max_rows)
+        return result, {"truncated": truncated, "scanned_bytes": scanned_bytes}
+
+    @classmethod
+    def run(cls, product, query):
+        """Run a query with a pushed-down scan of the product main file.
+
+        Returns:
+            tuple: (pyarrow.Table, dict) with the result and scan info
+                (`source`, `truncated`, `scanned_bytes`).
+
+        Raises:
+            NotTableError: If the main file is neither parquet nor HATS.
+        """
+        dataset_path = cls.get_dataset_path(product)
+        if dataset_path is None:
+            raise NotTableError("Queries over the full table require a parquet or HATS main file.")
+
+        result, info = cls.scan(dataset_path, query)
+        info["source"] = "table"
+        return result, info
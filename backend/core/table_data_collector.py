@@ -1,40 +1,250 @@
+import bz2
+import collections
+import contextlib
+import io
 import logging
+import lzma
+import os
 import pathlib
 import shutil
+import struct
 import tarfile
 import tempfile
+import threading
+import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from gzip import GzipFile
 from gzip import open as gzip_open
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import pyarrow.parquet as pq
+from astropy.io import fits
+from astropy.table import Table
+from core.archive_index import ArchiveIndex
+from core.column_profile import TableProfiler
 from core.file_utils import get_file_extension
-from core.product_handle import CsvHandle, FileHandle, NotTableError, ProductHandle, TxtHandle
+from core.product_handle import (
+    DEFAULT_CHUNK_SIZE,
+    CsvHandle,
+    FileHandle,
+    Hdf5Handle,
+    NotTableError,
+    ProductHandle,
+    TextSample,
+    TxtHandle,
+    VOTableHandle,
+    fits_table_hdu,
+    is_votable,
+)
 
 LOGGER = logging.getLogger("products")
 
 
+class ExtractionProgress:
+    """Aggregates member count and size while an archive is extracted."""
+
+    LOG_EVERY_MEMBERS = 1000
+
+    def __init__(self, total_members, workers=1):
+        self.total_members = total_members
+        self.workers = workers
+        self.members = 0
+        self.size_bytes = 0
+        self.started_at = time.monotonic()
+
+    def update(self, size_bytes):
+        self.members += 1
+        self.size_bytes += int(size_bytes or 0)
+        if self.members % self.LOG_EVERY_MEMBERS == 0:
+            LOGGER.info(
+                "Extracted %s/%s archive members (%s bytes)",
+                self.members,
+                self.total_members,
+                self.size_bytes,
+            )
+
+    def report(self):
+        report = {
+            "members": self.members,
+            "total_members": self.total_members,
+            "size_bytes": self.size_bytes,
+            "workers": self.workers,
+            "elapsed_seconds": round(time.monotonic() - self.started_at, 3),
+        }
+        LOGGER.info("Archive extraction finished: %s", report)
+        return report
+
+
+class PrefixedStream(io.RawIOBase):
+    """Read-only binary stream that replays already-read bytes before a source.
+
+    Lets a non-seekable stream (e.g. a gzip or archive member) be sniffed
+    from its head and then parsed from the start without reopening it.
+    """
+
+    def __init__(self, prefix, source):
+        self._prefix = memoryview(prefix)
+        self._source = source
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        return self._source.readinto(buffer)
+
+
+class ReservoirSample:
+    """Uniform random sample of rows from a chunked stream (Algorithm R).
+
+    Only the rows that enter the reservoir are kept, so memory is bound by
+    the sample size rather than by the table size.
+    """
+
+    def __init__(self, size, rng=None):
+        self.size = max(0, int(size or 0))
+        self.seen = 0
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self._slots = np.full(self.size, -1, dtype=np.int64)
+        self._pieces = []
+        self._kept = 0
+
+    def update(self, chunk):
+        """Offer every row of a DataFrame chunk to the reservoir."""
+        n_rows = len(chunk)
+        if self.size == 0 or n_rows == 0:
+            self.seen += n_rows
+            return
+
+        positions = np.arange(self.seen, self.seen + n_rows)
+        slots = positions.copy()
+        replacing = positions >= self.size
+        slots[replacing] = self._rng.integers(0, positions[replacing] + 1)
+        accepted = slots < self.size
+        self.seen += n_rows
+        if not accepted.any():
+            return
+
+        # A slot hit twice in the same chunk keeps the later row.
+        np.maximum.at(self._slots, slots[accepted], positions[accepted])
+        piece = chunk.iloc[np.flatnonzero(accepted)]
+        piece.index = positions[accepted]
+        self._pieces.append(piece)
+        self._kept += len(piece)
+
+        if self._kept > 4 * self.size:
+            self._pieces = [self._current()]
+            self._kept = len(self._pieces[0])
+
+    def to_frame(self):
+        """Sampled rows in their original table order."""
+        if not self._pieces:
+            return None
+        return self._current().reset_index(drop=True)
+
+    def _current(self):
+        positions = np.sort(self._slots[self._slots >= 0])
+        return pd.concat(self._pieces).loc[positions]
+
+
 class MainTableDataCollector:
     """Collects tabular metadata and preview rows from a product main file."""
 
-    def __init__(self, main_file, preview_rows, tabular_suffixes):
+    CHUNK_SIZE = DEFAULT_CHUNK_SIZE
+    PANDAS_CSV_ENGINE = "pandas"
+    ARROW_CSV_ENGINE = "pyarrow"
+    ARROW_CSV_BLOCK_SIZE = 16 * 1024 * 1024
+    COPY_BUFFER_SIZE = 1024 * 1024
+    FITS_SUFFIXES = {".fits", ".fit"}
+    HDF5_SUFFIXES = {".h5", ".hf5", ".hdf5", ".hdf"}
+    TEXT_SUFFIXES = {".csv", ".txt"}
+    VOTABLE_SUFFIXES = {".vo", ".vot", ".xml"}
+    HATS_PROPERTIES_FILENAMES = {"hats.properties", "properties", "collection.properties"}
+    HATS_TEXT_SUFFIXES = {"", ".txt", ".cfg", ".conf", ".ini", ".yaml", ".yml", ".properties"}
+    HATS_PROPERTY_KEYS = {
+        "catalog_name",
+        "obs_collection",
+        "dataproduct_type",
+        "hats_col_ra",
+        "hats_col_dec",
+        "hats_order",
+        "hats_nrows",
+        "hats_builder",
+        "hats_version",
+    }
+
+    def __init__(
+        self,
+        main_file,
+        preview_rows,
+        tabular_suffixes,
+        extraction_workers=1,
+        csv_engine=PANDAS_CSV_ENGINE,
+        csv_block_size=None,
+        row_count_mmap=False,
+        sample_rows=0,
+        sample_seed=None,
+        column_profile=False,
+        column_aliases=None,
+        position_precision=None,
+    ):
         """Initialize a collector for a given main file.
 
         Args:
             main_file (pathlib.Path): Path to the product main file.
             preview_rows (int): Maximum number of preview rows to collect.
             tabular_suffixes (set[str]): Supported tabular file extensions.
+            extraction_workers (int): Threads used to extract ZIP members
+                in parallel. 1 keeps extraction sequential.
+            csv_engine (str): Reader used for CSV/TXT files, `pandas` or
+                `pyarrow` (parses line-aligned blocks on a thread pool).
+            csv_block_size (int | None): Bytes parsed per pyarrow block.
+            row_count_mmap (bool): Memory-map CSV/TXT files when counting rows.
+            sample_rows (int): Rows randomly sampled from the whole table,
+                returned as `sample_df`. 0 collects only the head preview.
+            sample_seed (int | None): Seed for the random sample.
+            column_profile (bool): Profile every column (counts, min, max,
+                mean, quantiles) in the same pass, returned as `column_stats`.
+            column_aliases (dict | None): Known column aliases (ID, RA, Dec,
+                z), used to pick the columns whose duplicates are estimated
+                and which get a redshift histogram.
+            position_precision (float | None): Grid size, in arcseconds,
+                used to count distinct RA/Dec positions.
         """
         self.main_file = pathlib.Path(main_file)
         self.preview_rows = preview_rows
         self.tabular_suffixes = tabular_suffixes
-        self._compressed_members_cache = None
+        self.extraction_workers = max(1, int(extraction_workers or 1))
+        self.csv_engine = csv_engine or self.PANDAS_CSV_ENGINE
+        self.csv_block_size = int(csv_block_size or self.ARROW_CSV_BLOCK_SIZE)
+        self.row_count_mmap = bool(row_count_mmap)
+        self.sample_rows = max(0, int(sample_rows or 0))
+        self._rng = np.random.default_rng(sample_seed)
+        self.column_profile = bool(column_profile)
+        self.column_aliases = column_aliases
+        self.position_precision = position_precision
+        self.extraction_report = None
+        self._archive_index = None
 
     def collect(self):
         """Collect preview rows, column names, and total row count.
 
         Returns:
             dict: A dictionary with keys `preview_df`, `columns`, and `n_rows`.
+                When sampling is enabled and supported by the reader it also
+                has `sample_df`, a random sample of the whole table.
+                With profiling enabled, `column_stats` holds per-column
+                statistics and `duplicate_estimates` the approximate
+                duplicate fractions of the ID and RA/Dec columns, for the
+                readers that support it.
 
         Raises:
             NotTableError: If no tabular content can be extracted from the file.
@@ -46,6 +256,29 @@ class MainTableDataCollector:
             return self._collect_from_compressed_main_file()
         return self._collect_from_path(self.main_file)
 
+    def _sample_positions(self, n_rows):
+        """Sorted random row positions for a table with a known row count."""
+        size = min(self.sample_rows, int(n_rows or 0))
+        if size <= 0:
+            return None
+        return np.sort(self._rng.choice(int(n_rows), size=size, replace=False))
+
+    def _create_profiler(self):
+        """Column profiler for this collection, or None when disabled."""
+        if not self.column_profile:
+            return None
+        return TableProfiler(self.column_aliases, self.position_precision)
+
+    @staticmethod
+    def _profile_result(profiler):
+        """`column_stats` and `duplicate_estimates` entries of a profiler."""
+        if profiler is None:
+            return {"column_stats": None, "duplicate_estimates": None}
+        return {
+            "column_stats": profiler.to_dict(),
+            "duplicate_estimates": profiler.duplicate_estimates(),
+        }
+
     def is_compressed_main_file(self):
         """Public helper to check whether the main file is compressed."""
         return self._is_compressed_main_file()
@@ -124,10 +357,8 @@ class MainTableDataCollector:
             tempfile.mkdtemp(prefix=".__hats_extract_", dir=destination_dir)
         )
         try:
-            extracted_members = self._extract_all_members(staging_dir)
-            size_bytes = sum(
-                path.stat().st_size for path in extracted_members if path.exists()
-            )
+            self._extract_all_members(staging_dir)
+            size_bytes = self.extraction_report["size_bytes"]
             hats_root = self._resolve_hats_root_from_members(staging_dir, members)
             lsdb_hats = self._is_hats_with_lsdb(hats_root)
 
@@ -164,142 +395,150 @@ class MainTableDataCollector:
         if self.main_file.is_dir():
             return False
 
-        extension = get_file_extension(self.main_file.name)
-        if extension in {".gz", ".gzip"}:
-            return True
+        return self._get_archive_index().kind is not None
 
-        return zipfile.is_zipfile(self.main_file) or tarfile.is_tarfile(self.main_file)
+    def _get_archive_index(self):
+        """Build the archive member index once per collector."""
+        if self._archive_index is None:
+            self._archive_index = ArchiveIndex(
+                self.main_file,
+                cache_text_member=lambda member: self._looks_like_properties_filename(
+                    member.name
+                ),
+            )
+        return self._archive_index
 
     def _list_compressed_members(self):
         """List non-directory member paths in compressed file."""
-        if self._compressed_members_cache is not None:
-            return self._compressed_members_cache
-
-        if zipfile.is_zipfile(self.main_file):
-            with zipfile.ZipFile(self.main_file) as archive:
-                members = [
-                    pathlib.PurePosixPath(info.filename)
-                    for info in archive.infolist()
-                    if not info.is_dir()
-                ]
-                self._compressed_members_cache = members
-                return members
-
-        if tarfile.is_tarfile(self.main_file):
-            with tarfile.open(self.main_file, mode="r:*") as archive:
-                members = [
-                    pathlib.PurePosixPath(member.name)
-                    for member in archive.getmembers()
-                    if member.isfile()
-                ]
-                self._compressed_members_cache = members
-                return members
-
-        if get_file_extension(self.main_file.name) in {".gz", ".gzip"}:
-            inferred_member = pathlib.PurePosixPath(pathlib.Path(self.main_file.stem).name)
-            members = [inferred_member]
-            self._compressed_members_cache = members
-            return members
-
-        self._compressed_members_cache = []
-        return self._compressed_members_cache
+        return self._get_archive_index().member_paths()
 
     def _extract_all_members(self, destination_dir):
-        """Extract all non-directory members into destination directory."""
+        """Extract all non-directory members into destination directory.
+
+        ZIP members are independently seekable, so they are fanned out over
+        `extraction_workers` threads (zlib and file writes release the GIL).
+        A summary is stored in `extraction_report`.
+        """
         destination_dir = pathlib.Path(destination_dir)
-        extracted_paths = []
+        index = self._get_archive_index()
+        progress = ExtractionProgress(
+            total_members=len(index.members),
+            workers=self.extraction_workers if index.is_zip else 1,
+        )
 
-        if zipfile.is_zipfile(self.main_file):
-            with zipfile.ZipFile(self.main_file) as archive:
-                for info in archive.infolist():
-                    if info.is_dir():
-                        continue
-                    member_path = pathlib.PurePosixPath(info.filename)
-                    output_path = self._safe_member_destination(
-                        destination_dir, member_path
-                    )
-                    output_path.parent.mkdir(parents=True, exist_ok=True)
-                    with archive.open(info, "r") as source:
-                        output_path.write_bytes(source.read())
-                    extracted_paths.append(output_path)
-            return extracted_paths
+        if index.is_zip:
+            # Members repeating an archive name share one output path; keep
+            # only the last one, as ZipFile.extractall would leave on disk,
+            # so no two threads ever write the same file.
+            members_by_path = {}
+            for member in index.members:
+                output_path = self._safe_member_destination(
+                    destination_dir, member.path
+                )
+                members_by_path[output_path] = member
+            targets = [
+                (member, output_path)
+                for output_path, member in members_by_path.items()
+            ]
+
+            for parent in {output_path.parent for _, output_path in targets}:
+                parent.mkdir(parents=True, exist_ok=True)
+
+            if progress.workers > 1 and len(targets) > 1:
+                self._extract_zip_members_parallel(targets, progress)
+            else:
+                with zipfile.ZipFile(self.main_file) as archive:
+                    for member, output_path in targets:
+                        self._write_zip_member(archive, member.info, output_path)
+                        progress.update(output_path.stat().st_size)
 
-        if tarfile.is_tarfile(self.main_file):
+            self.extraction_report = progress.report()
+            return [output_path for _, output_path in targets]
+
+        if index.is_tar:
+            extracted_paths = []
             with tarfile.open(self.main_file, mode="r:*") as archive:
-                for member in archive.getmembers():
-                    if not member.isfile():
-                        continue
-                    member_path = pathlib.PurePosixPath(member.name)
+                for member in index.members:
                     output_path = self._safe_member_destination(
-                        destination_dir, member_path
+                        destination_dir, member.path
                     )
                     output_path.parent.mkdir(parents=True, exist_ok=True)
-                    fileobj = archive.extractfile(member)
-                    if not fileobj:
+                    if not self._write_tar_member(archive, member.info, output_path):
                         continue
-                    output_path.write_bytes(fileobj.read())
                     extracted_paths.append(output_path)
+                    progress.update(member.info.size)
+            self.extraction_report = progress.report()
             return extracted_paths
 
-        if get_file_extension(self.main_file.name) in {".gz", ".gzip"}:
-            inferred_member = pathlib.PurePosixPath(pathlib.Path(self.main_file.stem).name)
+        if index.is_gzip:
+            inferred_member = index.members[0].path
             output_path = self._safe_member_destination(destination_dir, inferred_member)
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            with gzip_open(self.main_file, "rb") as source:
-                output_path.write_bytes(source.read())
+            self._write_gzip_content(output_path)
+            progress.update(output_path.stat().st_size)
+            self.extraction_report = progress.report()
             return [output_path]
 
         raise NotTableError("Compressed extraction is not supported for this file.")
 
+    def _extract_zip_members_parallel(self, targets, progress):
+        """Extract ZIP members concurrently, one archive handle per thread."""
+        thread_state = threading.local()
+        handles = []
+        handles_lock = threading.Lock()
+
+        def extract(target):
+            member, output_path = target
+            archive = getattr(thread_state, "archive", None)
+            if archive is None:
+                archive = zipfile.ZipFile(self.main_file)
+                thread_state.archive = archive
+                with handles_lock:
+                    handles.append(archive)
+            self._write_zip_member(archive, member.info, output_path)
+            return output_path.stat().st_size
+
+        try:
+            with ThreadPoolExecutor(max_workers=progress.workers) as executor:
+                for size in executor.map(extract, targets):
+                    progress.update(size)
+        finally:
+            for archive in handles:
+                archive.close()
+
     def _extract_single_member(self, destination_dir, member_name):
         """Extract one named member into destination directory."""
         destination_dir = pathlib.Path(destination_dir)
         member_name = pathlib.PurePosixPath(member_name)
+        index = self._get_archive_index()
 
-        if zipfile.is_zipfile(self.main_file):
-            with zipfile.ZipFile(self.main_file) as archive:
-                for info in archive.infolist():
-                    if info.is_dir():
-                        continue
-                    candidate = pathlib.PurePosixPath(info.filename)
-                    if candidate != member_name:
-                        continue
-                    output_path = self._safe_member_destination(
-                        destination_dir, member_name
-                    )
-                    output_path.parent.mkdir(parents=True, exist_ok=True)
-                    with archive.open(info, "r") as source:
-                        output_path.write_bytes(source.read())
-                    return output_path
-            raise NotTableError("Tabular member not found in zip archive.")
-
-        if tarfile.is_tarfile(self.main_file):
-            with tarfile.open(self.main_file, mode="r:*") as archive:
-                for member in archive.getmembers():
-                    if not member.isfile():
-                        continue
-                    candidate = pathlib.PurePosixPath(member.name)
-                    if candidate != member_name:
-                        continue
-                    output_path = self._safe_member_destination(
-                        destination_dir, member_name
-                    )
-                    output_path.parent.mkdir(parents=True, exist_ok=True)
-                    fileobj = archive.extractfile(member)
-                    if not fileobj:
-                        continue
-                    output_path.write_bytes(fileobj.read())
-                    return output_path
-            raise NotTableError("Tabular member not found in tar archive.")
-
-        if get_file_extension(self.main_file.name) in {".gz", ".gzip"}:
+        if index.is_gzip:
             output_path = self._safe_member_destination(destination_dir, member_name)
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            with gzip_open(self.main_file, "rb") as source:
-                output_path.write_bytes(source.read())
+            self._write_gzip_content(output_path)
             return output_path
 
-        raise NotTableError("Compressed extraction is not supported for this file.")
+        if not index.is_zip and not index.is_tar:
+            raise NotTableError("Compressed extraction is not supported for this file.")
+
+        member = next(
+            (item for item in index.members if item.path == member_name), None
+        )
+        if member is None:
+            raise NotTableError(f"Tabular member not found in {index.kind} archive.")
+
+        output_path = self._safe_member_destination(destination_dir, member_name)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if index.is_zip:
+            with zipfile.ZipFile(self.main_file) as archive:
+                self._write_zip_member(archive, member.info, output_path)
+            return output_path
+
+        with tarfile.open(self.main_file, mode="r:*") as archive:
+            if not self._write_tar_member(archive, member.info, output_path):
+                raise NotTableError("Tabular member not found in tar archive.")
+        return output_path
 
     def _resolve_hats_root_from_members(self, destination_dir, members):
         """Resolve HATS root using collection/object properties priority."""
@@ -506,42 +745,7 @@ class MainTableDataCollector:
 
     def _read_compressed_member_text(self, member_path, max_bytes=262144):
         """Read up to max_bytes from a compressed member as UTF-8 text."""
-        member_path = pathlib.PurePosixPath(str(member_path).lstrip("./"))
-
-        try:
-            if zipfile.is_zipfile(self.main_file):
-                with zipfile.ZipFile(self.main_file) as archive:
-                    for info in archive.infolist():
-                        if info.is_dir():
-                            continue
-                        candidate = pathlib.PurePosixPath(str(info.filename).lstrip("./"))
-                        if candidate != member_path:
-                            continue
-                        with archive.open(info, "r") as source:
-                            return source.read(max_bytes).decode("utf-8", errors="ignore")
-                return ""
-
-            if tarfile.is_tarfile(self.main_file):
-                with tarfile.open(self.main_file, mode="r:*") as archive:
-                    for member in archive.getmembers():
-                        if not member.isfile():
-                            continue
-                        candidate = pathlib.PurePosixPath(str(member.name).lstrip("./"))
-                        if candidate != member_path:
-                            continue
-                        fileobj = archive.extractfile(member)
-                        if not fileobj:
-                            return ""
-                        return fileobj.read(max_bytes).decode("utf-8", errors="ignore")
-                return ""
-
-            if get_file_extension(self.main_file.name) in {".gz", ".gzip"}:
-                with gzip_open(self.main_file, "rb") as source:
-                    return source.read(max_bytes).decode("utf-8", errors="ignore")
-        except Exception:
-            return ""
-
-        return ""
+        return self._get_archive_index().read_text(member_path, max_bytes=max_bytes)
 
     def _is_object_hats_properties_text(self, text):
         if not text:
@@ -570,51 +774,65 @@ class MainTableDataCollector:
         if suffix in {".parquet", ".pq"}:
             return self._collect_from_parquet(filepath)
 
+        # Metadata-driven paths read the row count from headers/shapes and
+        # only materialize the preview slice. They return None for layouts
+        # they do not understand, which keeps the legacy full read as fallback.
+        metadata_collector = None
+        if suffix in self.FITS_SUFFIXES:
+            metadata_collector = self._collect_from_fits
+        elif suffix in self.HDF5_SUFFIXES:
+            metadata_collector = self._collect_from_hdf5
+        elif suffix in self.VOTABLE_SUFFIXES:
+            # Plain XML shares the suffix; only a VOTABLE root is a table.
+            if not is_votable(filepath):
+                raise NotTableError("The XML file is not a VOTable.")
+            metadata_collector = self._collect_from_votable
+
+        if metadata_collector is not None:
+            table_data = metadata_collector(filepath)
+            if table_data is not None:
+                return table_data
+
         fh = FileHandle(filepath)
         handle = fh.handle
 
-        if isinstance(handle, CsvHandle):
-            if handle.has_hd:
-                return self._collect_with_chunk_iterator(
-                    pd.read_csv(
-                        filepath,
-                        delimiter=handle.delimiter,
-                        header=0,
-                        chunksize=50000,
-                    ),
-                    fallback_columns=handle.column_names,
-                )
-            return self._collect_with_chunk_iterator(
-                pd.read_csv(
-                    filepath,
-                    delimiter=handle.delimiter,
-                    header=None,
-                    names=handle.column_names,
-                    chunksize=50000,
-                ),
-                fallback_columns=handle.column_names,
-            )
+        if isinstance(handle, (CsvHandle, TxtHandle)):
+            # The handle sniffed the layout from a bounded head buffer; reuse
+            # it instead of probing the file again before the full pass.
+            # The byte scan does not parse rows, so a random sample or a
+            # column profile needs the chunked pass, which counts, samples
+            # and profiles at the same time.
+            if self.sample_rows == 0 and not self.column_profile:
+                table_data = self._collect_with_row_counter(handle)
+                if table_data is not None:
+                    return table_data
+
+            if self.csv_engine == self.ARROW_CSV_ENGINE:
+                table_data = self._collect_with_arrow_csv(filepath, handle)
+                if table_data is not None:
+                    return table_data
 
-        if isinstance(handle, TxtHandle):
             return self._collect_with_chunk_iterator(
-                pd.read_csv(
-                    filepath,
-                    delimiter=handle.delimiter,
-                    skiprows=handle.skiprows,
-                    names=handle.column_names,
-                    header=None,
-                    delim_whitespace=handle.delim_whitespace,
-                    chunksize=50000,
-                ),
+                handle.iter_chunks(chunksize=self.CHUNK_SIZE),
                 fallback_columns=handle.column_names,
             )
 
         # Keep legacy behavior for non-text tabular formats.
         df_full = ProductHandle().df_from_file(filepath)
+        positions = self._sample_positions(len(df_full))
+        profiler = self._create_profiler()
+        if profiler is not None:
+            profiler.update(df_full)
         return {
             "preview_df": df_full.head(self.preview_rows),
             "columns": list(df_full.columns),
             "n_rows": int(len(df_full)),
+            "sample_df": (
+                df_full.iloc[positions].reset_index(drop=True)
+                if positions is not None
+                else None
+            ),
+            **self._profile_result(profiler),
         }
 
     def _collect_from_hats_directory(self, hats_root):
@@ -711,41 +929,425 @@ class MainTableDataCollector:
             return None
 
     def _collect_from_parquet(self, filepath):
-        """Collect metadata from parquet using incremental batch reads.
+        """Collect metadata from the parquet footer.
+
+        Row count, schema and per-column statistics come from the footer
+        metadata; only the first batch of the first row group is decoded
+        for the preview.
 
         Args:
             filepath (str | pathlib.Path): Path to the parquet file.
 
         Returns:
-            dict: A dictionary with `preview_df`, `columns`, and `n_rows`.
+            dict: A dictionary with `preview_df`, `columns`, `n_rows` and
+                `column_stats`.
         """
         parquet_file = pq.ParquetFile(filepath)
+        metadata = parquet_file.metadata
         columns = list(parquet_file.schema_arrow.names)
 
         preview_frames = []
-        n_rows = 0
         remaining = self.preview_rows
 
-        for batch in parquet_file.iter_batches(batch_size=50000):
-            batch_rows = batch.num_rows
-            n_rows += batch_rows
-
-            if remaining > 0 and batch_rows > 0:
-                sample_size = min(remaining, batch_rows)
+        if metadata.num_rows > 0 and remaining > 0:
+            for batch in parquet_file.iter_batches(batch_size=remaining):
+                sample_size = min(remaining, batch.num_rows)
                 preview_frames.append(batch.slice(0, sample_size).to_pandas())
                 remaining -= sample_size
+                if remaining <= 0:
+                    break
 
         if preview_frames:
             preview_df = pd.concat(preview_frames, ignore_index=True)
         else:
             preview_df = pd.DataFrame(columns=columns)
 
+        column_stats = self._parquet_column_statistics(metadata, columns)
+        self._profile_parquet_columns(metadata, column_stats)
+
         return {
             "preview_df": preview_df,
             "columns": columns,
+            "n_rows": int(metadata.num_rows),
+            "column_stats": column_stats,
+            "duplicate_estimates": None,
+            "sample_df": self._sample_parquet_rows(parquet_file),
+        }
+
+    def _profile_parquet_columns(self, metadata, column_stats):
+        """Complete the footer statistics of a parquet file into a profile.
+
+        Only the footer is used, so no column data is decoded: the profile
+        holds `count` next to the footer `null_count`, `min` and `max`.
+        Mean, quantiles, histograms and duplicate estimates would need every
+        value and are not computed for parquet files.
+        """
+        if not self.column_profile:
+            return
+        for entry in column_stats.values():
+            if entry["null_count"] is not None:
+                entry["count"] = metadata.num_rows - entry["null_count"]
+
+    def _sample_parquet_rows(self, parquet_file):
+        """Random rows of a parquet file, decoding only the row groups holding them."""
+        positions = self._sample_positions(parquet_file.metadata.num_rows)
+        if positions is None:
+            return None
+
+        frames = []
+        start = 0
+        for index in range(parquet_file.metadata.num_row_groups):
+            stop = start + parquet_file.metadata.row_group(index).num_rows
+            local = positions[(positions >= start) & (positions < stop)] - start
+            if local.size:
+                row_group = parquet_file.read_row_group(index)
+                frames.append(row_group.take(pa.array(local)).to_pandas())
+            start = stop
+
+        return pd.concat(frames, ignore_index=True)
+
+    def _parquet_column_statistics(self, metadata, columns):
+        """Aggregate row-group statistics from parquet footer metadata.
+
+        Args:
+            metadata (pyarrow.parquet.FileMetaData): Parquet footer metadata.
+            columns (list[str]): Top-level column names to report.
+
+        Returns:
+            dict: Mapping of column name to `min`, `max` and `null_count`.
+                A value is None when any row group lacks that statistic.
+        """
+        statistics = {
+            column: {"min": None, "max": None, "null_count": 0}
+            for column in columns
+        }
+        missing = {column: set() for column in columns}
+
+        for row_group_index in range(metadata.num_row_groups):
+            row_group = metadata.row_group(row_group_index)
+            for column_index in range(row_group.num_columns):
+                chunk = row_group.column(column_index)
+                name = chunk.path_in_schema
+                if name not in statistics:
+                    continue
+
+                entry = statistics[name]
+                chunk_stats = chunk.statistics
+
+                if chunk_stats is None or not chunk_stats.has_null_count:
+                    missing[name].add("null_count")
+                else:
+                    entry["null_count"] += int(chunk_stats.null_count)
+
+                if chunk_stats is None or not chunk_stats.has_min_max:
+                    if chunk.num_values > 0:
+                        missing[name].update({"min", "max"})
+                    continue
+
+                if entry["min"] is None or chunk_stats.min < entry["min"]:
+                    entry["min"] = chunk_stats.min
+                if entry["max"] is None or chunk_stats.max > entry["max"]:
+                    entry["max"] = chunk_stats.max
+
+        for name, entry in statistics.items():
+            for key in missing[name]:
+                entry[key] = None
+            entry["min"] = self._json_safe_value(entry["min"])
+            entry["max"] = self._json_safe_value(entry["max"])
+
+        return statistics
+
+    @staticmethod
+    def _json_safe_value(value):
+        """Convert scalar statistic values into JSON-serializable values."""
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            return value.decode("utf-8", errors="replace")
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        if hasattr(value, "item"):
+            value = value.item()
+        if isinstance(value, float) and value != value:
+            return None
+        if isinstance(value, (bool, int, float, str)):
+            return value
+        return str(value)
+
+    def _collect_from_fits(self, filepath):
+        """Collect metadata from the first FITS table HDU.
+
+        The row count comes from the NAXIS2 header keyword and the file is
+        memory-mapped, so only the preview rows are actually read.
+
+        Args:
+            filepath (str | pathlib.Path): Path to the FITS file.
+
+        Returns:
+            dict | None: A dictionary with `preview_df`, `columns`, and `n_rows`,
+                or None when the file has no supported table HDU.
+        """
+        with fits.open(filepath, memmap=True) as hdul:
+            try:
+                hdu = fits_table_hdu(hdul)
+            except NotTableError:
+                return None
+
+            n_rows = int(hdu.header.get("NAXIS2", 0))
+            positions = self._sample_positions(n_rows)
+            try:
+                preview_df = Table(hdu.data[: self.preview_rows]).to_pandas()
+                sample_df = (
+                    Table(hdu.data[positions]).to_pandas()
+                    if positions is not None
+                    else None
+                )
+            except ValueError:
+                # Multidimensional columns are not representable in pandas.
+                return None
+
+            return {
+                "preview_df": preview_df.reset_index(drop=True),
+                "columns": list(hdu.columns.names),
+                "n_rows": n_rows,
+                "sample_df": (
+                    sample_df.reset_index(drop=True)
+                    if sample_df is not None
+                    else None
+                ),
+                **self._profile_result(self._profile_fits_table(hdu, n_rows)),
+            }
+
+    def _profile_fits_table(self, hdu, n_rows):
+        """Profile a memory-mapped FITS table in CHUNK_SIZE row slices."""
+        profiler = self._create_profiler()
+        if profiler is None:
+            return None
+        for start in range(0, n_rows, self.CHUNK_SIZE):
+            profiler.update(Table(hdu.data[start : start + self.CHUNK_SIZE]).to_pandas())
+        return profiler
+
+    def _collect_from_hdf5(self, filepath):
+        """Collect metadata from HDF5 files using dataset shapes.
+
+        The row count comes from the dataset shapes and only the preview
+        rows are read. A random sample or a column profile needs every row,
+        so those are collected in one pass over row slices.
+        Layouts are the ones supported by `Hdf5Handle`.
+
+        Args:
+            filepath (str | pathlib.Path): Path to the HDF5 file.
+
+        Returns:
+            dict | None: A dictionary with `preview_df`, `columns`, and `n_rows`,
+                or None when the layout is not recognized.
+        """
+        handle = Hdf5Handle(filepath)
+        if handle.layout() is None:
+            return None
+
+        try:
+            if self.sample_rows or self.column_profile:
+                return self._collect_with_chunk_iterator(
+                    handle.iter_chunks(chunksize=self.CHUNK_SIZE),
+                    fallback_columns=handle.column_names,
+                )
+            preview_df = handle.head(self.preview_rows)
+        except ValueError:
+            # Multidimensional columns are not representable in pandas.
+            return None
+
+        return {
+            "preview_df": preview_df,
+            "columns": handle.column_names,
+            "n_rows": int(handle.n_rows),
+        }
+
+    def _collect_from_votable(self, filepath):
+        """Collect metadata from the first VOTable TABLEDATA table.
+
+        The XML is parsed incrementally; rows are counted as they stream by
+        and discarded, so memory use does not depend on the table size.
+        A random sample or a column profile is built in the same pass.
+
+        Args:
+            filepath (str | pathlib.Path): Path to the VOTable file.
+
+        Returns:
+            dict | None: A dictionary with `preview_df`, `columns`, and `n_rows`,
+                or None for binary serializations or files without a table.
+        """
+        handle = VOTableHandle(filepath)
+        if not handle.is_streamable:
+            return None
+
+        if self.sample_rows or self.column_profile:
+            return self._collect_with_chunk_iterator(
+                handle.iter_chunks(chunksize=self.CHUNK_SIZE),
+                fallback_columns=handle.column_names,
+            )
+
+        rows = []
+        n_rows = 0
+        for row in handle.iter_rows():
+            if n_rows < self.preview_rows:
+                rows.append(row)
+            n_rows += 1
+
+        return {
+            "preview_df": handle.rows_to_df(rows),
+            "columns": handle.column_names,
             "n_rows": n_rows,
         }
 
+    def _collect_with_row_counter(self, handle):
+        """Collect metadata from a CSV/TXT handle without parsing every row.
+
+        The preview comes from the head of the file and `n_rows` from a
+        byte-level newline scan, so the cost is bound by disk speed.
+
+        Returns:
+            dict | None: Table metadata, or None when quoted fields require
+            a full parse.
+        """
+        n_rows = handle.count_rows(use_mmap=self.row_count_mmap)
+        if n_rows is None:
+            return None
+
+        preview_df = handle.head(self.preview_rows)
+        columns = list(preview_df.columns) if len(preview_df.columns) else []
+        return {
+            "preview_df": preview_df,
+            "columns": columns or list(handle.column_names),
+            "n_rows": n_rows,
+        }
+
+    def _collect_with_arrow_csv(self, filepath, handle):
+        """Collect metadata from a delimited text file with pyarrow.
+
+        The file is cut at line ends into `csv_block_size` byte ranges and
+        each range is parsed by pyarrow.csv.read_csv on a thread pool
+        (pyarrow.csv.open_csv is always single-threaded). Parsed ranges are
+        aggregated in file order, like the pandas chunks, and at most one
+        range per thread is held in memory.
+
+        This engine only runs when rows must be parsed: quoted files, whose
+        rows the newline scan cannot count, and collections that sample or
+        profile rows. Line ends split rows, so a quoted field holding a
+        newline fails to parse and falls back to pandas.
+
+        Returns:
+            dict | None: Table metadata, or None when the layout is not
+            supported by pyarrow (e.g. whitespace-delimited TXT) or parsing
+            fails, so the caller falls back to pandas.
+        """
+        options = self._arrow_csv_options(handle)
+        if options is None:
+            return None
+
+        try:
+            return self._collect_with_chunk_iterator(
+                self._iter_arrow_csv_chunks(filepath, *options),
+                fallback_columns=handle.column_names,
+            )
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as err:
+            LOGGER.info(
+                "pyarrow CSV reader failed for %s, falling back to pandas: %s",
+                filepath,
+                err,
+            )
+            return None
+
+    def _arrow_csv_options(self, handle):
+        """Translate a CsvHandle/TxtHandle layout into pyarrow CSV options.
+
+        Returns:
+            tuple | None: (ReadOptions, ParseOptions) for the first block, or
+            None if pyarrow cannot express the layout.
+        """
+        kwargs = handle.read_csv_kwargs()
+        delimiter = kwargs.get("delimiter")
+        if kwargs.get("delim_whitespace") or not delimiter or len(delimiter) != 1:
+            return None
+
+        read_options = pa_csv.ReadOptions(
+            skip_rows=kwargs.get("skiprows") or 0,
+            column_names=kwargs.get("names") if kwargs.get("header") is None else None,
+            use_threads=False,
+        )
+        return read_options, pa_csv.ParseOptions(delimiter=delimiter)
+
+    def _iter_arrow_csv_chunks(self, filepath, read_options, parse_options):
+        """Parse line-aligned byte ranges of a text table in parallel.
+
+        The first range carries the skipped lines and the header; its column
+        names and types are imposed on the other ranges, so a type change
+        later in the file raises ArrowInvalid as a single reader would.
+
+        Yields:
+            pd.DataFrame: One parsed range at a time, in file order.
+        """
+        workers = max(1, pa.cpu_count())
+        with open(filepath, "rb") as source, ThreadPoolExecutor(
+            max_workers=workers
+        ) as executor:
+            blocks = self._iter_line_blocks(source)
+            first = next(blocks, None)
+            if first is None:
+                return
+
+            table = self._parse_arrow_csv_block(first, read_options, parse_options)
+            yield table.to_pandas()
+
+            block_options = pa_csv.ReadOptions(
+                column_names=table.column_names, use_threads=False
+            )
+            convert_options = pa_csv.ConvertOptions(
+                column_types={
+                    field.name: field.type
+                    for field in table.schema
+                    if not pa.types.is_null(field.type)
+                }
+            )
+
+            pending = collections.deque()
+            for block in blocks:
+                pending.append(
+                    executor.submit(
+                        self._parse_arrow_csv_block,
+                        block,
+                        block_options,
+                        parse_options,
+                        convert_options,
+                    )
+                )
+                if len(pending) >= workers:
+                    yield pending.popleft().result().to_pandas()
+            while pending:
+                yield pending.popleft().result().to_pandas()
+
+    def _iter_line_blocks(self, source):
+        """Read a binary stream in `csv_block_size` pieces ending at a newline."""
+        while True:
+            block = source.read(self.csv_block_size)
+            if not block:
+                return
+            if not block.endswith(b"\n"):
+                block += source.readline()
+            yield block
+
+    @staticmethod
+    def _parse_arrow_csv_block(
+        block, read_options, parse_options, convert_options=None
+    ):
+        """Parse one in-memory CSV block into an Arrow table."""
+        return pa_csv.read_csv(
+            pa.BufferReader(block),
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=convert_options,
+        )
+
     def _collect_with_chunk_iterator(self, chunk_iterator, fallback_columns):
         """Aggregate metadata from a chunk iterator.
 
@@ -760,6 +1362,8 @@ class MainTableDataCollector:
         n_rows = 0
         remaining = self.preview_rows
         columns = None
+        reservoir = ReservoirSample(self.sample_rows, self._rng)
+        profiler = self._create_profiler()
 
         for chunk in chunk_iterator:
             if columns is None:
@@ -767,6 +1371,9 @@ class MainTableDataCollector:
 
             current_rows = len(chunk)
             n_rows += current_rows
+            reservoir.update(chunk)
+            if profiler is not None:
+                profiler.update(chunk)
 
             if remaining > 0 and current_rows > 0:
                 sample = chunk.head(remaining)
@@ -785,6 +1392,8 @@ class MainTableDataCollector:
             "preview_df": preview_df,
             "columns": columns,
             "n_rows": n_rows,
+            "sample_df": reservoir.to_frame(),
+            **self._profile_result(profiler),
         }
 
     def _collect_from_compressed_main_file(self):
@@ -796,13 +1405,28 @@ class MainTableDataCollector:
         Raises:
             NotTableError: If the compressed file type is unsupported or has no tabular member.
         """
-        extension = get_file_extension(self.main_file.name)
+        index = self._get_archive_index()
+
+        if index.is_zip or index.is_tar:
+            member = self._find_first_tabular_member()
+            if member is not None and member.path.suffix.lower() in self.TEXT_SUFFIXES:
+                # Delimited text is parsed straight from the member stream,
+                # so nothing is decompressed to disk.
+                with self._open_archive_member(member) as source:
+                    return self._collect_from_text_stream(
+                        source, member.path.suffix.lower()
+                    )
+        elif index.is_gzip:
+            inferred_suffix = self._infer_gzip_member_suffix()
+            if inferred_suffix in self.TEXT_SUFFIXES:
+                with gzip_open(self.main_file, "rb") as source:
+                    return self._collect_from_text_stream(source, inferred_suffix)
 
-        if zipfile.is_zipfile(self.main_file):
+        if index.is_zip:
             extracted_path = self._extract_tabular_from_zip()
-        elif tarfile.is_tarfile(self.main_file):
+        elif index.is_tar:
             extracted_path = self._extract_tabular_from_tar()
-        elif extension in {".gz", ".gzip"}:
+        elif index.is_gzip:
             extracted_path = self._extract_tabular_from_gzip_single()
         else:
             raise NotTableError("Compressed table preview is not supported for this file.")
@@ -812,6 +1436,55 @@ class MainTableDataCollector:
         finally:
             extracted_path.unlink(missing_ok=True)
 
+    def _collect_from_text_stream(self, source, suffix):
+        """Collect metadata from a delimited text table in a single streaming pass.
+
+        The layout is sniffed from a bounded head read from the stream; the
+        head is then replayed in front of the rest of the stream for the
+        chunked parse, so compressed sources are decompressed only once.
+
+        Args:
+            source (BinaryIO): Binary stream positioned at the start of the table.
+            suffix (str): Table suffix, used to pick the CSV or TXT layout.
+
+        Returns:
+            dict: A dictionary with `preview_df`, `columns`, and `n_rows`.
+        """
+        head = source.read(TextSample.MAX_BYTES + 1)
+        sample = TextSample.from_stream(
+            io.StringIO(head.decode("utf-8", errors="replace"))
+        )
+
+        if suffix == ".csv":
+            handle = CsvHandle(None, sample=sample)
+        else:
+            handle = TxtHandle(None, sample=sample)
+
+        stream = io.BufferedReader(
+            PrefixedStream(head, source), buffer_size=self.COPY_BUFFER_SIZE
+        )
+        return self._collect_with_chunk_iterator(
+            pd.read_csv(stream, chunksize=self.CHUNK_SIZE, **handle.read_csv_kwargs()),
+            fallback_columns=handle.column_names,
+        )
+
+    @contextlib.contextmanager
+    def _open_archive_member(self, member):
+        """Open an indexed ZIP/TAR member as a binary stream."""
+        index = self._get_archive_index()
+        if index.is_zip:
+            with zipfile.ZipFile(self.main_file) as archive:
+                with archive.open(member.info, "r") as source:
+                    yield source
+            return
+
+        with tarfile.open(self.main_file, mode="r:*") as archive:
+            fileobj = archive.extractfile(member.info)
+            if not fileobj:
+                raise NotTableError("No tabular file found inside tar archive.")
+            with fileobj:
+                yield fileobj
+
     def _extract_tabular_from_zip(self):
         """Extract the first supported tabular file from a ZIP archive.
 
@@ -821,18 +1494,14 @@ class MainTableDataCollector:
         Raises:
             NotTableError: If no supported tabular file exists in the archive.
         """
-        with zipfile.ZipFile(self.main_file) as archive:
-            for info in archive.infolist():
-                if info.is_dir():
-                    continue
-                member_name = pathlib.Path(info.filename)
-                if member_name.suffix.lower() not in self.tabular_suffixes:
-                    continue
-                with archive.open(info, "r") as source:
-                    content = source.read()
-                return self._write_temp_file(content, member_name.suffix.lower())
+        member = self._find_first_tabular_member()
+        if member is None:
+            raise NotTableError("No tabular file found inside zip archive.")
 
-        raise NotTableError("No tabular file found inside zip archive.")
+        temp_path = self._create_temp_file(member.path.suffix.lower())
+        with zipfile.ZipFile(self.main_file) as archive:
+            self._write_zip_member(archive, member.info, temp_path)
+        return temp_path
 
     def _extract_tabular_from_tar(self):
         """Extract the first supported tabular file from a TAR archive.
@@ -843,19 +1512,23 @@ class MainTableDataCollector:
         Raises:
             NotTableError: If no supported tabular file exists in the archive.
         """
-        with tarfile.open(self.main_file, mode="r:*") as archive:
-            for member in archive.getmembers():
-                if not member.isfile():
-                    continue
-                member_name = pathlib.Path(member.name)
-                if member_name.suffix.lower() not in self.tabular_suffixes:
-                    continue
-                fileobj = archive.extractfile(member)
-                if not fileobj:
-                    continue
-                return self._write_temp_file(fileobj.read(), member_name.suffix.lower())
+        member = self._find_first_tabular_member()
+        if member is None:
+            raise NotTableError("No tabular file found inside tar archive.")
 
-        raise NotTableError("No tabular file found inside tar archive.")
+        temp_path = self._create_temp_file(member.path.suffix.lower())
+        with tarfile.open(self.main_file, mode="r:*") as archive:
+            if not self._write_tar_member(archive, member.info, temp_path):
+                temp_path.unlink(missing_ok=True)
+                raise NotTableError("No tabular file found inside tar archive.")
+        return temp_path
+
+    def _find_first_tabular_member(self):
+        """Return the first indexed member with a supported tabular suffix."""
+        for member in self._get_archive_index().members:
+            if member.path.suffix.lower() in self.tabular_suffixes:
+                return member
+        return None
 
     def _extract_tabular_from_gzip_single(self):
         """Extract content from a single-file GZIP archive.
@@ -863,37 +1536,153 @@ class MainTableDataCollector:
         Returns:
             pathlib.Path: Path to a temporary extracted file.
         """
+        inferred_suffix = self._infer_gzip_member_suffix()
+        temp_path = self._create_temp_file(inferred_suffix)
+        self._write_gzip_content(temp_path)
+        return temp_path
+
+    def _infer_gzip_member_suffix(self):
+        """Infer the table suffix of a single-file GZIP (`catalog.csv.gz` -> `.csv`).
+
+        Unknown suffixes are treated as whitespace/delimited text (`.txt`).
+        """
         inferred_suffix = pathlib.Path(self.main_file.stem).suffix.lower()
         if inferred_suffix not in self.tabular_suffixes:
             inferred_suffix = ".txt"
+        return inferred_suffix
 
-        with gzip_open(self.main_file, "rb") as source:
-            content = source.read()
-        return self._write_temp_file(content, inferred_suffix)
+    def _create_temp_file(self, suffix):
+        """Create an empty temporary file with a given suffix.
 
-    def _write_temp_file(self, content, suffix):
-        """Write bytes to a temporary file with a given suffix.
+        The file is created next to the main file, on the same volume as the
+        product, instead of the (usually small) system temporary directory.
 
         Args:
-            content (bytes): File content to persist.
             suffix (str): File extension to assign to the temporary file.
 
         Returns:
             pathlib.Path: Path to the created temporary file.
         """
-        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-            tmp.write(content)
+        with tempfile.NamedTemporaryFile(
+            prefix=".__collect_",
+            suffix=suffix,
+            dir=self.main_file.parent,
+            delete=False,
+        ) as tmp:
             return pathlib.Path(tmp.name)
-    HATS_PROPERTIES_FILENAMES = {"hats.properties", "properties", "collection.properties"}
-    HATS_TEXT_SUFFIXES = {"", ".txt", ".cfg", ".conf", ".ini", ".yaml", ".yml", ".properties"}
-    HATS_PROPERTY_KEYS = {
-        "catalog_name",
-        "obs_collection",
-        "dataproduct_type",
-        "hats_col_ra",
-        "hats_col_dec",
-        "hats_order",
-        "hats_nrows",
-        "hats_builder",
-        "hats_version",
-    }
+
+    def _write_zip_member(self, archive, info, output_path):
+        """Stream one ZIP member to disk with a bounded buffer.
+
+        Stored (uncompressed) members are copied straight from the archive
+        byte range, letting the kernel move the data when possible.
+        """
+        if info.compress_type == zipfile.ZIP_STORED and not info.flag_bits & 0x1:
+            data_offset = self._zip_member_data_offset(info)
+            if data_offset is not None:
+                self._copy_file_range(data_offset, info.file_size, output_path)
+                return
+
+        with archive.open(info, "r") as source:
+            self._copy_stream(source, output_path)
+
+    def _write_tar_member(self, archive, member, output_path):
+        """Stream one TAR member to disk with a bounded buffer.
+
+        Returns:
+            bool: False when the member has no readable content.
+        """
+        if not self._is_compressed_tar(archive) and not member.issparse():
+            # Uncompressed tarball: member data is a contiguous byte range.
+            self._copy_file_range(member.offset_data, member.size, output_path)
+            return True
+
+        fileobj = archive.extractfile(member)
+        if not fileobj:
+            return False
+        with fileobj:
+            self._copy_stream(fileobj, output_path)
+        return True
+
+    @staticmethod
+    def _is_compressed_tar(archive):
+        """True when the tarball is read through a gzip/bz2/lzma decompressor."""
+        return isinstance(
+            archive.fileobj, (GzipFile, bz2.BZ2File, lzma.LZMAFile)
+        )
+
+    def _write_gzip_content(self, output_path):
+        """Stream the decompressed content of a single-file GZIP to disk."""
+        with gzip_open(self.main_file, "rb") as source:
+            self._copy_stream(source, output_path)
+
+    def _copy_stream(self, source, output_path):
+        """Copy a file-like object to output_path using a bounded buffer."""
+        with open(output_path, "wb") as target:
+            shutil.copyfileobj(source, target, self.COPY_BUFFER_SIZE)
+
+    def _copy_file_range(self, offset, size, output_path):
+        """Copy `size` bytes starting at `offset` of the main file.
+
+        Uses os.copy_file_range or os.sendfile when available and falls back
+        to a bounded buffered copy otherwise.
+        """
+        with open(self.main_file, "rb") as source, open(output_path, "wb") as target:
+            remaining = size
+            position = offset
+            for kernel_copy in self._kernel_copy_functions():
+                try:
+                    while remaining > 0:
+                        copied = kernel_copy(
+                            source.fileno(),
+                            target.fileno(),
+                            position,
+                            min(remaining, self.COPY_BUFFER_SIZE * 64),
+                        )
+                        if copied == 0:
+                            break
+                        position += copied
+                        remaining -= copied
+                    if remaining == 0:
+                        return
+                except OSError:
+                    continue
+
+            source.seek(position)
+            target.seek(size - remaining)
+            while remaining > 0:
+                buffer = source.read(min(remaining, self.COPY_BUFFER_SIZE))
+                if not buffer:
+                    raise NotTableError(
+                        f"Unexpected end of archive while extracting from {self.main_file}."
+                    )
+                target.write(buffer)
+                remaining -= len(buffer)
+
+    @staticmethod
+    def _kernel_copy_functions():
+        """Return available zero-copy primitives as (src, dst, offset, count)."""
+        functions = []
+        if hasattr(os, "copy_file_range"):
+            functions.append(
+                lambda src, dst, offset, count: os.copy_file_range(
+                    src, dst, count, offset_src=offset
+                )
+            )
+        if hasattr(os, "sendfile"):
+            functions.append(
+                lambda src, dst, offset, count: os.sendfile(dst, src, offset, count)
+            )
+        return functions
+
+    def _zip_member_data_offset(self, info):
+        """Locate the first data byte of a ZIP member from its local header."""
+        with open(self.main_file, "rb") as source:
+            source.seek(info.header_offset)
+            header = source.read(30)
+
+        if len(header) != 30 or header[:4] != b"PK\x03\x04":
+            return None
+
+        filename_length, extra_length = struct.unpack("<HH", header[26:30])
+        return info.header_offset + 30 + filename_length + extra_length
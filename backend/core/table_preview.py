@@ -0,0 +1,207 @@
+import logging
+import math
+import os
+import pathlib
+import threading
+from collections import OrderedDict
+from json import loads
+
+import pyarrow as pa
+
+LOGGER = logging.getLogger("products")
+
+
+def table_records(table, offset=0, limit=None):
+    """Rows in [offset, offset + limit) of an Arrow table as JSON-ready dicts.
+
+    Values are serialized the same way as `DataFrame.to_json(orient="records")`.
+    """
+    page = table.slice(offset, limit)
+    return loads(page.to_pandas().to_json(orient="records"))
+
+
+def table_page(table, page, page_size):
+    """One page of an Arrow table as JSON-ready dicts.
+
+    Out-of-range pages resolve to the last page, like Paginator.get_page.
+    """
+    page_size = max(1, page_size)
+    num_pages = max(1, math.ceil(table.num_rows / page_size))
+    if page < 1 or page > num_pages:
+        page = num_pages
+    return table_records(table, (page - 1) * page_size, page_size)
+
+
+class TablePreviewFile:
+    """Table preview cached on disk as an Arrow IPC file.
+
+    The file is memory-mapped when opened, so serving a page only touches the
+    rows of that page instead of parsing the whole preview.
+    """
+
+    def __init__(self, path, memory_map=True):
+        """
+        Args:
+            path (str | pathlib.Path): Arrow IPC file written by `write`.
+            memory_map (bool): Keep the file mapped while the preview is in
+                use. False reads the table into memory and closes the file
+                right away, so the preview holds no file handle.
+        """
+        self.path = pathlib.Path(path)
+        if not memory_map:
+            self._source = None
+            with pa.OSFile(str(self.path), "r") as source:
+                self.table = pa.ipc.open_file(source).read_all()
+            return
+
+        self._source = pa.memory_map(str(self.path), "r")
+        try:
+            self.table = pa.ipc.open_file(self._source).read_all()
+        except Exception:
+            self._source.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def columns(self):
+        return list(self.table.schema.names)
+
+    @property
+    def count(self):
+        return int(self.table.num_rows)
+
+    def records(self, offset=0, limit=None):
+        """Rows in [offset, offset + limit) as JSON-ready dicts."""
+        return table_records(self.table, offset, limit)
+
+    def close(self):
+        self.table = None
+        if self._source is not None:
+            self._source.close()
+
+    @classmethod
+    def write(cls, path, df):
+        """Write a DataFrame atomically as an Arrow IPC file.
+
+        Args:
+            path (str | pathlib.Path): Destination file.
+            df (pandas.DataFrame): Preview rows.
+        """
+        path = pathlib.Path(path)
+        table = cls._to_arrow(df)
+
+        temp_path = path.with_name(f".{path.name}.tmp")
+        with pa.OSFile(str(temp_path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _to_arrow(df):
+        """Convert preview rows to Arrow, stringifying mixed object columns."""
+        df = df.reset_index(drop=True)
+        df.columns = [str(column) for column in df.columns]
+        try:
+            return pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            df = df.copy()
+            for column in df.columns:
+                if df[column].dtype == object:
+                    df[column] = df[column].map(
+                        lambda value: value if value is None else str(value)
+                    )
+            return pa.Table.from_pandas(df, preserve_index=False)
+
+
+class TablePreviewCache:
+    """Process-wide LRU cache of opened table previews, bounded by bytes.
+
+    Entries are keyed on (product id, preview kind) and stamped with the
+    preview file path, mtime and size, so a preview rewritten by another
+    process is reloaded on the next lookup. Previews that do not fit are
+    read into memory and their file closed, so nothing is left for the
+    caller to close.
+    """
+
+    def __init__(self, max_bytes):
+        """
+        Args:
+            max_bytes (int): Upper bound for the summed size of cached
+                previews. 0 disables the cache.
+        """
+        self.max_bytes = max(0, int(max_bytes or 0))
+        self.hits = 0
+        self.misses = 0
+        self.size_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, product_id, path, kind="head"):
+        """Return the preview stored at path, opening it on a miss.
+
+        Raises:
+            FileNotFoundError: If the preview file does not exist.
+        """
+        stat = os.stat(path)
+        key = (product_id, kind)
+        stamp = (str(path), stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        LOGGER.debug("Table preview cache miss for %s: %s", key, self.stats())
+        if stat.st_size > self.max_bytes:
+            return TablePreviewFile(path, memory_map=False)
+
+        preview = TablePreviewFile(path)
+        size = int(preview.table.nbytes)
+        if size > self.max_bytes:
+            preview.close()
+            return TablePreviewFile(path, memory_map=False)
+
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (stamp, preview, size)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+        return preview
+
+    def invalidate(self, product_id):
+        """Drop every cached preview of a product."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == product_id]:
+                self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and current occupancy."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _discard(self, key):
+        # Evicted previews are not closed: a request may still be slicing
+        # them, and the memory map is released once unreferenced.
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[2]
@@ -1,4 +1,11 @@
-from core.file_utils import get_file_extension
+import os
+
+from core.file_utils import (
+    FINGERPRINT_BLOCK_SIZE,
+    FINGERPRINT_SAMPLE_BLOCKS,
+    file_fingerprint,
+    get_file_extension,
+)
 
 
 def test_get_file_extension_for_simple_extension():
@@ -11,3 +18,30 @@ def test_get_file_extension_for_multipart_extension():
 
 def test_get_file_extension_is_case_insensitive():
     assert get_file_extension("CATALOG.TAR.GZ") == ".tar.gz"
+
+
+def test_file_fingerprint_samples_large_files(tmp_path):
+    payload = bytearray(b"a" * (FINGERPRINT_SAMPLE_BLOCKS * FINGERPRINT_BLOCK_SIZE * 4))
+    filepath = tmp_path / "catalog.csv"
+    filepath.write_bytes(payload)
+    stat = filepath.stat()
+    fingerprint = file_fingerprint(filepath)
+
+    assert file_fingerprint(filepath) == fingerprint
+    assert fingerprint.startswith(f"file:{len(payload)}:")
+
+    # The last block is always sampled; keep mtime so only the hash changes.
+    payload[-1:] = b"b"
+    filepath.write_bytes(payload)
+    os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert file_fingerprint(filepath) != fingerprint
+
+
+def test_file_fingerprint_for_directories(tmp_path):
+    (tmp_path / "dataset").mkdir()
+    (tmp_path / "dataset" / "Npix=0.parquet").write_bytes(b"x")
+    fingerprint = file_fingerprint(tmp_path)
+
+    assert fingerprint.startswith("dir:1:")
+    (tmp_path / "dataset" / "Npix=1.parquet").write_bytes(b"y")
+    assert file_fingerprint(tmp_path) != fingerprint
@@ -204,6 +204,7 @@ class ProductContentDetailAPIViewTestCase(APITestCase):
             "ucd": self.content_dict["ucd"],
             "alias": self.content_dict["alias"],
             "order": self.content_dict["order"],
+            "statistics": None,
         }
 
         response = self.client.get(url)
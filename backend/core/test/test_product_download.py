@@ -1,3 +1,5 @@
+import io
+import os
 import tempfile
 import zipfile
 from datetime import timedelta
@@ -11,6 +13,7 @@ from core.models import (
     ProductDownloadArchive,
     ProductDownloadArchiveStatus,
     ProductFile,
+    ProductSourceSnapshot,
     ProductType,
     Release,
 )
@@ -20,6 +23,7 @@ from core.tasks import (
     build_product_main_file_archive,
     cleanup_product_download_archives,
 )
+from core.zip_stream import ZipStreamWriter
 from django.contrib.auth.models import Group, User
 from django.test import TestCase, override_settings
 from django.utils import timezone
@@ -82,16 +86,78 @@ class ProductDownloadArchiveServiceTestCase(TestCase):
             with tempfile.TemporaryDirectory() as output_dir:
                 product_path = Path(product_dir)
 
-                with mock.patch("zipfile.ZipFile") as zip_file_mock:
+                with mock.patch(
+                    "core.services.product_download.ZipStreamWriter",
+                    wraps=ZipStreamWriter,
+                ) as writer_mock:
                     ProductDownloadArchiveService.build_zip(
                         "sample_product", product_path, {}, output_dir
                     )
 
                 self.assertEqual(
-                    zip_file_mock.call_args.kwargs["compresslevel"],
+                    writer_mock.call_args.kwargs["compression_level"],
                     3,
                 )
 
+    @override_settings(PRODUCT_DOWNLOAD_ZIP_WORKERS=3)
+    def test_build_zip_stores_compressed_members_and_deflates_text(self):
+        with tempfile.TemporaryDirectory() as product_dir:
+            with tempfile.TemporaryDirectory() as output_dir:
+                product_path = Path(product_dir)
+                text = "".join(f"{i},{i * 0.5},galaxy\n" for i in range(200000))
+                (product_path / "catalog.csv").write_text(text, encoding="utf-8")
+                (product_path / "catalog.parquet").write_bytes(os.urandom(5000))
+                (product_path / "image.fits.gz").write_bytes(os.urandom(300))
+                (product_path / "empty.txt").write_bytes(b"")
+
+                zip_path = ProductDownloadArchiveService.build_zip(
+                    "sample_product", product_path, {"id": 1}, output_dir
+                )
+
+                with zipfile.ZipFile(zip_path) as archive:
+                    self.assertIsNone(archive.testzip())
+                    infos = {info.filename: info for info in archive.infolist()}
+
+                    self.assertEqual(
+                        infos["catalog.csv"].compress_type, zipfile.ZIP_DEFLATED
+                    )
+                    self.assertLess(
+                        infos["catalog.csv"].compress_size,
+                        infos["catalog.csv"].file_size,
+                    )
+                    self.assertEqual(
+                        infos["catalog.parquet"].compress_type, zipfile.ZIP_STORED
+                    )
+                    self.assertEqual(
+                        infos["image.fits.gz"].compress_type, zipfile.ZIP_STORED
+                    )
+                    self.assertEqual(
+                        archive.read("catalog.csv").decode("utf-8"), text
+                    )
+                    self.assertEqual(
+                        archive.read("catalog.parquet"),
+                        (product_path / "catalog.parquet").read_bytes(),
+                    )
+                    self.assertEqual(archive.read("empty.txt"), b"")
+
+    def test_zip_stream_writer_parallel_blocks_match_serial_content(self):
+        with tempfile.TemporaryDirectory() as product_dir:
+            source = Path(product_dir) / "data.csv"
+            source.write_bytes(b"ra,dec\n" + b"12.5,-30.25\n" * 100000)
+
+            for workers in (1, 4):
+                output = io.BytesIO()
+                with ZipStreamWriter(
+                    output, workers=workers, block_size=64 * 1024
+                ) as writer:
+                    writer.write_file(source, "data.csv")
+                    writer.write_bytes("notes/ação.txt", "ok".encode("utf-8"))
+
+                with zipfile.ZipFile(output) as archive:
+                    self.assertIsNone(archive.testzip())
+                    self.assertEqual(archive.read("data.csv"), source.read_bytes())
+                    self.assertEqual(archive.read("notes/ação.txt"), b"ok")
+
     def test_build_source_snapshot_uses_only_files_included_in_archive(self):
         with tempfile.TemporaryDirectory() as product_dir:
             product_path = Path(product_dir)
@@ -432,6 +498,351 @@ class ProductDownloadArchiveModelTestCase(TestCase):
                     self.assertIn("data.csv", zip_file.namelist())
                     self.assertIn("product_metadata.yaml", zip_file.namelist())
 
+    def test_prepare_archive_reuses_blob_for_same_sources(self):
+        with tempfile.TemporaryDirectory() as media_root:
+            download_root = Path(media_root) / "downloads"
+            product_path = Path(media_root) / self.product.path
+            product_path.mkdir(parents=True)
+            (product_path / "data.csv").write_text("a,b\n1,2\n", encoding="utf-8")
+
+            with override_settings(
+                MEDIA_ROOT=media_root,
+                PRODUCT_DOWNLOAD_ROOT=download_root,
+            ):
+                archives = [
+                    ProductDownloadArchive.objects.create(
+                        product=self.product,
+                        created_by=self.user,
+                        filename="pending.zip",
+                        source_signature="0" * 64,
+                    )
+                    for _ in range(2)
+                ]
+
+                with mock.patch.object(
+                    ProductDownloadArchiveService,
+                    "build_zip",
+                    autospec=True,
+                    side_effect=ProductDownloadArchiveService.build_zip,
+                ) as build_mock:
+                    for archive in archives:
+                        ProductDownloadArchiveService.prepare_archive(archive)
+
+                first, second = archives
+                blob_path = ProductDownloadArchiveService.get_archive_file_path(first)
+
+                self.assertEqual(build_mock.call_count, 1)
+                self.assertEqual(first.archive_path, second.archive_path)
+                self.assertEqual(first.archive_key, second.archive_key)
+                self.assertEqual(first.checksum, second.checksum)
+                self.assertEqual(blob_path.name, "sample_product.zip")
+                self.assertEqual(
+                    list((download_root / "store" / "tmp").iterdir()), []
+                )
+
+                first.status = ProductDownloadArchiveStatus.FAILED
+                first.save()
+                ProductDownloadArchiveService.cleanup_product_archives(self.product)
+                self.assertTrue(blob_path.exists())
+
+                result = ProductDownloadArchiveService.cleanup_archive_store(
+                    grace_seconds=0
+                )
+                self.assertEqual(result, 0)
+
+                second.delete()
+                result = ProductDownloadArchiveService.cleanup_archive_store(
+                    grace_seconds=0
+                )
+                self.assertEqual(result, 1)
+                self.assertFalse(blob_path.exists())
+
+    def test_prepare_archive_keeps_blob_published_by_concurrent_prepare(self):
+        with tempfile.TemporaryDirectory() as media_root:
+            download_root = Path(media_root) / "downloads"
+            product_path = Path(media_root) / self.product.path
+            product_path.mkdir(parents=True)
+            data_path = product_path / "data.csv"
+            data_path.write_text("a,b\n1,2\n", encoding="utf-8")
+            os.utime(data_path, ns=(1_700_000_000_000_000_000,) * 2)
+
+            with override_settings(
+                MEDIA_ROOT=media_root,
+                PRODUCT_DOWNLOAD_ROOT=download_root,
+            ):
+                archives = [
+                    ProductDownloadArchive.objects.create(
+                        product=self.product,
+                        created_by=self.user,
+                        filename="pending.zip",
+                        source_signature="0" * 64,
+                    )
+                    for _ in range(2)
+                ]
+                first, second = archives
+                ProductDownloadArchiveService.prepare_archive(first)
+                blob_path = ProductDownloadArchiveService.get_archive_file_path(first)
+                blob_stat = blob_path.stat()
+
+                # The second prepare misses the blob, as if both had started
+                # together, and builds its own copy.
+                is_file = Path.is_file
+                with mock.patch.object(
+                    Path,
+                    "is_file",
+                    autospec=True,
+                    side_effect=lambda path: path != blob_path and is_file(path),
+                ), mock.patch.object(
+                    ProductDownloadArchiveService,
+                    "build_zip",
+                    autospec=True,
+                    side_effect=ProductDownloadArchiveService.build_zip,
+                ) as build_mock:
+                    ProductDownloadArchiveService.prepare_archive(second)
+
+                self.assertEqual(build_mock.call_count, 1)
+                self.assertEqual(second.archive_path, first.archive_path)
+                self.assertEqual(blob_path.stat().st_ino, blob_stat.st_ino)
+                self.assertEqual(second.checksum, first.checksum)
+                self.assertEqual(second.size, blob_stat.st_size)
+                self.assertEqual(
+                    list((download_root / "store" / "tmp").iterdir()), []
+                )
+
+                with zipfile.ZipFile(blob_path) as zip_file:
+                    self.assertEqual(
+                        zip_file.getinfo("product_metadata.yaml").date_time,
+                        zip_file.getinfo("data.csv").date_time,
+                    )
+
+    def test_prepare_archive_shares_members_across_products_and_saves(self):
+        other_product = Product.objects.create(
+            product_type=self.product_type,
+            user=self.user,
+            internal_name="copy_product",
+            display_name="Copy Product",
+            path="validation_results/copy_product",
+        )
+
+        with tempfile.TemporaryDirectory() as media_root:
+            for product in (self.product, other_product):
+                product_path = Path(media_root) / product.path
+                product_path.mkdir(parents=True)
+                data_path = product_path / "data.csv"
+                data_path.write_text("a,b\n1,2\n", encoding="utf-8")
+                os.utime(data_path, ns=(1_700_000_000_000_000_000,) * 2)
+
+            with override_settings(
+                MEDIA_ROOT=media_root,
+                PRODUCT_DOWNLOAD_ROOT=Path(media_root) / "downloads",
+            ):
+
+                def prepare(product):
+                    archive = ProductDownloadArchive.objects.create(
+                        product=Product.objects.get(pk=product.pk),
+                        created_by=self.user,
+                        filename="pending.zip",
+                        source_signature="0" * 64,
+                    )
+                    return ProductDownloadArchiveService.prepare_archive(archive)
+
+                first = prepare(self.product)
+                with mock.patch.object(
+                    ZipStreamWriter,
+                    "copy_member",
+                    autospec=True,
+                    side_effect=ZipStreamWriter.copy_member,
+                ) as copy_mock:
+                    other = prepare(other_product)
+                    self.product.display_name = "Renamed Product"
+                    self.product.save()
+                    renamed = prepare(self.product)
+
+                self.assertEqual(
+                    {first.archive_key, other.archive_key, renamed.archive_key},
+                    {first.archive_key},
+                )
+                self.assertEqual(
+                    len({first.archive_path, other.archive_path, renamed.archive_path}),
+                    3,
+                )
+                self.assertEqual(
+                    [call.args[2].filename for call in copy_mock.call_args_list],
+                    ["data.csv", "data.csv"],
+                )
+
+                for archive, product in (
+                    (first, self.product),
+                    (other, other_product),
+                    (renamed, self.product),
+                ):
+                    archive_path = ProductDownloadArchiveService.get_archive_file_path(
+                        archive
+                    )
+                    self.assertEqual(archive_path.name, f"{product.internal_name}.zip")
+                    with zipfile.ZipFile(archive_path) as zip_file:
+                        self.assertEqual(zip_file.read("data.csv"), b"a,b\n1,2\n")
+                        metadata = yaml.safe_load(
+                            zip_file.read("product_metadata.yaml")
+                        )
+                    self.assertEqual(metadata["id"], product.pk)
+                self.assertEqual(metadata["display_name"], "Renamed Product")
+
+                first.delete()
+                self.assertEqual(
+                    ProductDownloadArchiveService.cleanup_archive_store(
+                        grace_seconds=0
+                    ),
+                    1,
+                )
+                self.assertTrue(
+                    ProductDownloadArchiveService.archive_file_exists(other)
+                )
+                self.assertTrue(
+                    ProductDownloadArchiveService.archive_file_exists(renamed)
+                )
+
+    def test_prepare_archive_copies_unchanged_members_from_previous_archive(self):
+        with tempfile.TemporaryDirectory() as media_root:
+            product_path = Path(media_root) / self.product.path
+            product_path.mkdir(parents=True)
+            main_data = "".join(f"{i},{i * 2}\n" for i in range(50000))
+            (product_path / "data.csv").write_text(main_data, encoding="utf-8")
+            (product_path / "catalog.parquet").write_bytes(b"PAR1" * 64)
+            (product_path / "README.txt").write_text("v1", encoding="utf-8")
+
+            with override_settings(
+                MEDIA_ROOT=media_root,
+                PRODUCT_DOWNLOAD_ROOT=Path(media_root) / "downloads",
+            ):
+                first = ProductDownloadArchive.objects.create(
+                    product=self.product,
+                    created_by=self.user,
+                    filename="pending.zip",
+                    source_signature="0" * 64,
+                )
+                ProductDownloadArchiveService.prepare_archive(first)
+
+                (product_path / "README.txt").write_text("v2 notes", encoding="utf-8")
+                (product_path / "notes.txt").write_text("new", encoding="utf-8")
+
+                second = ProductDownloadArchive.objects.create(
+                    product=self.product,
+                    created_by=self.user,
+                    filename="pending.zip",
+                    source_signature="0" * 64,
+                )
+                with mock.patch.object(
+                    ZipStreamWriter,
+                    "copy_member",
+                    autospec=True,
+                    side_effect=ZipStreamWriter.copy_member,
+                ) as copy_mock:
+                    ProductDownloadArchiveService.prepare_archive(second)
+
+                copied = [call.args[2].filename for call in copy_mock.call_args_list]
+                self.assertEqual(sorted(copied), ["catalog.parquet", "data.csv"])
+                self.assertNotEqual(first.archive_key, second.archive_key)
+                self.assertEqual(
+                    [item["path"] for item in second.source_snapshot["files"]],
+                    ["README.txt", "catalog.parquet", "data.csv", "notes.txt"],
+                )
+
+                archive_path = ProductDownloadArchiveService.get_archive_file_path(
+                    second
+                )
+                with zipfile.ZipFile(archive_path) as archive:
+                    self.assertIsNone(archive.testzip())
+                    self.assertEqual(archive.read("data.csv").decode(), main_data)
+                    self.assertEqual(archive.read("README.txt"), b"v2 notes")
+                    self.assertEqual(archive.read("notes.txt"), b"new")
+                    self.assertEqual(
+                        archive.getinfo("catalog.parquet").compress_type,
+                        zipfile.ZIP_STORED,
+                    )
+
+    def test_get_source_signature_uses_persisted_snapshot(self):
+        with tempfile.TemporaryDirectory() as media_root:
+            product_path = Path(media_root) / self.product.path
+            product_path.mkdir(parents=True)
+            (product_path / "data.csv").write_text("a,b\n1,2\n", encoding="utf-8")
+
+            with override_settings(MEDIA_ROOT=media_root):
+                signature = ProductDownloadArchiveService.get_source_signature(
+                    self.product
+                )
+                self.assertEqual(
+                    signature,
+                    ProductDownloadArchiveService.build_source_signature(product_path),
+                )
+
+                with mock.patch.object(
+                    ProductDownloadArchiveService,
+                    "build_source_snapshot",
+                    autospec=True,
+                    side_effect=ProductDownloadArchiveService.build_source_snapshot,
+                ) as snapshot_mock:
+                    ProductDownloadArchiveService.get_source_signature(self.product)
+                    snapshot_mock.assert_not_called()
+
+                    # Files added outside the API move the directory mtime.
+                    (product_path / "extra.txt").write_text("x", encoding="utf-8")
+                    stat = product_path.stat()
+                    os.utime(
+                        product_path,
+                        ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000),
+                    )
+                    changed = ProductDownloadArchiveService.get_source_signature(
+                        self.product
+                    )
+                    self.assertEqual(snapshot_mock.call_count, 1)
+                    self.assertNotEqual(changed, signature)
+
+                    ProductFile.objects.create(
+                        product=self.product,
+                        role=FileRoles.AUXILIARY,
+                        name="extra.txt",
+                        file=f"{self.product.path}/extra.txt",
+                    )
+                    self.assertFalse(
+                        ProductSourceSnapshot.objects.filter(
+                            product=self.product
+                        ).exists()
+                    )
+                    ProductDownloadArchiveService.get_source_signature(self.product)
+                    self.assertEqual(snapshot_mock.call_count, 2)
+
+    def test_delete_archive_file_keeps_blob_with_other_references(self):
+        with tempfile.TemporaryDirectory() as media_root:
+            blob_path = Path(media_root) / "downloads/store/ab/abc/sample.zip"
+            blob_path.parent.mkdir(parents=True)
+            blob_path.write_bytes(b"zip")
+
+            with override_settings(MEDIA_ROOT=media_root):
+                archives = [
+                    ProductDownloadArchive.objects.create(
+                        product=self.product,
+                        created_by=self.user,
+                        status=ProductDownloadArchiveStatus.READY,
+                        archive_path="downloads/store/ab/abc/sample.zip",
+                        archive_key="abc",
+                        filename="sample.zip",
+                        source_signature="a" * 64,
+                    )
+                    for _ in range(2)
+                ]
+
+                self.assertFalse(
+                    ProductDownloadArchiveService.delete_archive_file(archives[0])
+                )
+                self.assertTrue(blob_path.exists())
+
+                archives[0].delete()
+                self.assertTrue(
+                    ProductDownloadArchiveService.delete_archive_file(archives[1])
+                )
+                self.assertFalse(blob_path.parent.exists())
+
     def test_build_product_main_file_archive_task_caches_regular_file(self):
         with tempfile.TemporaryDirectory() as media_root:
             download_root = Path(media_root) / "downloads"
@@ -992,6 +1403,129 @@ class ProductDownloadArchiveEndpointTestCase(APITestCase):
 
         self.assertEqual(response.status_code, 403)
 
+    def test_download_file_streams_zip_without_staging_archive(self):
+        with tempfile.TemporaryDirectory() as media_root:
+            product_path = self.create_product_source_file(media_root)
+            (product_path / "data.parquet").write_bytes(b"PAR1" * 100)
+
+            with override_settings(
+                MEDIA_ROOT=media_root,
+                PRODUCT_DOWNLOAD_ROOT=Path(media_root) / "downloads",
+            ):
+                response = self.client.get(
+                    f"/api/products/{self.product.pk}/download/file/",
+                    {"mode": "stream"},
+                )
+                content = b"".join(response.streaming_content)
+
+            self.assertFalse((Path(media_root) / "downloads").exists())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        self.assertFalse(response.has_header("Content-Length"))
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertEqual(archive.read("data.csv"), b"a,b\n1,2\n")
+            self.assertEqual(
+                archive.getinfo("data.parquet").compress_type, zipfile.ZIP_STORED
+            )
+            metadata = yaml.safe_load(archive.read("product_metadata.yaml"))
+        self.assertEqual(metadata["id"], self.product.pk)
+        self.assertEqual(ProductDownloadArchive.objects.count(), 0)
+
+    def test_download_file_stream_of_stored_members_has_exact_length(self):
+        with tempfile.TemporaryDirectory() as media_root:
+            self.create_product_source_file(media_root)
+
+            with override_settings(MEDIA_ROOT=media_root):
+                response = self.client.get(
+                    f"/api/products/{self.product.pk}/download/file/",
+                    {"mode": "stream", "compression": "stored"},
+                )
+                content = b"".join(response.streaming_content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Length"], str(len(content)))
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(
+                {info.compress_type for info in archive.infolist()},
+                {zipfile.ZIP_STORED},
+            )
+
+    def consume_stream_until_error(self, response):
+        received = bytearray()
+        with self.assertRaises(Exception) as error:
+            for chunk in response.streaming_content:
+                received.extend(chunk)
+        return bytes(received), error.exception
+
+    def test_download_file_stream_aborts_when_member_changes_size(self):
+        with tempfile.TemporaryDirectory() as media_root:
+            product_path = self.create_product_source_file(media_root)
+
+            with override_settings(MEDIA_ROOT=media_root):
+                response = self.client.get(
+                    f"/api/products/{self.product.pk}/download/file/",
+                    {"mode": "stream", "compression": "stored"},
+                )
+                (product_path / "data.csv").write_text(
+                    "a,b\n1,2\n3,4\n", encoding="utf-8"
+                )
+                received, error = self.consume_stream_until_error(response)
+
+        self.assertIsInstance(error, ValueError)
+        self.assertIn("data.csv", str(error))
+        self.assertLess(len(received), int(response["Content-Length"]))
+        self.assertNotIn(b"3,4", received)
+
+    def test_download_file_stream_aborts_when_member_is_missing(self):
+        with tempfile.TemporaryDirectory() as media_root:
+            product_path = self.create_product_source_file(media_root)
+
+            with override_settings(MEDIA_ROOT=media_root):
+                response = self.client.get(
+                    f"/api/products/{self.product.pk}/download/file/",
+                    {"mode": "stream", "compression": "stored"},
+                )
+                (product_path / "data.csv").unlink()
+                received, error = self.consume_stream_until_error(response)
+
+        self.assertIsInstance(error, FileNotFoundError)
+        self.assertLess(len(received), int(response["Content-Length"]))
+
+    def test_download_file_stream_aborts_on_read_error(self):
+        class FailingSource(io.BytesIO):
+            def read(self, *args):
+                raise OSError("read failed")
+
+        with tempfile.TemporaryDirectory() as media_root:
+            self.create_product_source_file(media_root)
+
+            with override_settings(MEDIA_ROOT=media_root):
+                response = self.client.get(
+                    f"/api/products/{self.product.pk}/download/file/",
+                    {"mode": "stream"},
+                )
+                with mock.patch.object(
+                    Path, "open", return_value=FailingSource()
+                ):
+                    received, error = self.consume_stream_until_error(response)
+
+        self.assertIsInstance(error, OSError)
+        self.assertEqual(str(error), "read failed")
+        with self.assertRaises(zipfile.BadZipFile):
+            zipfile.ZipFile(io.BytesIO(received))
+
+    def test_zip_stream_writer_rejects_member_with_other_size(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "data.csv"
+            path.write_bytes(b"a,b\n1,2\n")
+            writer = ZipStreamWriter(io.BytesIO())
+
+            with self.assertRaises(ValueError):
+                writer.write_files([(path, "data.csv", zipfile.ZIP_STORED, 4)])
+            writer.shutdown(cancel=True)
+
     def test_legacy_download_endpoint_includes_deprecation_headers(self):
         with tempfile.TemporaryDirectory() as media_root:
             self.create_product_source_file(media_root)
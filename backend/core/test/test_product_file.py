@@ -218,6 +218,8 @@ class ProductFileDetailAPIViewTestCase(APITestCase):
             "size": self.product_file.file.size,
             "n_rows": None,
             "extension": get_file_extension(self.product_file.file.name),
+            "duplicate_estimates": None,
+            "fingerprint": None,
             "is_directory": False,
             "created": self.product_file.created.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
             "updated": self.product_file.updated.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
@@ -1,8 +1,20 @@
 import json
+import tempfile
+from unittest import mock
 
 import pandas as pd
 import pytest
-from core.product_handle import BaseHandle, CsvHandle, NotTableError, ProductHandle
+from core.product_handle import (
+    BaseHandle,
+    CsvHandle,
+    Hdf5Handle,
+    NotTableError,
+    ProductHandle,
+    TextSample,
+    TxtHandle,
+    count_text_rows,
+    is_votable,
+)
 from core.test.util import sample_product_file
 from rest_framework.test import APIRequestFactory, APITestCase
 
@@ -127,6 +139,156 @@ class TestProductHandleClass(APITestCase):
         with pytest.raises(Exception):
             CsvHandle(sample_file).to_df(delimiter=",")
 
+    def test_csv_handle_sniffs_from_single_head_buffer(self):
+        sample_file = sample_product_file(
+            extension="csv",
+            header=True,
+            compression=None,
+        )
+
+        with mock.patch(
+            "core.product_handle.pd.read_csv", wraps=pd.read_csv
+        ) as read_csv_mock:
+            handle = CsvHandle(sample_file)
+
+        for call in read_csv_mock.call_args_list:
+            self.assertNotEqual(call.args[0], sample_file)
+
+        self.assertEqual(handle.delimiter, ",")
+        self.assertTrue(handle.has_hd)
+        self.assertEqual(handle.column_names, self.columns)
+        self.assertEqual(handle.dtypes["ra"], "float64")
+
+    def test_txt_handle_reuses_sniffed_sample(self):
+        sample_file = sample_product_file(
+            extension="txt",
+            header=True,
+            compression=None,
+            delimiter=" ",
+            commented_lines=1,
+        )
+        sample = TextSample(sample_file)
+        handle = TxtHandle(sample_file, sample=sample)
+
+        self.assertIs(handle.sample, sample)
+        self.assertEqual(handle.skiprows, 1)
+        self.assertEqual(handle.column_names, self.columns)
+
+    def test_txt_handle_without_header_does_not_parse_whole_file(self):
+        sample_file = sample_product_file(
+            extension="txt",
+            header=False,
+            compression=None,
+            delimiter=" ",
+        )
+
+        with mock.patch(
+            "core.product_handle.pd.read_csv", wraps=pd.read_csv
+        ) as read_csv_mock:
+            handle = TxtHandle(sample_file)
+
+        for call in read_csv_mock.call_args_list:
+            self.assertNotEqual(call.args[0], sample_file)
+
+        self.assertEqual(handle.column_names, self.numbered_columns)
+
+    def test_txt_handle_skiprows_beyond_sample(self):
+        sample_file = sample_product_file(
+            extension="txt",
+            header=False,
+            compression=None,
+            delimiter=" ",
+            commented_lines=5,
+        )
+        handle = TxtHandle(sample_file, sample=TextSample(sample_file, max_lines=2))
+
+        self.assertEqual(handle.skiprows, 5)
+        self.assertEqual(handle.column_names, self.numbered_columns)
+
+    def test_txt_handle_iter_chunks(self):
+        sample_file = sample_product_file(
+            extension="txt",
+            header=True,
+            compression=None,
+            delimiter=" ",
+        )
+        chunks = list(TxtHandle(sample_file).iter_chunks(chunksize=4))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 1])
+        self.assertEqual(chunks[0].columns.to_list(), self.columns)
+
+    def test_text_sample_keeps_only_complete_lines(self):
+        sample_file = sample_product_file(
+            extension="csv",
+            header=True,
+            compression=None,
+        )
+        sample = TextSample(sample_file, max_bytes=100)
+
+        self.assertFalse(sample.is_complete)
+        self.assertTrue(sample.text.endswith("\n"))
+        self.assertEqual(sample.first_line, ",".join(self.columns))
+
+    def test_handles_count_rows_like_full_parse(self):
+        for extension, delimiter in (("csv", ","), ("txt", " ")):
+            for header in (True, False):
+                sample_file = sample_product_file(
+                    extension=extension,
+                    header=header,
+                    compression=None,
+                    delimiter=delimiter,
+                )
+                handle = (CsvHandle if extension == "csv" else TxtHandle)(sample_file)
+
+                for use_mmap in (False, True):
+                    self.assertEqual(
+                        handle.count_rows(use_mmap=use_mmap), self.countRows
+                    )
+                self.assertEqual(len(handle.head(4)), 4)
+
+    def test_count_text_rows_skips_blank_lines_across_buffers(self):
+        content = "id,z\r\n1,0.1\r\n\r\n   \n2,0.2\n\n\n3,0.3"
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as tmp:
+            tmp.write(content)
+
+        expected = len(pd.read_csv(tmp.name))
+        for buffer_size in (1, 2, 3, 7, 1024):
+            for use_mmap in (False, True):
+                self.assertEqual(
+                    count_text_rows(
+                        tmp.name,
+                        skip_lines=1,
+                        use_mmap=use_mmap,
+                        buffer_size=buffer_size,
+                    ),
+                    expected,
+                )
+
+    def test_count_text_rows_requires_parse_for_quoted_fields(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as tmp:
+            tmp.write('id,name\n1,"multi\nline"\n')
+
+        self.assertIsNone(count_text_rows(tmp.name, skip_lines=1))
+
+    def test_hdf5_handle_iter_chunks(self):
+        for extension in ("hdf5", "h5"):
+            sample_file = sample_product_file(extension=extension)
+            handle = Hdf5Handle(sample_file)
+            chunks = list(handle.iter_chunks(chunksize=4))
+
+            self.assertEqual(handle.n_rows, self.countRows)
+            self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 1])
+            self.assertEqual(sorted(chunks[0].columns), sorted(self.columns))
+
+    def test_is_votable_sniffs_root_element(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".xml", delete=False) as tmp:
+            tmp.write('<?xml version="1.0"?>\n<VOTABLE version="1.4"></VOTABLE>\n')
+        with tempfile.NamedTemporaryFile("w", suffix=".xml", delete=False) as other:
+            other.write('<?xml version="1.0"?>\n<catalog/>\n')
+
+        self.assertTrue(is_votable(tmp.name))
+        self.assertFalse(is_votable(other.name))
+
     # def test_extension_not_implemented_exception(self):
     #     sample_file = sample_product_file(
     #         extension="csv",
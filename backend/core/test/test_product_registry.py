@@ -1,22 +1,40 @@
+import gzip
+import io
 import json
 import mimetypes
 import sys
 import tarfile
 import tempfile
 import types
+import warnings
 import zipfile
 from pathlib import Path
 from unittest import mock
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from astropy.io import fits
+from astropy.table import Table
+from core.column_profile import QuantileSketch, TableProfiler
 from core.models import Product, ProductContent, ProductFile, ProductType, Release
-from core.product_handle import ProductHandle
+from core.product_handle import CsvHandle, NotTableError, ProductHandle
 from core.product_steps import RegistryProduct
+from core.services import (
+    InvalidTableQuery,
+    ProductTableQuery,
+    ProductTableQueryService,
+)
+from core.services.product_export import ProductExportService, TableExportSource
 from core.table_data_collector import MainTableDataCollector
+from core.table_preview import TablePreviewCache, TablePreviewFile
 from core.test.util import sample_product_file
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import connection, models
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
@@ -436,10 +454,10 @@ class ProductRegistryTestCase(APITestCase):
         )
         self.assertTrue(preview_path.exists())
 
-        payload = json.loads(preview_path.read_text(encoding="utf-8"))
-        self.assertEqual(payload["count"], 10)
-        self.assertEqual(payload["columns"], ["ra", "dec", "z"])
-        self.assertEqual(len(payload["results"]), 10)
+        with TablePreviewFile(preview_path) as preview:
+            self.assertEqual(preview.count, 10)
+            self.assertEqual(preview.columns, ["ra", "dec", "z"])
+            self.assertEqual(len(preview.records()), 10)
 
         main_file = ProductFile.objects.get(product=product, role=0)
         self.assertEqual(main_file.n_rows, 12)
@@ -504,8 +522,8 @@ class ProductRegistryTestCase(APITestCase):
         preview_path = Path(
             settings.MEDIA_ROOT, product.path, RegistryProduct.TABLE_PREVIEW_FILENAME
         )
-        payload = json.loads(preview_path.read_text(encoding="utf-8"))
-        self.assertEqual(payload["columns"], expected_columns)
+        with TablePreviewFile(preview_path) as preview:
+            self.assertEqual(preview.columns, expected_columns)
 
     def test_registry_without_columns(self):
 
@@ -593,6 +611,472 @@ class ProductRegistryTestCase(APITestCase):
         product_file.refresh_from_db()
         self.assertIsNotNone(product_file.n_rows)
 
+    def test_registry_parquet_persists_footer_statistics(self):
+        product = self.create_product(specz=True)
+        filepath = Path(tempfile.mkdtemp(prefix="pz_parquet_")) / "catalog.parquet"
+        pd.DataFrame(
+            {
+                "ra": [float(i) for i in range(30)],
+                "dec": [float(-i) for i in range(30)],
+                "z": [None if i == 5 else i * 0.1 for i in range(30)],
+            }
+        ).to_parquet(filepath, index=False, row_group_size=10)
+        product_file = self.upload_main_file_from_path(product, filepath)
+
+        # Only the preview batch may be decoded; the row count must come
+        # from the footer even though this fake iterator yields a single row.
+        preview_batch = pa.record_batch(
+            [pa.array([0.0])] * 3, names=["ra", "dec", "z"]
+        )
+        with mock.patch(
+            "pyarrow.parquet.ParquetFile.iter_batches",
+            autospec=True,
+            side_effect=lambda *args, **kwargs: iter([preview_batch]),
+        ):
+            response = self.client.post(
+                reverse("products-registry", kwargs={"pk": product.pk})
+            )
+
+        self.assertEqual(response.status_code, 200)
+        product_file.refresh_from_db()
+        self.assertEqual(product_file.n_rows, 30)
+
+        z_column = ProductContent.objects.get(product=product, column_name="z")
+        self.assertEqual(z_column.statistics["null_count"], 1)
+        self.assertAlmostEqual(z_column.statistics["min"], 0.0)
+        self.assertAlmostEqual(z_column.statistics["max"], 2.9)
+
+    def test_collector_streams_archive_members_to_disk(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="pz_stream_extract_"))
+        payload = bytes(range(256)) * 8192
+        member = temp_dir / "catalog.csv"
+        member.write_bytes(payload)
+
+        archives = {
+            "stored.zip": ("zip", zipfile.ZIP_STORED),
+            "deflated.zip": ("zip", zipfile.ZIP_DEFLATED),
+            "plain.tar": ("tar", "w"),
+            "compressed.tar.gz": ("tar", "w:gz"),
+            "compressed.tar.bz2": ("tar", "w:bz2"),
+            "compressed.tar.xz": ("tar", "w:xz"),
+        }
+        for archive_name, (kind, mode) in archives.items():
+            archive_path = temp_dir / archive_name
+            if kind == "zip":
+                with zipfile.ZipFile(archive_path, "w", compression=mode) as archive:
+                    archive.write(member, arcname=member.name)
+            else:
+                with tarfile.open(archive_path, mode) as archive:
+                    archive.add(member, arcname=member.name)
+
+            collector = MainTableDataCollector(
+                main_file=archive_path,
+                preview_rows=10,
+                tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+            )
+            destination = temp_dir / f"out_{archive_name}"
+
+            with mock.patch.object(
+                MainTableDataCollector,
+                "_copy_file_range",
+                autospec=True,
+                side_effect=MainTableDataCollector._copy_file_range,
+            ) as copy_range_mock:
+                extracted = collector._extract_single_member(destination, member.name)
+
+            self.assertEqual(extracted.read_bytes(), payload, archive_name)
+            self.assertEqual(
+                copy_range_mock.called,
+                archive_name in {"stored.zip", "plain.tar"},
+                archive_name,
+            )
+
+    def test_collector_extracts_zip_members_in_parallel(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="pz_parallel_extract_"))
+        archive_path = temp_dir / "many.zip"
+        expected = {}
+        with zipfile.ZipFile(
+            archive_path, "w", compression=zipfile.ZIP_DEFLATED
+        ) as archive:
+            for i in range(50):
+                arcname = f"dataset/Norder=0/Npix={i}/part-0.txt"
+                content = f"member {i}\n".encode("utf-8") * (i + 1)
+                archive.writestr(arcname, content)
+                expected[arcname] = content
+
+        collector = MainTableDataCollector(
+            main_file=archive_path,
+            preview_rows=10,
+            tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+            extraction_workers=4,
+        )
+        destination = temp_dir / "out"
+
+        with mock.patch.object(
+            MainTableDataCollector,
+            "_extract_zip_members_parallel",
+            autospec=True,
+            side_effect=MainTableDataCollector._extract_zip_members_parallel,
+        ) as parallel_mock:
+            extracted = collector._extract_all_members(destination)
+
+        parallel_mock.assert_called_once()
+        self.assertEqual(len(extracted), 50)
+        for arcname, content in expected.items():
+            self.assertEqual((destination / arcname).read_bytes(), content)
+
+        report = collector.extraction_report
+        self.assertEqual(report["members"], 50)
+        self.assertEqual(report["workers"], 4)
+        self.assertEqual(
+            report["size_bytes"], sum(len(content) for content in expected.values())
+        )
+
+    def test_collector_parallel_zip_extraction_keeps_last_duplicate(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="pz_duplicate_extract_"))
+        archive_path = temp_dir / "duplicates.zip"
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            with zipfile.ZipFile(
+                archive_path, "w", compression=zipfile.ZIP_DEFLATED
+            ) as archive:
+                archive.writestr("catalog.csv", b"id\n1\n" * 5000)
+                archive.writestr("other.csv", b"id\n2\n")
+                archive.writestr("catalog.csv", b"id\n3\n")
+
+        collector = MainTableDataCollector(
+            main_file=archive_path,
+            preview_rows=10,
+            tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+            extraction_workers=4,
+        )
+        destination = temp_dir / "out"
+
+        with mock.patch.object(
+            MainTableDataCollector,
+            "_write_zip_member",
+            autospec=True,
+            side_effect=MainTableDataCollector._write_zip_member,
+        ) as write_mock:
+            extracted = collector._extract_all_members(destination)
+
+        self.assertEqual(write_mock.call_count, 2)
+        self.assertEqual(len(extracted), 2)
+        self.assertEqual((destination / "catalog.csv").read_bytes(), b"id\n3\n")
+
+    def test_collector_parses_text_archive_members_without_temp_files(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="pz_stream_collect_"))
+        rows = "\n".join(f"{i},{i / 10}" for i in range(120))
+        zip_path = temp_dir / "catalog.zip"
+        with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("catalog.csv", f"id,z\n{rows}\n")
+            archive.writestr("README", "not a table")
+
+        member = temp_dir / "catalog.txt"
+        member.write_text("# id z\n" + rows.replace(",", " ") + "\n")
+        tar_path = temp_dir / "catalog.tar.gz"
+        with tarfile.open(tar_path, "w:gz") as archive:
+            archive.add(member, arcname=member.name)
+
+        for archive_path in (zip_path, tar_path):
+            collector = MainTableDataCollector(
+                main_file=archive_path,
+                preview_rows=10,
+                tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+            )
+            with mock.patch.object(
+                MainTableDataCollector, "_create_temp_file"
+            ) as temp_file_mock:
+                table_data = collector.collect()
+
+            temp_file_mock.assert_not_called()
+            self.assertEqual(table_data["columns"], ["id", "z"], archive_path.name)
+            self.assertEqual(table_data["n_rows"], 120, archive_path.name)
+            self.assertEqual(len(table_data["preview_df"]), 10, archive_path.name)
+
+    def test_collector_streams_gzip_text_in_a_single_pass(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="pz_gzip_collect_"))
+        rows = [f"{i},{i / 10}" for i in range(150000)]
+        sources = {
+            "catalog.csv.gz": "id,z\n" + "\n".join(rows) + "\n",
+            "catalog.txt.gz": "# id z\n" + "\n".join(rows).replace(",", " ") + "\n",
+        }
+        for filename, content in sources.items():
+            archive_path = temp_dir / filename
+            with gzip.open(archive_path, "wt") as archive:
+                archive.write(content)
+
+            collector = MainTableDataCollector(
+                main_file=archive_path,
+                preview_rows=10,
+                tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+            )
+            with mock.patch.object(
+                MainTableDataCollector, "_create_temp_file"
+            ) as temp_file_mock, mock.patch(
+                "core.table_data_collector.gzip_open", wraps=gzip.open
+            ) as gzip_open_mock:
+                table_data = collector.collect()
+
+            temp_file_mock.assert_not_called()
+            gzip_open_mock.assert_called_once()
+            self.assertEqual(table_data["columns"], ["id", "z"], filename)
+            self.assertEqual(table_data["n_rows"], 150000, filename)
+            self.assertEqual(table_data["preview_df"]["id"].tolist(), list(range(10)))
+
+    def test_collector_extracts_binary_members_next_to_main_file(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="pz_binary_collect_"))
+        table_path = temp_dir / "catalog.parquet"
+        pd.DataFrame({"id": range(30), "z": [0.1] * 30}).to_parquet(table_path)
+        archive_path = temp_dir / "product" / "catalog.zip"
+        archive_path.parent.mkdir()
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.write(table_path, arcname=table_path.name)
+
+        collector = MainTableDataCollector(
+            main_file=archive_path,
+            preview_rows=10,
+            tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+        )
+        with mock.patch.object(
+            MainTableDataCollector,
+            "_collect_from_path",
+            autospec=True,
+            side_effect=MainTableDataCollector._collect_from_path,
+        ) as collect_mock:
+            table_data = collector.collect()
+
+        extracted_path = collect_mock.call_args.args[1]
+        self.assertEqual(extracted_path.parent, archive_path.parent)
+        self.assertFalse(extracted_path.exists())
+        self.assertEqual(table_data["n_rows"], 30)
+        self.assertEqual(
+            sorted(p.name for p in archive_path.parent.iterdir()), ["catalog.zip"]
+        )
+
+    def test_collector_arrow_csv_engine_matches_pandas(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="pz_arrow_csv_"))
+        # The pyarrow engine only runs when rows must be parsed: quoted
+        # fields defeat the newline count, and sampling/profiling need rows.
+        quoted = temp_dir / "quoted.csv"
+        rows = "\n".join(f'{i},{i / 10},"{i % 3}"' for i in range(5000))
+        quoted.write_text(f"id,z,flag\n{rows}\n")
+        plain = temp_dir / "plain.csv"
+        rows = "\n".join(f"{i},{i / 10},{i % 3}" for i in range(5000))
+        plain.write_text(f"id,z,flag\n{rows}\n")
+
+        cases = [(quoted, {}), (plain, {"sample_rows": 20, "column_profile": True})]
+        for filepath, options in cases:
+            results = {}
+            for engine in ("pandas", "pyarrow"):
+                collector = MainTableDataCollector(
+                    main_file=filepath,
+                    preview_rows=10,
+                    tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+                    csv_engine=engine,
+                    csv_block_size=4096,
+                    **options,
+                )
+                with mock.patch(
+                    "core.table_data_collector.pa_csv.read_csv",
+                    wraps=pa_csv.read_csv,
+                ) as read_csv_mock:
+                    results[engine] = collector.collect()
+
+                # One pyarrow parse per line-aligned 4 KiB block.
+                expected_blocks = -(-filepath.stat().st_size // 4096)
+                self.assertEqual(
+                    read_csv_mock.call_count,
+                    expected_blocks if engine == "pyarrow" else 0,
+                    filepath.name,
+                )
+
+            for key in ("columns", "n_rows"):
+                self.assertEqual(
+                    results["pyarrow"][key], results["pandas"][key], filepath.name
+                )
+            self.assertEqual(results["pyarrow"]["n_rows"], 5000)
+            pd.testing.assert_frame_equal(
+                results["pyarrow"]["preview_df"], results["pandas"]["preview_df"]
+            )
+            if options:
+                self.assertEqual(len(results["pyarrow"]["sample_df"]), 20)
+                arrow_stats = results["pyarrow"]["column_stats"]["z"]
+                pandas_stats = results["pandas"]["column_stats"]["z"]
+                for key in ("count", "min", "max"):
+                    self.assertEqual(arrow_stats[key], pandas_stats[key])
+                self.assertAlmostEqual(arrow_stats["mean"], pandas_stats["mean"])
+
+    def test_collector_arrow_csv_engine_falls_back_to_pandas(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="pz_arrow_csv_fallback_"))
+        # Type changes after the first block make pyarrow's inference fail.
+        rows = [f"{i},{i / 10}" for i in range(2000)] + ['"unknown",0.1']
+        mixed = temp_dir / "mixed.csv"
+        mixed.write_text("id,z\n" + "\n".join(rows) + "\n")
+        # Whitespace-delimited TXT cannot be expressed with pyarrow options.
+        spaced = temp_dir / "spaced.txt"
+        spaced.write_text(
+            "# id z\n" + "\n".join(r.replace(",", "  ") for r in rows) + "\n"
+        )
+
+        for filepath in (mixed, spaced):
+            collector = MainTableDataCollector(
+                main_file=filepath,
+                preview_rows=10,
+                tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+                csv_engine="pyarrow",
+                csv_block_size=1024,
+            )
+            table_data = collector.collect()
+            self.assertEqual(table_data["columns"], ["id", "z"], filepath.name)
+            self.assertEqual(table_data["n_rows"], 2001, filepath.name)
+
+    def test_collector_scans_tar_archive_once(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="pz_hats_tgz_"))
+        hats_root = temp_dir / "mock_hats"
+        dataset_dir = hats_root / "dataset" / "Norder=0" / "Npix=0"
+        dataset_dir.mkdir(parents=True)
+        (hats_root / "hats.properties").write_text(
+            "catalog_name=mock_hats\ndataproduct_type=object\n",
+            encoding="utf-8",
+        )
+        pd.DataFrame([{"ra": 0.0, "dec": 0.0}]).to_parquet(
+            dataset_dir / "part-0.parquet", index=False
+        )
+        archive_path = temp_dir / "mock_hats.tar.gz"
+        with tarfile.open(archive_path, "w:gz") as archive:
+            archive.add(hats_root, arcname="mock_hats")
+
+        collector = MainTableDataCollector(
+            main_file=archive_path,
+            preview_rows=10,
+            tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+        )
+
+        with mock.patch(
+            "core.archive_index.tarfile.open", wraps=tarfile.open
+        ) as tar_open_mock:
+            self.assertTrue(collector.is_compressed_main_file())
+            info = collector.inspect_compressed_main_file()
+            collector.inspect_compressed_main_file()
+
+        self.assertTrue(info["is_hats"])
+        self.assertEqual(info["file_count"], 2)
+        # tarfile.is_tarfile probes the header once; the archive itself is
+        # decompressed by a single scan that also captures hats.properties.
+        scans = [
+            call
+            for call in tar_open_mock.call_args_list
+            if call.kwargs.get("mode") == "r:*"
+        ]
+        self.assertEqual(len(scans), 1)
+
+    def test_collector_uses_metadata_for_fits_and_hdf5(self):
+        with mock.patch.object(
+            ProductHandle,
+            "df_from_file",
+            autospec=True,
+            side_effect=Exception("Metadata path should not read the full table."),
+        ):
+            for extension in ["fits", "hf5", "hdf5", "h5"]:
+                filepath = sample_product_file(extension=extension)
+                collector = MainTableDataCollector(
+                    main_file=filepath,
+                    preview_rows=3,
+                    tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+                )
+
+                table_data = collector.collect()
+
+                self.assertEqual(table_data["n_rows"], 9, extension)
+                self.assertEqual(len(table_data["preview_df"]), 3, extension)
+                self.assertEqual(
+                    sorted(table_data["columns"]),
+                    sorted(
+                        [
+                            "coadd_objects_id",
+                            "z_true",
+                            "ra",
+                            "dec",
+                            "extendedness",
+                            "mag_g",
+                        ]
+                    ),
+                    extension,
+                )
+
+    def test_collector_streams_votable_rows(self):
+        filepath = Path(tempfile.mkdtemp(prefix="pz_votable_")) / "catalog.vot"
+        source = pd.DataFrame(
+            {"id": range(25), "z": [0.1 * i for i in range(25)]}
+        )
+        Table.from_pandas(source).write(filepath, format="votable")
+        collector = MainTableDataCollector(
+            main_file=filepath,
+            preview_rows=5,
+            tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+        )
+
+        with mock.patch.object(
+            ProductHandle,
+            "df_from_file",
+            autospec=True,
+            side_effect=Exception("VOTable should be streamed."),
+        ):
+            table_data = collector.collect()
+
+        self.assertEqual(table_data["n_rows"], 25)
+        self.assertEqual(table_data["columns"], ["id", "z"])
+        self.assertEqual(table_data["preview_df"]["id"].tolist(), [0, 1, 2, 3, 4])
+
+    def test_collector_rejects_xml_that_is_not_votable(self):
+        filepath = Path(tempfile.mkdtemp(prefix="pz_xml_")) / "catalog.xml"
+        filepath.write_text('<?xml version="1.0"?>\n<catalog><row id="1"/></catalog>\n')
+        collector = MainTableDataCollector(
+            main_file=filepath,
+            preview_rows=5,
+            tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+        )
+
+        with self.assertRaises(NotTableError):
+            collector.collect()
+
+    def test_collector_samples_and_profiles_hdf5_and_votable(self):
+        tmpdir = Path(tempfile.mkdtemp(prefix="pz_sample_"))
+        source = pd.DataFrame({"id": range(40), "z": [0.05 * i for i in range(40)]})
+        votable_path = tmpdir / "catalog.vot"
+        Table.from_pandas(source).write(votable_path, format="votable")
+
+        filepaths = [votable_path] + [
+            sample_product_file(extension=extension) for extension in ["hdf5", "h5"]
+        ]
+        for filepath in filepaths:
+            collector = MainTableDataCollector(
+                main_file=filepath,
+                preview_rows=3,
+                tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+                sample_rows=5,
+                sample_seed=7,
+                column_profile=True,
+            )
+
+            with mock.patch.object(
+                ProductHandle,
+                "df_from_file",
+                autospec=True,
+                side_effect=Exception("Table should be read in chunks."),
+            ):
+                table_data = collector.collect()
+
+            self.assertEqual(len(table_data["sample_df"]), 5, filepath)
+            self.assertEqual(len(table_data["preview_df"]), 3, filepath)
+            self.assertIsNotNone(table_data["column_stats"], filepath)
+            self.assertEqual(
+                table_data["column_stats"][table_data["columns"][0]]["count"],
+                table_data["n_rows"],
+                filepath,
+            )
+
     def test_registry_retry(self):
         """Verifica se a função registry pode ser repetida para o mesmo produto/file."""
         # Cria um novo produto.
@@ -622,11 +1106,10 @@ class ProductRegistryTestCase(APITestCase):
         )
         self.assertTrue(preview_path.exists())
 
-        payload = json.loads(preview_path.read_text(encoding="utf-8"))
-        self.assertIn("count", payload)
-        self.assertIn("columns", payload)
-        self.assertIn("results", payload)
-        self.assertLessEqual(len(payload["results"]), RegistryProduct.TABLE_PREVIEW_ROWS)
+        with TablePreviewFile(preview_path) as preview:
+            self.assertGreater(len(preview.columns), 0)
+            self.assertEqual(preview.count, len(preview.records()))
+            self.assertLessEqual(preview.count, RegistryProduct.TABLE_PREVIEW_ROWS)
 
     def test_read_data_uses_cached_table_preview(self):
         product = self.create_product(specz=True)
@@ -647,6 +1130,586 @@ class ProductRegistryTestCase(APITestCase):
         self.assertIn("results", data)
         self.assertLessEqual(len(data["results"]), RegistryProduct.TABLE_PREVIEW_ROWS)
 
+    def test_read_data_slices_pages_from_columnar_preview(self):
+        product = self.create_product(specz=True)
+        self.upload_main_file(product, extension="csv")
+        legacy_path = Path(
+            settings.MEDIA_ROOT,
+            product.path,
+            RegistryProduct.LEGACY_TABLE_PREVIEW_FILENAME,
+        )
+        legacy_path.write_text("{}", encoding="utf-8")
+        self.client.post(reverse("products-registry", kwargs={"pk": product.pk}))
+        self.assertFalse(legacy_path.exists())
+
+        with TablePreviewFile(RegistryProduct.get_table_preview_path(product)) as preview:
+            all_records = preview.records()
+
+        pages = {}
+        for page in (2, 99):
+            response = self.client.get(
+                reverse("products-read-data", kwargs={"pk": product.pk}),
+                {"page": page, "page_size": 4},
+            )
+            self.assertEqual(response.status_code, 200)
+            pages[page] = json.loads(response.content)
+
+        self.assertEqual(pages[2]["count"], len(all_records))
+        self.assertEqual(pages[2]["results"], all_records[4:8])
+        last_page_start = ((len(all_records) - 1) // 4) * 4
+        self.assertEqual(pages[99]["results"], all_records[last_page_start:])
+
+    def test_table_preview_file_stringifies_mixed_columns(self):
+        path = Path(tempfile.mkdtemp(prefix="pz_preview_")) / "preview.arrow"
+        df = pd.DataFrame({"id": [1, 2, 3], "mixed": ["a", 1, None], 7: [0.5, None, 1.5]})
+
+        TablePreviewFile.write(path, df)
+
+        with TablePreviewFile(path) as preview:
+            self.assertEqual(preview.columns, ["id", "mixed", "7"])
+            self.assertEqual(
+                preview.records(1, 2),
+                [{"id": 2, "mixed": "1", "7": None}, {"id": 3, "mixed": None, "7": 1.5}],
+            )
+
+    def test_read_data_reuses_parsed_preview_until_it_changes(self):
+        product = self.create_product(specz=True)
+        self.upload_main_file(product, extension="csv")
+        self.client.post(reverse("products-registry", kwargs={"pk": product.pk}))
+        url = reverse("products-read-data", kwargs={"pk": product.pk})
+
+        cache = RegistryProduct.table_preview_cache
+        before = cache.stats()
+        with mock.patch(
+            "core.table_preview.TablePreviewFile",
+            autospec=True,
+            side_effect=TablePreviewFile,
+        ) as open_mock:
+            for page in (1, 2, 1):
+                response = self.client.get(url, {"page": page, "page_size": 4})
+                self.assertEqual(response.status_code, 200)
+            self.assertEqual(open_mock.call_count, 1)
+
+            RegistryProduct(product.pk).build_table_preview(force=True)
+            response = self.client.get(url, {"page": 1, "page_size": 4})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(open_mock.call_count, 2)
+
+        after = cache.stats()
+        self.assertEqual(after["hits"] - before["hits"], 2)
+        self.assertEqual(after["misses"] - before["misses"], 2)
+
+    def test_table_preview_cache_is_bounded_by_bytes(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="pz_preview_cache_"))
+        paths = []
+        for index in range(3):
+            path = temp_dir / f"preview_{index}.arrow"
+            TablePreviewFile.write(path, pd.DataFrame({"id": range(1000)}))
+            paths.append(path)
+
+        entry_size = TablePreviewFile(paths[0]).table.nbytes
+        cache = TablePreviewCache(max_bytes=entry_size * 2)
+        cache.get(1, paths[0])
+        cache.get(2, paths[1])
+        cache.get(1, paths[0])
+        cache.get(3, paths[2])
+
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertLessEqual(stats["size_bytes"], entry_size * 2)
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 3))
+        # Product 2 was the least recently used entry.
+        cache.get(2, paths[1])
+        self.assertEqual(cache.stats()["misses"], 4)
+
+        cache.invalidate(3)
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_table_preview_cache_does_not_keep_uncached_files_open(self):
+        path = Path(tempfile.mkdtemp(prefix="pz_preview_nocache_")) / "preview.arrow"
+        TablePreviewFile.write(path, pd.DataFrame({"id": range(1000)}))
+        entry_size = TablePreviewFile(path).table.nbytes
+
+        for max_bytes in (0, entry_size // 2):
+            cache = TablePreviewCache(max_bytes=max_bytes)
+            with self.assertLogs("products", level="DEBUG") as logs:
+                preview = cache.get(1, path)
+
+            self.assertIsNone(preview._source)
+            self.assertEqual(preview.count, 1000)
+            self.assertEqual(preview.records(998), [{"id": 998}, {"id": 999}])
+            self.assertEqual(cache.stats()["entries"], 0)
+            self.assertIn("'misses': 1", logs.output[0])
+
+    def test_read_data_pushes_query_down_to_parquet_row_groups(self):
+        product = self.create_product(specz=True)
+        filepath = Path(tempfile.mkdtemp(prefix="pz_query_")) / "catalog.parquet"
+        pd.DataFrame(
+            {"id": range(100), "z": [i * 0.01 for i in range(100)], "ra": 1.0}
+        ).to_parquet(filepath, index=False, row_group_size=10)
+        self.upload_main_file_from_path(product, filepath)
+        self.client.post(reverse("products-registry", kwargs={"pk": product.pk}))
+
+        row_group_bytes = pq.ParquetFile(filepath).metadata.row_group(0).total_byte_size
+        url = reverse("products-read-data", kwargs={"pk": product.pk})
+        params = {
+            "columns": "id",
+            "where": ["z:gte:0.5", "z:lt:0.595"],
+            "ordering": "-z",
+            "page_size": 100,
+        }
+        # Statistics prune every row group but one, so the scan fits a
+        # budget far smaller than the whole file.
+        with self.settings(PRODUCT_QUERY_MAX_SCAN_BYTES=int(row_group_bytes * 1.5)):
+            response = self.client.get(url, params)
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data["source"], "table")
+        self.assertFalse(data["truncated"])
+        self.assertEqual(data["columns"], ["id"])
+        self.assertEqual([r["id"] for r in data["results"]], list(range(59, 49, -1)))
+
+        with self.settings(PRODUCT_QUERY_MAX_ROWS=5):
+            response = self.client.get(url, {"where": "z:gte:0.5"})
+        data = json.loads(response.content)
+        self.assertTrue(data["truncated"])
+        self.assertEqual(data["count"], 5)
+
+    def test_table_query_orders_over_the_whole_dataset(self):
+        filepath = Path(tempfile.mkdtemp(prefix="pz_query_topk_")) / "catalog.parquet"
+        pd.DataFrame(
+            {"id": range(100), "z": [i * 0.01 for i in range(100)], "name": "a"}
+        ).to_parquet(filepath, index=False, row_group_size=10)
+
+        ordered = ProductTableQuery(columns=["id"], ordering=[("z", "descending")])
+        table, info = ProductTableQueryService.scan(filepath, ordered, max_rows=5)
+        self.assertEqual(table.column("id").to_pylist(), [99, 98, 97, 96, 95])
+        self.assertTrue(info["truncated"])
+
+        with self.assertRaises(InvalidTableQuery):
+            ProductTableQueryService.scan(filepath, ordered, max_rows=5, max_bytes=1)
+
+        # Exactly max_rows matches: nothing was left out.
+        exact = ProductTableQuery(predicates=[("z", "lt", 0.195)])
+        table, info = ProductTableQueryService.scan(filepath, exact, max_rows=20)
+        self.assertEqual(table.num_rows, 20)
+        self.assertFalse(info["truncated"])
+
+        with self.assertRaisesMessage(InvalidTableQuery, "numeric columns: name"):
+            ProductTableQueryService.scan(
+                filepath, ProductTableQuery(predicates=[("name", "eq", 1.0)])
+            )
+
+    def test_read_data_queries_preview_for_text_main_files(self):
+        product = self.create_product(specz=True)
+        self.upload_main_file(product, extension="csv")
+        self.client.post(reverse("products-registry", kwargs={"pk": product.pk}))
+        url = reverse("products-read-data", kwargs={"pk": product.pk})
+
+        response = self.client.get(
+            url, {"columns": "coadd_objects_id,z_true", "ordering": "-z_true"}
+        )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data["source"], "preview")
+        self.assertEqual(data["columns"], ["coadd_objects_id", "z_true"])
+        z_values = [r["z_true"] for r in data["results"]]
+        self.assertEqual(z_values, sorted(z_values, reverse=True))
+
+        for params in ({"where": "z_true:between:1"}, {"columns": "missing"}):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400)
+        self.assertTrue(RegistryProduct.get_table_preview_path(product).exists())
+
+    def test_table_query_scans_hats_dataset_directory(self):
+        hats_root = Path(tempfile.mkdtemp(prefix="pz_query_hats_"))
+        for npix in range(3):
+            partition_dir = hats_root / "dataset" / "Norder=0" / "Dir=0"
+            partition_dir.mkdir(parents=True, exist_ok=True)
+            pd.DataFrame(
+                {"id": range(npix * 10, npix * 10 + 10), "z": [npix * 0.5] * 10}
+            ).to_parquet(partition_dir / f"Npix={npix}.parquet", index=False)
+
+        query = ProductTableQuery(columns=["id"], predicates=[("z", "gt", 0.7)])
+        table, info = ProductTableQueryService.scan(hats_root / "dataset", query)
+
+        self.assertEqual(sorted(table.column("id").to_pylist()), list(range(20, 30)))
+        self.assertFalse(info["truncated"])
+
+    def test_export_streams_text_main_file_in_every_format(self):
+        product = self.create_product(specz=True)
+        filepath = Path(tempfile.mkdtemp(prefix="pz_export_")) / "catalog.csv"
+        # The first chunk types the parquet columns: later integral "z"
+        # values are widened to float and "name" holds a null.
+        filepath.write_text(
+            "id,z,name,flag\n"
+            "1,0.5,a,True\n2,1,,False\n3,2,ccc,True\n"
+            "4,0,dddd,False\n5,1.5,e,True\n"
+        )
+        self.upload_main_file_from_path(product, filepath)
+        url = reverse("products-export", kwargs={"pk": product.pk})
+
+        with mock.patch("core.services.product_export.DEFAULT_CHUNK_SIZE", 3):
+            csv_response = self.client.get(url, {"columns": "id,z"})
+            parquet_response = self.client.get(url, {"file_format": "parquet"})
+            fits_response = self.client.get(url, {"file_format": "fits"})
+
+        self.assertEqual(csv_response.status_code, 200)
+        self.assertTrue(csv_response.streaming)
+        self.assertIn(".csv", csv_response["Content-Disposition"])
+        csv_df = pd.read_csv(io.BytesIO(b"".join(csv_response.streaming_content)))
+        self.assertEqual(list(csv_df.columns), ["id", "z"])
+        self.assertEqual(csv_df["z"].tolist(), [0.5, 1, 2, 0, 1.5])
+
+        parquet_file = pq.ParquetFile(
+            io.BytesIO(b"".join(parquet_response.streaming_content))
+        )
+        # One row group per chunk.
+        self.assertEqual(parquet_file.metadata.num_row_groups, 2)
+        table = parquet_file.read()
+        self.assertEqual(table.schema.field("id").type, pa.int64())
+        self.assertEqual(table.schema.field("z").type, pa.float64())
+        self.assertEqual(table.schema.field("flag").type, pa.bool_())
+        self.assertEqual(table.column("name").to_pylist(), ["a", None, "ccc", "dddd", "e"])
+
+        with fits.open(io.BytesIO(b"".join(fits_response.streaming_content))) as hdul:
+            data = Table(hdul[1].data)
+            self.assertEqual(len(data), 5)
+            self.assertEqual(list(data["id"]), [1, 2, 3, 4, 5])
+            self.assertEqual(list(data["z"]), [0.5, 1, 2, 0, 1.5])
+            self.assertEqual(list(data["name"]), ["a", "", "ccc", "dddd", "e"])
+            self.assertEqual(list(data["flag"]), [True, False, True, False, True])
+
+    def test_export_parquet_from_text_reads_the_file_once(self):
+        product = self.create_product(specz=True)
+        filepath = Path(tempfile.mkdtemp(prefix="pz_export_once_")) / "catalog.csv"
+        filepath.write_text("id,z\n1,0.5\n2,1\n3,2\n4,0\n5,1.5\n")
+        self.upload_main_file_from_path(product, filepath)
+        url = reverse("products-export", kwargs={"pk": product.pk})
+
+        with mock.patch(
+            "core.services.product_export.DEFAULT_CHUNK_SIZE", 3
+        ), mock.patch.object(
+            TableExportSource,
+            "scan_layout",
+            side_effect=AssertionError("Parquet export should not pre-scan."),
+        ), mock.patch.object(
+            CsvHandle, "iter_chunks", autospec=True, side_effect=CsvHandle.iter_chunks
+        ) as chunks_mock:
+            response = self.client.get(url, {"file_format": "parquet"})
+            body = b"".join(response.streaming_content)
+
+        self.assertEqual(chunks_mock.call_count, 1)
+        table = pq.read_table(io.BytesIO(body))
+        self.assertEqual(table.column("id").to_pylist(), [1, 2, 3, 4, 5])
+        self.assertEqual(table.schema.field("z").type, pa.float64())
+
+        # A value the first chunk's type cannot hold ends the stream before
+        # the footer, so the file is detectably incomplete.
+        ProductExportService.get_source(product).path.write_text(
+            "id,z\n1,0.5\n2,1\n3,2\n4.5,0\n"
+        )
+        with mock.patch("core.services.product_export.DEFAULT_CHUNK_SIZE", 3):
+            response = self.client.get(url, {"file_format": "parquet"})
+            sent = []
+            with self.assertRaises(NotTableError):
+                for data in response.streaming_content:
+                    sent.append(data)
+        with self.assertRaises(pa.ArrowInvalid):
+            pq.read_table(io.BytesIO(b"".join(sent)))
+
+    def test_export_projects_parquet_main_file_to_fits(self):
+        product = self.create_product(specz=True)
+        filepath = Path(tempfile.mkdtemp(prefix="pz_export_")) / "catalog.parquet"
+        pd.DataFrame({"id": range(7), "z": [i * 0.1 for i in range(7)]}).to_parquet(
+            filepath, index=False, row_group_size=2
+        )
+        self.upload_main_file_from_path(product, filepath)
+        url = reverse("products-export", kwargs={"pk": product.pk})
+
+        response = self.client.get(url, {"file_format": "fits", "columns": "z"})
+        self.assertEqual(response.status_code, 200)
+        with fits.open(io.BytesIO(b"".join(response.streaming_content))) as hdul:
+            self.assertEqual(hdul[1].columns.names, ["z"])
+            self.assertEqual(len(hdul[1].data), 7)
+
+        for params in ({"file_format": "xls"}, {"columns": "missing"}):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_export_reads_hdf5_and_votable_in_chunks(self):
+        temp_dir = Path(tempfile.mkdtemp(prefix="pz_export_chunks_"))
+        votable_path = temp_dir / "catalog.vot"
+        Table.from_pandas(
+            pd.DataFrame({"id": range(7), "z": [i * 0.1 for i in range(7)]})
+        ).write(votable_path, format="votable")
+        hdf5_path = sample_product_file(extension="hdf5")
+
+        for filepath, column in ((votable_path, "z"), (hdf5_path, "z_true")):
+            source = TableExportSource(filepath, chunksize=3)
+            with mock.patch.object(
+                type(source.handle),
+                "to_df",
+                autospec=True,
+                side_effect=Exception("Export should not read the whole table."),
+            ):
+                tables = list(source.iter_tables([column]))
+
+            self.assertTrue(all(table.num_rows <= 3 for table in tables), filepath)
+            self.assertEqual(
+                sum(table.num_rows for table in tables),
+                7 if filepath == votable_path else 9,
+            )
+            self.assertEqual(tables[0].column_names, [column])
+
+    def test_export_fits_announces_length_and_fails_detectably(self):
+        product = self.create_product(specz=True)
+        filepath = Path(tempfile.mkdtemp(prefix="pz_export_fits_")) / "catalog.csv"
+        filepath.write_text("id,name\n1,a\n2,bb\n3,ccc\n")
+        self.upload_main_file_from_path(product, filepath)
+        url = reverse("products-export", kwargs={"pk": product.pk})
+
+        response = self.client.get(url, {"file_format": "fits"})
+        body = b"".join(response.streaming_content)
+        self.assertEqual(int(response["Content-Length"]), len(body))
+        self.assertEqual(len(body) % ProductExportService.FITS_BLOCK_SIZE, 0)
+
+        # The file grew after it was measured: the stream stops before the
+        # extra row, short of the announced length.
+        source = ProductExportService.get_source(product)
+        layout = ProductExportService.fits_layout(source, ["id"])
+        layout["n_rows"] -= 1
+        sent = []
+        with self.assertRaises(NotTableError):
+            for data in ProductExportService.stream_fits(source, ["id"], layout):
+                sent.append(data)
+        self.assertLess(len(b"".join(sent)), ProductExportService.fits_size(layout))
+
+    def test_export_rejects_unreadable_main_file_before_streaming(self):
+        product = self.create_product(specz=True)
+        filepath = Path(tempfile.mkdtemp(prefix="pz_export_notable_")) / "image.fits"
+        fits.PrimaryHDU().writeto(filepath)
+        self.upload_main_file_from_path(product, filepath)
+
+        response = self.client.get(
+            reverse("products-export", kwargs={"pk": product.pk}),
+            {"file_format": "parquet"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.streaming)
+
+    def test_read_data_pages_through_sampled_preview(self):
+        self.redshift_catalogs.preview_sample_rows = 4
+        self.redshift_catalogs.save()
+        product = self.create_product(specz=True)
+        self.upload_main_file(product, extension="csv")
+        self.client.post(reverse("products-registry", kwargs={"pk": product.pk}))
+
+        sample_path = RegistryProduct.get_table_preview_sample_path(product)
+        with TablePreviewFile(sample_path) as sample:
+            self.assertEqual(sample.count, 4)
+            sample_columns = sample.columns
+
+        response = self.client.get(
+            reverse("products-read-data", kwargs={"pk": product.pk}),
+            {"page": 1, "page_size": 3, "preview": "sample"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data["count"], 4)
+        self.assertEqual(len(data["results"]), 3)
+        self.assertEqual(data["columns"], sample_columns)
+
+    def test_reservoir_sample_is_uniform_over_chunks(self):
+        collector = MainTableDataCollector(
+            main_file="catalog.csv",
+            preview_rows=5,
+            tabular_suffixes=RegistryProduct.TABULAR_SUFFIXES,
+            sample_rows=50,
+            sample_seed=7,
+        )
+        chunks = (
+            pd.DataFrame({"id": range(start, start + 1000)})
+            for start in range(0, 100000, 1000)
+        )
+        table_data = collector._collect_with_chunk_iterator(chunks, ["id"])
+
+        sample = table_data["sample_df"]["id"]
+        self.assertEqual(table_data["n_rows"], 100000)
+        self.assertEqual(len(sample), 50)
+        self.assertTrue(sample.is_unique)
+        self.assertTrue(sample.is_monotonic_increasing)
+        # A head-biased sample would stay in the first chunks.
+        self.assertGreater(sample.mean(), 25000)
+        self.assertLess(sample.mean(), 75000)
+        self.assertEqual(table_data["preview_df"]["id"].tolist(), list(range(5)))
+
+    @override_settings(PRODUCT_COLUMN_PROFILING=1)
+    def test_registry_profiles_columns_in_the_collection_pass(self):
+        product = self.create_product(specz=True)
+        main_file = self.upload_main_file(product, extension="csv")
+        self.client.post(reverse("products-registry", kwargs={"pk": product.pk}))
+        df = pd.read_csv(main_file.file.path)
+
+        z_content = product.contents.get(column_name="z_true")
+        response = self.client.get(
+            reverse("product_contents-detail", kwargs={"pk": z_content.pk})
+        )
+        stats = json.loads(response.content)["statistics"]
+        self.assertEqual(stats["count"], len(df))
+        self.assertEqual(stats["null_count"], 0)
+        self.assertAlmostEqual(stats["min"], df["z_true"].min())
+        self.assertAlmostEqual(stats["max"], df["z_true"].max())
+        self.assertAlmostEqual(stats["mean"], df["z_true"].mean())
+        self.assertAlmostEqual(stats["quantiles"]["0.5"], df["z_true"].median())
+        self.assertEqual(sum(stats["histogram"]["counts"]), len(df))
+
+        id_stats = product.contents.get(column_name="coadd_objects_id").statistics
+        self.assertEqual(id_stats["min"], int(df["coadd_objects_id"].min()))
+        self.assertNotIn("histogram", id_stats)
+
+        with self.settings(PRODUCT_COLUMN_PROFILING=0):
+            RegistryProduct(product.pk).registry()
+        self.assertIsNone(product.contents.get(column_name="z_true").statistics)
+
+    @override_settings(PRODUCT_COLUMN_PROFILING=1)
+    def test_registry_profiles_parquet_from_the_footer(self):
+        product = self.create_product(specz=True)
+        filepath = Path(tempfile.mkdtemp(prefix="pz_parquet_profile_")) / "catalog.parquet"
+        pd.DataFrame(
+            {"id": range(30), "z": [None if i == 5 else i * 0.1 for i in range(30)]}
+        ).to_parquet(filepath, index=False, row_group_size=10)
+        self.upload_main_file_from_path(product, filepath)
+
+        with mock.patch(
+            "pyarrow.parquet.ParquetFile.iter_batches",
+            autospec=True,
+            side_effect=pq.ParquetFile.iter_batches,
+        ) as iter_batches_mock:
+            self.client.post(reverse("products-registry", kwargs={"pk": product.pk}))
+
+        # Only the preview batch is decoded.
+        self.assertEqual(iter_batches_mock.call_count, 1)
+        stats = product.contents.get(column_name="z").statistics
+        self.assertEqual((stats["count"], stats["null_count"]), (29, 1))
+        self.assertAlmostEqual(stats["max"], 2.9)
+        self.assertNotIn("mean", stats)
+
+    def test_quantile_sketch_tracks_streamed_quantiles(self):
+        rng = pd.Series(range(200000)).sample(frac=1, random_state=7).to_numpy()
+        sketch = QuantileSketch(max_centroids=500)
+        for start in range(0, len(rng), 7000):
+            sketch.update(rng[start : start + 7000])
+
+        for q, value in zip((0.01, 0.5, 0.99), sketch.quantiles((0.01, 0.5, 0.99))):
+            self.assertAlmostEqual(value / len(rng), q, delta=0.005)
+
+        profiler = TableProfiler(column_aliases={"photo": "z"})
+        profiler.update(pd.DataFrame({"photo": [0.1, None, 9.5], "name": ["a", "b", None]}))
+        stats = profiler.to_dict()
+        self.assertEqual(stats["name"], {"count": 2, "null_count": 1})
+        self.assertEqual(stats["photo"]["histogram"]["overflow"], 1)
+
+    @override_settings(PRODUCT_COLUMN_PROFILING=1)
+    def test_registry_estimates_duplicate_ids_and_positions(self):
+        product = self.create_product(specz=True)
+        filepath = Path(tempfile.mkdtemp(prefix="pz_dups_")) / "catalog.csv"
+        ids = list(range(3000)) + list(range(1000))
+        pd.DataFrame(
+            {
+                "objid": ids,
+                # Repeated sources differ by far less than the 0.1" grid.
+                "ra": [10 + (i % 3000) * 1e-3 + (j >= 3000) * 1e-7 for j, i in enumerate(ids)],
+                "dec": [-5.0] * len(ids),
+                "z": 0.5,
+            }
+        ).to_csv(filepath, index=False)
+        self.upload_main_file_from_path(product, filepath)
+
+        with mock.patch.object(MainTableDataCollector, "CHUNK_SIZE", 1500):
+            self.client.post(reverse("products-registry", kwargs={"pk": product.pk}))
+
+        main_file = product.files.get(role=0)
+        estimates = main_file.duplicate_estimates
+        self.assertEqual(estimates["id"]["column"], "objid")
+        self.assertAlmostEqual(estimates["id"]["distinct_count"], 3000, delta=60)
+        self.assertAlmostEqual(estimates["id"]["duplicate_fraction"], 0.25, delta=0.02)
+        self.assertEqual(estimates["position"]["columns"], ["ra", "dec"])
+        self.assertAlmostEqual(
+            estimates["position"]["duplicate_fraction"], 0.25, delta=0.02
+        )
+        id_stats = product.contents.get(column_name="objid").statistics
+        self.assertEqual(id_stats["distinct_count"], estimates["id"]["distinct_count"])
+
+        # Once aliased, the ID role follows the alias instead of the name.
+        product.contents.filter(column_name="z").update(alias="ID")
+        RegistryProduct(product.pk).registry()
+        main_file.refresh_from_db()
+        self.assertEqual(main_file.duplicate_estimates["id"]["column"], "z")
+        self.assertAlmostEqual(
+            main_file.duplicate_estimates["id"]["duplicate_fraction"], 1.0, delta=0.01
+        )
+
+    def test_registry_skips_scan_when_main_file_is_unchanged(self):
+        product = self.create_product(specz=True)
+        main_file = self.upload_main_file(product, extension="csv")
+        url = reverse("products-registry", kwargs={"pk": product.pk})
+        self.client.post(url)
+        content_ids = list(product.contents.values_list("pk", flat=True))
+
+        with mock.patch.object(
+            MainTableDataCollector,
+            "collect",
+            autospec=True,
+            side_effect=MainTableDataCollector.collect,
+        ) as collect:
+            response = self.client.post(url)
+            self.assertEqual(response.status_code, 200)
+            collect.assert_not_called()
+            self.assertEqual(
+                list(product.contents.values_list("pk", flat=True)), content_ids
+            )
+
+            # Appending rows changes the fingerprint, so the file is scanned.
+            with open(main_file.file.path, "a") as fp:
+                fp.write("1,0.5,10.0,-5.0,1,25.0\n")
+            self.client.post(url)
+            collect.assert_called_once()
+
+        main_file.refresh_from_db()
+        self.assertEqual(main_file.n_rows, len(pd.read_csv(main_file.file.path)))
+        self.assertTrue(main_file.fingerprint.startswith("file:"))
+
+    def test_create_product_contents_diffs_columns_in_bulk(self):
+        product = self.create_product(specz=True)
+        registry = RegistryProduct(product.pk)
+        columns = {f"col_{i}": {} for i in range(500)}
+        columns["col_1"] = {"ucd": "pos.eq.ra;meta.main", "alias": "RA"}
+        registry.create_product_contents(columns)
+        kept_id = product.contents.get(column_name="col_1").pk
+
+        # Rename the last column and drop another one.
+        columns = {f"col_{i}": {"statistics": {"count": i}} for i in range(499)}
+        del columns["col_3"]
+        columns["renamed"] = {}
+        with CaptureQueriesContext(connection) as queries:
+            registry.create_product_contents(columns)
+        # One select, one delete, then batched updates and inserts instead
+        # of a query per column.
+        self.assertLess(len(queries), 12)
+
+        contents = list(product.contents.order_by("order"))
+        self.assertEqual([c.column_name for c in contents], list(columns))
+        self.assertEqual([c.order for c in contents], list(range(len(columns))))
+        kept = product.contents.get(column_name="col_1")
+        self.assertEqual(kept.pk, kept_id)
+        self.assertEqual((kept.ucd, kept.alias), ("pos.eq.ra;meta.main", "RA"))
+        self.assertEqual(kept.statistics, {"count": 1})
+        self.assertFalse(product.contents.filter(column_name="col_499").exists())
+
     def test_read_data_starts_background_preview_when_missing(self):
         product = self.create_product(specz=True)
         self.upload_main_file(product, extension="csv")
@@ -17,7 +17,16 @@ from core.permissions import AccessControlMixin, ProductAccessPermission
 from core.product_handle import FileHandle, NotTableError
 from core.product_steps import CreateProduct, NonAdminError, RegistryProduct
 from core.serializers import ProductSerializer
-from core.services import AccessControlService, ProductDownloadArchiveService
+from core.services import (
+    AccessControlService,
+    InvalidExportRequest,
+    InvalidTableQuery,
+    ProductDownloadArchiveService,
+    ProductExportService,
+    ProductTableQuery,
+    ProductTableQueryService,
+)
+from core.table_preview import table_page
 from core.tasks import (
     build_product_download_archive,
     build_product_main_file_archive,
@@ -26,8 +35,7 @@ from core.tasks import (
 from core.utils import format_query_to_char
 from django.conf import settings
 from django.core import signing
-from django.core.paginator import Paginator
-from django.http import FileResponse, HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django_filters import rest_framework as filters
 from rest_framework import exceptions, status, viewsets
 from rest_framework.decorators import action
@@ -313,8 +321,7 @@ class ProductViewSet(AccessControlMixin, viewsets.ModelViewSet):
         return data
 
     def __get_current_download_signature(self, product):
-        product_path = pathlib.Path(settings.MEDIA_ROOT, product.path)
-        return ProductDownloadArchiveService.build_source_signature(product_path)
+        return ProductDownloadArchiveService.get_source_signature(product)
 
     def __get_current_main_file_signature(self, product):
         return ProductDownloadArchiveService.build_main_file_source_signature(product)
@@ -338,6 +345,27 @@ class ProductViewSet(AccessControlMixin, viewsets.ModelViewSet):
         )
         return response
 
+    def __build_streamed_zip_response(self, product, stored=False):
+        product_path = pathlib.Path(settings.MEDIA_ROOT, product.path)
+        if not product.path or not product_path.is_dir():
+            return Response(
+                {"error": "Product files not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        content, content_length = ProductDownloadArchiveService.stream_zip(
+            product, stored=stored
+        )
+        response = StreamingHttpResponse(content, content_type="application/zip")
+        if content_length is not None:
+            response["Content-Length"] = content_length
+        response["Content-Disposition"] = "attachment; filename={}.zip".format(
+            product.internal_name
+        )
+        # Nginx would otherwise buffer the whole archive.
+        response["X-Accel-Buffering"] = "no"
+        return response
+
     def __load_ready_archive_from_token(self, product, token):
         if not token:
             raise exceptions.PermissionDenied("Missing download token.")
@@ -465,7 +493,18 @@ class ProductViewSet(AccessControlMixin, viewsets.ModelViewSet):
         url_path="download/file",
     )
     def download_file(self, request, **kwargs):
+        """Serve a prepared download archive.
+
+        With `mode=stream` the ZIP is built while it is sent instead, with
+        no prepared archive or token. `compression=stored` stores every
+        member so the response carries an exact Content-Length.
+        """
         product = self.get_object()
+        if request.GET.get("mode") == "stream":
+            return self.__build_streamed_zip_response(
+                product, stored=request.GET.get("compression") == "stored"
+            )
+
         try:
             archive = self.__load_ready_archive_from_token(
                 product,
@@ -661,19 +700,28 @@ class ProductViewSet(AccessControlMixin, viewsets.ModelViewSet):
     def read_data(self, request, **kwargs):
         page = int(request.GET.get("page", 1))
         page_size = int(request.GET.get("page_size", 100))
+        # "sample" pages through rows sampled from the whole table.
+        preview_kind = request.GET.get("preview", "head")
 
         product = self.get_object()
         preview_path = RegistryProduct.get_table_preview_path(product)
 
         try:
+            query = ProductTableQuery.from_params(request.GET)
+            if query is not None and ProductTableQueryService.get_dataset_path(product):
+                # Parquet/HATS: the query runs over the real data, not the preview.
+                return self.__query_table(product, query, page, page_size)
+
             if preview_path.exists():
                 try:
-                    preview_payload = loads(preview_path.read_text(encoding="utf-8"))
-                    records = preview_payload.get("results", [])
-                    columns = preview_payload.get("columns", [])
-                    count = int(preview_payload.get("count", len(records)))
+                    records, columns, count = self.__read_table_preview(
+                        product, page, page_size, preview_kind, query
+                    )
+                except InvalidTableQuery:
+                    raise
                 except Exception:
                     preview_path.unlink(missing_ok=True)
+                    RegistryProduct.table_preview_cache.invalidate(product.pk)
             else:
                 records = None
 
@@ -698,22 +746,21 @@ class ProductViewSet(AccessControlMixin, viewsets.ModelViewSet):
                 )
 
             if records is None:
-                preview_payload = loads(preview_path.read_text(encoding="utf-8"))
-                records = preview_payload.get("results", [])
-                columns = preview_payload.get("columns", [])
-                count = int(preview_payload.get("count", len(records)))
-
-            paginator = Paginator(records, page_size)
-            records = paginator.get_page(page)
+                records, columns, count = self.__read_table_preview(
+                    product, page, page_size, preview_kind, query
+                )
 
-            return Response(
-                {
-                    "count": count,
-                    "columns": columns,
-                    "results": records.object_list,
-                }
-            )
+            content = {
+                "count": count,
+                "columns": columns,
+                "results": records,
+            }
+            if query is not None:
+                content.update({"source": "preview", "truncated": False})
+            return Response(content)
 
+        except InvalidTableQuery as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except NotTableError as e:
             content = {"message": "Table preview not available for this product type."}
             return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -721,6 +768,77 @@ class ProductViewSet(AccessControlMixin, viewsets.ModelViewSet):
             content = {"message": str(e)}
             return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def __read_table_preview(
+        self, product, page, page_size, preview_kind="head", query=None
+    ):
+        """Read one page of the cached table preview.
+
+        Only the requested rows are sliced from the memory-mapped preview,
+        which is kept open across requests by the in-process preview cache.
+        When `preview_kind` is "sample" and the product has a random sample
+        preview, its rows are returned instead of the first rows. A query,
+        if given, is applied to the preview rows.
+
+        Returns:
+            tuple: (records, columns, count)
+        """
+        preview = RegistryProduct.open_table_preview(product, preview_kind)
+        table = preview.table
+        if query is not None:
+            table = query.apply(table)
+        return table_page(table, page, page_size), table.schema.names, table.num_rows
+
+    def __query_table(self, product, query, page, page_size):
+        """Answer a read_data query with a pushed-down scan of the main file."""
+        table, info = ProductTableQueryService.run(product, query)
+        return Response(
+            {
+                "count": table.num_rows,
+                "columns": table.schema.names,
+                "results": table_page(table, page, page_size),
+                "source": info["source"],
+                "truncated": info["truncated"],
+            }
+        )
+
+    @action(methods=["GET"], detail=True)
+    def export(self, request, **kwargs):
+        """Stream the main file converted to CSV, parquet or FITS.
+
+        Query parameters:
+            file_format: "csv" (default), "parquet" or "fits". (`format` is
+                reserved by DRF for content negotiation.)
+            columns: Comma separated list of columns to export.
+        """
+        product = self.get_object()
+        file_format = request.GET.get("file_format", "csv").lower()
+        columns = [
+            c.strip() for c in request.GET.get("columns", "").split(",") if c.strip()
+        ]
+
+        try:
+            content, content_type, filename, length = ProductExportService.prepare(
+                product, file_format, columns
+            )
+        except InvalidExportRequest as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except NotTableError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            content = {"message": str(e)}
+            return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        # An error after this point aborts the stream: the chunked body
+        # misses its terminating chunk, or a FITS body ends short of its
+        # Content-Length, so clients see a failed download.
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = "attachment; filename={}".format(filename)
+        if length is not None:
+            response["Content-Length"] = str(length)
+        # Nginx would otherwise buffer the whole converted file.
+        response["X-Accel-Buffering"] = "no"
+        return response
+
     @action(methods=["GET"], detail=True)
     def api_schema(self, request):
         meta = self.metadata_class()
@@ -747,6 +865,7 @@ class ProductViewSet(AccessControlMixin, viewsets.ModelViewSet):
             main_file["size"] = product_file.size
             main_file["n_rows"] = product_file.n_rows
             main_file["is_directory"] = product_file.is_directory
+            main_file["duplicate_estimates"] = product_file.duplicate_estimates
 
             product_contents = self.__get_product_contents(product)
             if product_contents:
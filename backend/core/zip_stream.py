@@ -0,0 +1,489 @@
+import pathlib
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP_MAX_ENTRIES = 0xFFFF
+# Deflate may grow incompressible data a little; entries that could cross
+# the 4 GiB limit once compressed are written with ZIP64 fields upfront.
+ZIP64_MARGIN = 1 << 24
+
+DATA_DESCRIPTOR_FLAG = 0x08
+UTF8_FLAG = 0x800
+DEFLATE_DICTIONARY_SIZE = 32 * 1024
+# Final empty static block that terminates a raw deflate stream whose
+# blocks were ended with Z_SYNC_FLUSH.
+DEFLATE_END = b"\x03\x00"
+
+DEFAULT_STORED_EXTENSIONS = (
+    ".parquet",
+    ".pq",
+    ".gz",
+    ".tgz",
+    ".bz2",
+    ".xz",
+    ".zip",
+    ".zst",
+    ".fz",
+    ".png",
+    ".jpg",
+    ".jpeg",
+)
+
+
+def compression_for(arcname, stored_extensions=DEFAULT_STORED_EXTENSIONS):
+    """ZIP method for a member: stored when its content is already compressed."""
+    if arcname.lower().endswith(tuple(stored_extensions)):
+        return ZIP_STORED
+    return ZIP_DEFLATED
+
+
+def _deflate_block(block, zdict, level):
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(block) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def _dos_datetime(date_time):
+    year, month, day, hour, minute, second = date_time[:6]
+    if year < 1980:
+        year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+    return (
+        (hour << 11) | (minute << 5) | (second // 2),
+        ((year - 1980) << 9) | (month << 5) | day,
+    )
+
+
+class ZipEntry:
+    """Central directory record of a member written to the archive."""
+
+    def __init__(self, arcname, method, mtime, size_hint=0, date_time=None):
+        self.arcname = arcname
+        self.name_bytes = arcname.encode("utf-8")
+        self.flags = DATA_DESCRIPTOR_FLAG
+        if not arcname.isascii():
+            self.flags |= UTF8_FLAG
+        self.method = method
+        self.dos_time, self.dos_date = _dos_datetime(
+            date_time or time.localtime(mtime)
+        )
+        self.zip64 = size_hint >= ZIP64_LIMIT - ZIP64_MARGIN
+        self.crc = 0
+        self.compress_size = 0
+        self.file_size = 0
+        self.header_offset = 0
+
+    @property
+    def version_needed(self):
+        return 45 if self.zip64 else 20
+
+
+class _ByteCounter:
+    def write(self, data):
+        return len(data)
+
+
+class _ChunkBuffer:
+    """Write-only file object whose content is drained by a generator."""
+
+    def __init__(self):
+        self.size = 0
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(data)
+        self.size += len(data)
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+class ZipStreamWriter:
+    """Writes a standard ZIP archive strictly sequentially.
+
+    The output only needs `write`, so it can be a regular file or a
+    streaming response. Member sizes and CRCs follow each member in a data
+    descriptor, and ZIP64 records are used when sizes, offsets or the
+    number of members need them.
+
+    Deflated members are split in blocks that are compressed in parallel
+    by a thread pool (zlib releases the GIL). Each block is primed with
+    the last 32 KiB of the previous one and ended with a sync flush, so
+    the blocks concatenate into a single deflate stream, as pigz does.
+    Blocks are written in order and the number of blocks in flight is
+    bounded, so memory stays at a few blocks per worker.
+    """
+
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, fileobj, compression_level=6, workers=1, block_size=None):
+        """
+        Args:
+            fileobj: Writable binary object.
+            compression_level (int): zlib level for deflated members.
+            workers (int): Threads compressing blocks. 1 compresses inline.
+            block_size (int | None): Uncompressed bytes per block.
+        """
+        self.fileobj = fileobj
+        self.compression_level = compression_level
+        self.workers = max(1, int(workers or 1))
+        self.block_size = int(block_size or self.BLOCK_SIZE)
+        self.entries = []
+        self.offset = 0
+        self._data_start = 0
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.shutdown(cancel=True)
+
+    def shutdown(self, cancel=False):
+        """Stop the worker threads, dropping queued blocks when cancel is set."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=cancel)
+            self._pool = None
+
+    def write_bytes(self, arcname, data, method=ZIP_DEFLATED, mtime=None):
+        """Add a member from an in-memory bytes object."""
+        entry = ZipEntry(
+            arcname, method, time.time() if mtime is None else mtime, len(data)
+        )
+        self._write_local_header(entry)
+        entry.crc = zlib.crc32(data)
+        entry.file_size = len(data)
+        if method == ZIP_DEFLATED:
+            data = _deflate_block(data, b"", self.compression_level) + DEFLATE_END
+        self._write(data)
+        entry.compress_size = len(data)
+        self._write_data_descriptor(entry)
+
+    def write_files(self, files):
+        """Add members read from disk, compressing blocks in parallel.
+
+        Args:
+            files (Iterable[tuple]): (path, arcname, method) triples, written
+                in iteration order. A fourth item may give the size measured
+                beforehand (e.g. for a Content-Length); a stored member whose
+                content no longer has that size raises ValueError before any
+                byte past it is written.
+        """
+        for _ in self.iter_write_files(files):
+            pass
+
+    def iter_write_files(self, files):
+        """Same as write_files, but yields each time data reaches the output,
+        so a caller can forward it while the archive is being written."""
+        pending = deque()
+        max_pending = 2 * self.workers + 2
+
+        for path, arcname, method, *measured in files:
+            path = pathlib.Path(path)
+            stat = path.stat()
+            expected = measured[0] if measured and method == ZIP_STORED else None
+            entry = ZipEntry(
+                arcname, method, stat.st_mtime, max(stat.st_size, expected or 0)
+            )
+            pending.append(("start", entry))
+
+            crc = 0
+            size = 0
+            previous = b""
+            with path.open("rb") as source:
+                while True:
+                    block = source.read(self.block_size)
+                    if not block:
+                        break
+                    crc = zlib.crc32(block, crc)
+                    size += len(block)
+                    if expected is not None and size > expected:
+                        raise ValueError(self._size_changed(arcname, expected))
+                    if method == ZIP_DEFLATED:
+                        pending.append(("data", self._submit(block, previous)))
+                        previous = block[-DEFLATE_DICTIONARY_SIZE:]
+                    else:
+                        pending.append(("data", block))
+                    while len(pending) > max_pending:
+                        self._drain(pending.popleft())
+                        yield
+
+            if expected is not None and size != expected:
+                raise ValueError(self._size_changed(arcname, expected))
+            pending.append(("end", (entry, crc, size)))
+
+        while pending:
+            self._drain(pending.popleft())
+            yield
+
+    def write_file(self, path, arcname, method=ZIP_DEFLATED):
+        """Add one member read from disk."""
+        self.write_files([(path, arcname, method)])
+
+    def copy_member(self, source, info):
+        """Copy a member of another archive without recompressing it.
+
+        Args:
+            source: Readable and seekable binary object of the source archive.
+            info (zipfile.ZipInfo): The member, as listed by zipfile.
+        """
+        source.seek(info.header_offset)
+        header = source.read(30)
+        if len(header) != 30 or header[:4] != b"PK\x03\x04":
+            raise ValueError(f"Bad local header for member {info.filename}.")
+        name_length, extra_length = struct.unpack("<HH", header[26:30])
+        source.seek(info.header_offset + 30 + name_length + extra_length)
+
+        entry = ZipEntry(
+            info.filename,
+            info.compress_type,
+            0,
+            max(info.file_size, info.compress_size),
+            date_time=info.date_time,
+        )
+        self._write_local_header(entry)
+
+        remaining = info.compress_size
+        while remaining:
+            chunk = source.read(min(self.block_size, remaining))
+            if not chunk:
+                raise ValueError(f"Member {info.filename} is truncated.")
+            self._write(chunk)
+            remaining -= len(chunk)
+
+        entry.crc = info.CRC
+        entry.file_size = info.file_size
+        entry.compress_size = info.compress_size
+        self._write_data_descriptor(entry)
+
+    @classmethod
+    def measure_stored(cls, members):
+        """Exact size of an archive whose members are all stored.
+
+        Args:
+            members (Iterable[tuple]): (arcname, size) pairs in archive order.
+
+        Returns:
+            int: Number of bytes the writer will produce for these members.
+        """
+        writer = cls(_ByteCounter())
+        for arcname, size in members:
+            entry = ZipEntry(arcname, ZIP_STORED, 0, size)
+            writer._write_local_header(entry)
+            writer.offset += size
+            entry.file_size = entry.compress_size = size
+            writer._write_data_descriptor(entry)
+        writer.close()
+        return writer.offset
+
+    def close(self):
+        """Write the central directory and release the worker threads."""
+        self.shutdown()
+
+        cd_offset = self.offset
+        for entry in self.entries:
+            self._write_central_header(entry)
+        cd_size = self.offset - cd_offset
+        self._write_end_of_central_directory(cd_offset, cd_size)
+
+    @staticmethod
+    def _size_changed(arcname, expected):
+        return f"Member {arcname} no longer has its measured size of {expected} bytes."
+
+    def _submit(self, block, previous):
+        if self.workers == 1:
+            future = Future()
+            future.set_result(
+                _deflate_block(block, previous, self.compression_level)
+            )
+            return future
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        return self._pool.submit(
+            _deflate_block, block, previous, self.compression_level
+        )
+
+    def _drain(self, item):
+        kind, value = item
+        if kind == "start":
+            self._write_local_header(value)
+        elif kind == "data":
+            self._write(value.result() if isinstance(value, Future) else value)
+        else:
+            entry, crc, size = value
+            if entry.method == ZIP_DEFLATED:
+                self._write(DEFLATE_END)
+            entry.crc = crc
+            entry.file_size = size
+            entry.compress_size = self.offset - self._data_start
+            self._write_data_descriptor(entry)
+
+    def _write(self, data):
+        self.fileobj.write(data)
+        self.offset += len(data)
+
+    def _write_local_header(self, entry):
+        entry.header_offset = self.offset
+        extra = b""
+        sizes = 0
+        if entry.zip64:
+            extra = struct.pack("<HHQQ", 0x0001, 16, 0, 0)
+            sizes = ZIP64_LIMIT
+        header = struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50,
+            entry.version_needed,
+            entry.flags,
+            entry.method,
+            entry.dos_time,
+            entry.dos_date,
+            0,
+            sizes,
+            sizes,
+            len(entry.name_bytes),
+            len(extra),
+        )
+        self._write(header + entry.name_bytes + extra)
+        self._data_start = self.offset
+
+    def _write_data_descriptor(self, entry):
+        if not entry.zip64 and (
+            entry.compress_size >= ZIP64_LIMIT or entry.file_size >= ZIP64_LIMIT
+        ):
+            raise ValueError(f"Member {entry.arcname} grew past the ZIP64 margin.")
+
+        if entry.zip64:
+            descriptor = struct.pack(
+                "<IIQQ", 0x08074B50, entry.crc, entry.compress_size, entry.file_size
+            )
+        else:
+            descriptor = struct.pack(
+                "<IIII", 0x08074B50, entry.crc, entry.compress_size, entry.file_size
+            )
+        self._write(descriptor)
+        self.entries.append(entry)
+
+    def _write_central_header(self, entry):
+        extra_values = []
+        file_size = entry.file_size
+        compress_size = entry.compress_size
+        header_offset = entry.header_offset
+        if entry.zip64:
+            extra_values += [file_size, compress_size]
+            file_size = compress_size = ZIP64_LIMIT
+        if header_offset >= ZIP64_LIMIT:
+            extra_values.append(header_offset)
+            header_offset = ZIP64_LIMIT
+
+        extra = b""
+        version = entry.version_needed
+        if extra_values:
+            version = 45
+            extra = struct.pack(
+                f"<HH{len(extra_values)}Q",
+                0x0001,
+                8 * len(extra_values),
+                *extra_values,
+            )
+
+        header = struct.pack(
+            "<IHHHHHHIIIHHHHHII",
+            0x02014B50,
+            (3 << 8) | version,
+            version,
+            entry.flags,
+            entry.method,
+            entry.dos_time,
+            entry.dos_date,
+            entry.crc,
+            compress_size,
+            file_size,
+            len(entry.name_bytes),
+            len(extra),
+            0,
+            0,
+            0,
+            (0o100644 << 16),
+            header_offset,
+        )
+        self._write(header + entry.name_bytes + extra)
+
+    def _write_end_of_central_directory(self, cd_offset, cd_size):
+        count = len(self.entries)
+        if (
+            count >= ZIP_MAX_ENTRIES
+            or cd_offset >= ZIP64_LIMIT
+            or cd_size >= ZIP64_LIMIT
+        ):
+            zip64_offset = self.offset
+            self._write(
+                struct.pack(
+                    "<IQHHIIQQQQ",
+                    0x06064B50,
+                    44,
+                    45,
+                    45,
+                    0,
+                    0,
+                    count,
+                    count,
+                    cd_size,
+                    cd_offset,
+                )
+            )
+            self._write(struct.pack("<IIQI", 0x07064B50, 0, zip64_offset, 1))
+            count = min(count, ZIP_MAX_ENTRIES)
+            cd_offset = min(cd_offset, ZIP64_LIMIT)
+            cd_size = min(cd_size, ZIP64_LIMIT)
+
+        self._write(
+            struct.pack(
+                "<IHHHHIIH", 0x06054B50, 0, 0, count, count, cd_size, cd_offset, 0
+            )
+        )
+
+
+def iter_zip(files, members=(), chunk_size=256 * 1024, **options):
+    """Yield a ZIP archive in byte chunks while it is being written.
+
+    Nothing is staged on disk and memory is bounded by the blocks in flight
+    plus `chunk_size`.
+
+    Args:
+        files (Iterable[tuple]): (path, arcname, method[, size]) members read
+            from disk; see ZipStreamWriter.write_files.
+        members (Iterable[tuple]): (arcname, data, method) in-memory members,
+            written before the files.
+        chunk_size (int): Minimum bytes buffered before a chunk is yielded.
+        **options: ZipStreamWriter options.
+    """
+    buffer = _ChunkBuffer()
+    writer = ZipStreamWriter(buffer, **options)
+    try:
+        for arcname, data, method in members:
+            writer.write_bytes(arcname, data, method)
+
+        for _ in writer.iter_write_files(files):
+            if buffer.size >= chunk_size:
+                yield buffer.drain()
+
+        writer.close()
+        yield buffer.drain()
+    finally:
+        # Also runs when the client goes away and the generator is closed.
+        writer.shutdown(cancel=True)
@@ -151,6 +151,34 @@ PRODUCT_DOWNLOAD_PREPARE_WAIT_SECONDS = float(
 PRODUCT_DOWNLOAD_PREPARE_POLL_INTERVAL_SECONDS = float(
     os.getenv("PRODUCT_DOWNLOAD_PREPARE_POLL_INTERVAL_SECONDS", "0.5")
 )
+PRODUCT_DOWNLOAD_ZIP_WORKERS = int(os.getenv("PRODUCT_DOWNLOAD_ZIP_WORKERS", "4"))
+PRODUCT_DOWNLOAD_STORED_EXTENSIONS = [
+    extension.strip().lower()
+    for extension in os.getenv(
+        "PRODUCT_DOWNLOAD_STORED_EXTENSIONS",
+        ".parquet,.pq,.gz,.tgz,.bz2,.xz,.zip,.zst,.fz,.png,.jpg,.jpeg",
+    ).split(",")
+    if extension.strip()
+]
+PRODUCT_ARCHIVE_EXTRACTION_WORKERS = int(
+    os.getenv("PRODUCT_ARCHIVE_EXTRACTION_WORKERS", "4")
+)
+PRODUCT_CSV_READER_ENGINE = os.getenv("PRODUCT_CSV_READER_ENGINE", "pandas")
+PRODUCT_CSV_READER_BLOCK_SIZE = int(
+    os.getenv("PRODUCT_CSV_READER_BLOCK_SIZE", "16777216")
+)
+PRODUCT_ROW_COUNT_USE_MMAP = int(os.getenv("PRODUCT_ROW_COUNT_USE_MMAP", "0"))
+PRODUCT_TABLE_PREVIEW_CACHE_MAX_BYTES = int(
+    os.getenv("PRODUCT_TABLE_PREVIEW_CACHE_MAX_BYTES", "268435456")
+)
+PRODUCT_QUERY_MAX_ROWS = int(os.getenv("PRODUCT_QUERY_MAX_ROWS", "10000"))
+PRODUCT_QUERY_MAX_SCAN_BYTES = int(
+    os.getenv("PRODUCT_QUERY_MAX_SCAN_BYTES", "2147483648")
+)
+PRODUCT_COLUMN_PROFILING = int(os.getenv("PRODUCT_COLUMN_PROFILING", "0"))
+PRODUCT_POSITION_DUPLICATE_PRECISION_ARCSEC = float(
+    os.getenv("PRODUCT_POSITION_DUPLICATE_PRECISION_ARCSEC", "0.1")
+)
 
 PROCESSING_DIR = os.getenv("PROCESSING_DIR", os.path.join(BASE_DIR, "processes"))
 